@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.db_helper import get_db_connection
+from utils.program_catalog import invalidate_catalog
 
 def main():
     print("=" * 60)
@@ -126,6 +127,7 @@ def main():
         
         cursor.close()
         conn.close()
+        invalidate_catalog()
         
         print("\n" + "=" * 60)
         print("✅ SUCCESS! Foundation programs have been added.")
@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.db_helper import get_db_connection
+from utils.program_catalog import invalidate_catalog
 
 def add_foundation_programs():
     """Add Foundation in Arts and Foundation in Science programs"""
@@ -109,6 +110,7 @@ def add_foundation_programs():
         
         cursor.close()
         conn.close()
+        invalidate_catalog()
         return True
         
     except Exception as e:
@@ -9,6 +9,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.db_helper import get_db_connection
+from utils.program_catalog import invalidate_catalog
 
 def add_postgraduate_programs():
     """Add Master's and PhD programs to the database"""
@@ -221,6 +222,7 @@ def add_postgraduate_programs():
         conn.commit()
         cursor.close()
         conn.close()
+        invalidate_catalog()
         
         print("\n" + "="*60)
         print("SUCCESS! Postgraduate programs have been added to the database.")
@@ -0,0 +1,28 @@
+-- Application submission: personal details per application, file metadata on uploaded documents
+-- Run with: python Database/run_migration.py application_submission_migration.sql
+
+USE university_admission_db;
+
+-- Uploads are stored for every document field of the online form; not every
+-- field has a DOCUMENT_CHECKLIST row for the program, so the link is optional
+ALTER TABLE APPLICATION_DOCUMENT MODIFY checklist_id INT NULL;
+
+ALTER TABLE APPLICATION_DOCUMENT
+    ADD COLUMN document_type VARCHAR(50) NULL COMMENT 'Form field, e.g. doc_ic' AFTER checklist_id,
+    ADD COLUMN original_filename VARCHAR(255) NULL AFTER file_path,
+    ADD COLUMN content_type VARCHAR(100) NULL AFTER original_filename,
+    ADD COLUMN file_size BIGINT NULL AFTER content_type,
+    ADD COLUMN sha256 CHAR(64) NULL AFTER file_size;
+
+CREATE INDEX idx_sha256 ON APPLICATION_DOCUMENT (sha256);
+
+-- The online form needs no login, so a submission never changes an existing
+-- APPLICANT row; the details entered on each application are kept here
+ALTER TABLE APPLICATION
+    ADD COLUMN full_name VARCHAR(200) NULL AFTER remarks,
+    ADD COLUMN ic_passport VARCHAR(50) NULL AFTER full_name,
+    ADD COLUMN gender ENUM('Male', 'Female') NULL AFTER ic_passport,
+    ADD COLUMN date_of_birth DATE NULL AFTER gender,
+    ADD COLUMN nationality VARCHAR(100) NULL AFTER date_of_birth,
+    ADD COLUMN phone VARCHAR(20) NULL AFTER nationality,
+    ADD COLUMN address TEXT NULL AFTER phone;
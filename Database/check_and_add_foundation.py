@@ -6,6 +6,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.db_helper import get_db_connection
+from utils.program_catalog import invalidate_catalog
 
 conn = get_db_connection()
 if not conn:
@@ -87,4 +88,5 @@ for prog in final:
 
 cursor.close()
 conn.close()
+invalidate_catalog()
 print("\n✓ Done!")
@@ -0,0 +1,16 @@
+-- Document Blob Table
+-- One row per distinct uploaded file (utils/document_store.py); APPLICATION_DOCUMENT
+-- rows point at it through their sha256 and ref_count counts them
+-- Run with: python Database/run_migration.py document_store_migration.sql
+
+USE university_admission_db;
+
+CREATE TABLE IF NOT EXISTS DOCUMENT_BLOB (
+    sha256 CHAR(64) NOT NULL PRIMARY KEY,
+    file_size BIGINT NOT NULL,
+    content_type VARCHAR(100) NULL COMMENT 'As sent with the first upload',
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_referenced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_unreferenced (ref_count, last_referenced_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
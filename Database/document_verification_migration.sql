@@ -0,0 +1,20 @@
+-- Document verification queue columns on APPLICATION_DOCUMENT
+-- Pending documents are claimed and checked by utils/document_verifier.py
+-- Run with: python Database/run_migration.py document_verification_migration.sql
+
+USE university_admission_db;
+
+ALTER TABLE APPLICATION_DOCUMENT
+    ADD COLUMN verification_attempts INT NOT NULL DEFAULT 0 AFTER verification_status,
+    ADD COLUMN verification_claimed_by VARCHAR(64) NULL COMMENT 'Verifier batch currently checking this document' AFTER verification_attempts,
+    ADD COLUMN verification_claimed_at DATETIME NULL AFTER verification_claimed_by,
+    ADD COLUMN verified_at DATETIME NULL AFTER verification_claimed_at,
+    ADD COLUMN verification_notes VARCHAR(500) NULL AFTER verified_at,
+    ADD COLUMN detected_type VARCHAR(20) NULL COMMENT 'pdf, jpeg or png, from the file content' AFTER verification_notes,
+    ADD COLUMN page_count INT NULL AFTER detected_type,
+    ADD COLUMN image_width INT NULL AFTER page_count,
+    ADD COLUMN image_height INT NULL AFTER image_width;
+
+-- Claim query: pending documents, oldest claim first
+CREATE INDEX idx_verification_queue ON APPLICATION_DOCUMENT (verification_status, verification_claimed_at);
+CREATE INDEX idx_verification_claimed_by ON APPLICATION_DOCUMENT (verification_claimed_by);
@@ -0,0 +1,26 @@
+-- Email Outbox Table
+-- Outgoing email is written here first and delivered by the outbox worker
+-- (python -m utils.email_outbox), so web requests never wait on SMTP
+
+USE university_admission_db;
+
+CREATE TABLE IF NOT EXISTS EMAIL_OUTBOX (
+    outbox_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    idempotency_key VARCHAR(191) NOT NULL COMMENT 'Same key = same email, queued only once',
+    to_email VARCHAR(100) NOT NULL,
+    recipient_domain VARCHAR(100) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    body_html MEDIUMTEXT NOT NULL,
+    body_text MEDIUMTEXT NULL,
+    status ENUM('Pending', 'Sending', 'Sent', 'Failed') DEFAULT 'Pending',
+    attempts INT DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    claimed_by VARCHAR(64) NULL COMMENT 'Worker batch currently sending this email',
+    claimed_at DATETIME NULL,
+    last_error VARCHAR(500) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME NULL,
+    UNIQUE KEY unique_idempotency_key (idempotency_key),
+    INDEX idx_due (status, next_attempt_at),
+    INDEX idx_claimed_by (claimed_by)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,10 @@
+-- Indexes for the daily reminder query (utils/email_sender.py DUE_REMINDERS_SQL)
+-- Run with: python Database/run_migration.py email_reminder_indexes.sql
+
+USE university_admission_db;
+
+-- Deadline lookup per subscription: end_date = CURDATE() + days_before, then the program
+CREATE INDEX idx_end_date_program ON IMPORTANT_DATE (end_date, program_id);
+
+-- Subscriptions of a program that are due a given number of days before its deadline
+CREATE INDEX idx_due_reminder ON EMAIL_NOTIFICATION (program_id, days_before, notification_type, is_active, last_sent);
@@ -0,0 +1,62 @@
+"""
+Run a SQL migration file against the configured database
+Usage: python Database/run_migration.py email_outbox_migration.sql
+"""
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mysql.connector import Error
+from utils.db_helper import get_db_connection
+
+def run_migration(sql_file):
+    """Execute every statement of a migration file in the Database directory"""
+    sql_file_path = sql_file if os.path.isabs(sql_file) else os.path.join(os.path.dirname(os.path.abspath(__file__)), sql_file)
+    if not os.path.exists(sql_file_path):
+        print(f"✗ ERROR: SQL file not found at: {sql_file_path}")
+        return False
+
+    conn = get_db_connection()
+    if not conn:
+        print("Error: Could not connect to database")
+        return False
+
+    try:
+        with open(sql_file_path, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+
+        # Drop comment lines, then split into individual statements
+        sql_content = '\n'.join(line for line in sql_content.splitlines() if not line.strip().startswith('--'))
+        statements = [s.strip() for s in sql_content.split(';') if s.strip()]
+
+        cursor = conn.cursor()
+        for i, statement in enumerate(statements, 1):
+            try:
+                cursor.execute(statement)
+                print(f"  ✓ Statement {i} executed successfully")
+            except Error as e:
+                # Re-running a migration is fine: existing tables, columns and indexes are skipped
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    print(f"  ⚠ Statement {i} skipped (already exists): {str(e)[:50]}")
+                else:
+                    print(f"  ✗ Statement {i} failed: {e}")
+                    raise
+
+        conn.commit()
+        cursor.close()
+        print(f"\n✓ Migration {os.path.basename(sql_file_path)} completed successfully!")
+        return True
+
+    except Error as e:
+        print(f"\n✗ ERROR: {e}")
+        return False
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    sys.exit(0 if run_migration(sys.argv[1]) else 1)
@@ -0,0 +1,212 @@
+"""
+Seed IMPORTANT_DATE with the registration periods and application deadlines
+from DateCalculator, for every program x semester x year
+
+The generated dates are compared with the rows already in the table (same
+program, event type and start date), so a re-run only inserts missing rows,
+updates rows whose end date or description changed and, with --prune, deletes
+generated rows that the calculator no longer produces. Rows entered by hand
+(any other event type) are never touched. All changes are written with
+batched executemany calls in a single transaction.
+
+Usage:
+    python Database/seed_important_dates.py [--from-year 2026] [--to-year 2027]
+        [--semesters 1 2 3] [--program-id N ...] [--level Bachelor] [--prune] [--dry-run]
+"""
+import argparse
+import sys
+import os
+from datetime import date
+from itertools import product
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.date_calculator import DateCalculator
+from utils.db_helper import get_db_connection
+from utils.deadline_index import invalidate_deadlines
+
+SEED_BATCH_SIZE = int(os.getenv('SEED_BATCH_SIZE', '1000'))  # rows per executemany call
+
+
+def generated_event_types(semesters):
+    """Every event_type DateCalculator produces for the given semesters"""
+    event_types = []
+    for semester in semesters:
+        for is_international in (False, True):
+            registration, deadline, _ = DateCalculator.event_labels(semester, is_international)
+            event_types += [registration, deadline]
+    return event_types
+
+
+def generate_rows(program_ids, first_year, last_year, semesters=(1, 2, 3)):
+    """
+    Desired IMPORTANT_DATE rows
+
+    Returns:
+        dict {(program_id, event_type, start_date): (end_date, description)}
+    """
+    table = DateCalculator.get_date_table(first_year, last_year, semesters)
+    dates = list(zip(table.event_type.tolist(), table.start_date.tolist(),
+                     table.end_date.tolist(), table.description.tolist()))
+    return {
+        (program_id, event_type, start_date): (end_date, description)
+        for program_id, (event_type, start_date, end_date, description) in product(program_ids, dates)
+    }
+
+
+def plan_changes(existing, desired, prune=False):
+    """
+    Diff existing rows against the desired ones
+
+    Args:
+        existing: (date_id, program_id, event_type, start_date, end_date, description) rows
+        desired: generate_rows() output
+        prune: Delete existing rows that are not desired (and duplicates)
+
+    Returns:
+        (inserts, updates, deletes) ready for executemany
+    """
+    seen = set()
+    updates = []
+    deletes = []
+    for date_id, program_id, event_type, start_date, end_date, description in existing:
+        key = (program_id, event_type, start_date)
+        if key not in desired or key in seen:
+            if prune:
+                deletes.append((date_id,))
+            continue
+        seen.add(key)
+        if (end_date, description) != desired[key]:
+            updates.append(desired[key] + (date_id,))
+
+    inserts = [key + value for key, value in desired.items() if key not in seen]
+    return inserts, updates, deletes
+
+
+def _batches(rows):
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        yield rows[start:start + SEED_BATCH_SIZE]
+
+
+def seed_important_dates(first_year, last_year, semesters=(1, 2, 3), program_ids=None, level=None,
+                         prune=False, dry_run=False):
+    """
+    Bring the generated IMPORTANT_DATE rows in line with DateCalculator
+
+    Returns:
+        dict with inserted, updated, deleted and unchanged counts, or None on error
+    """
+    conn = get_db_connection()
+    if not conn:
+        print("Error: Could not connect to database")
+        return None
+
+    try:
+        cursor = conn.cursor()
+
+        query = "SELECT program_id FROM PROGRAM WHERE 1=1"
+        params = []
+        if program_ids:
+            query += f" AND program_id IN ({','.join(['%s'] * len(program_ids))})"
+            params += list(program_ids)
+        if level:
+            query += " AND level = %s"
+            params.append(level)
+        cursor.execute(query + " ORDER BY program_id", params)
+        programs = [row[0] for row in cursor.fetchall()]
+        if not programs:
+            print("No matching programs found")
+            cursor.close()
+            conn.close()
+            return {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+        desired = generate_rows(programs, first_year, last_year, semesters)
+        starts = [key[2] for key in desired]
+        event_types = generated_event_types(semesters)
+
+        # Generated rows of these programs in the seeded date range, locked until commit
+        cursor.execute(f"""
+            SELECT date_id, program_id, event_type, start_date, end_date, description
+            FROM IMPORTANT_DATE
+            WHERE event_type IN ({','.join(['%s'] * len(event_types))})
+              AND start_date BETWEEN %s AND %s
+              AND program_id IN ({','.join(['%s'] * len(programs))})
+            ORDER BY date_id
+            FOR UPDATE
+        """, event_types + [min(starts), max(starts)] + programs)
+        existing = cursor.fetchall()
+
+        inserts, updates, deletes = plan_changes(existing, desired, prune)
+        result = {
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'deleted': len(deletes),
+            'unchanged': len(desired) - len(inserts) - len(updates),
+        }
+
+        if dry_run:
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            return result
+
+        for batch in _batches(inserts):
+            cursor.executemany("""
+                INSERT INTO IMPORTANT_DATE (program_id, event_type, start_date, end_date, description)
+                VALUES (%s, %s, %s, %s, %s)
+            """, batch)
+        for batch in _batches(updates):
+            cursor.executemany("""
+                UPDATE IMPORTANT_DATE SET end_date = %s, description = %s WHERE date_id = %s
+            """, batch)
+        for batch in _batches(deletes):
+            cursor.executemany("DELETE FROM IMPORTANT_DATE WHERE date_id = %s", batch)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        if inserts or updates or deletes:
+            invalidate_deadlines()
+        return result
+
+    except Exception as e:
+        print(f"\nError: {str(e)}")
+        if conn:
+            conn.rollback()
+            conn.close()
+        return None
+
+
+def main(argv=None):
+    this_year = date.today().year
+    parser = argparse.ArgumentParser(description='Seed IMPORTANT_DATE from DateCalculator')
+    parser.add_argument('--from-year', type=int, default=this_year)
+    parser.add_argument('--to-year', type=int, default=None, help='last year (default: from-year + 1)')
+    parser.add_argument('--semesters', type=int, nargs='+', default=[1, 2, 3], choices=[1, 2, 3])
+    parser.add_argument('--program-id', type=int, nargs='+', dest='program_ids', help='only these programs')
+    parser.add_argument('--level', help='only programs of this level (e.g. Bachelor)')
+    parser.add_argument('--prune', action='store_true',
+                        help='delete generated rows the calculator no longer produces')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would change')
+    args = parser.parse_args(argv)
+
+    to_year = args.to_year if args.to_year is not None else args.from_year + 1
+    if to_year < args.from_year:
+        parser.error('--to-year must not be before --from-year')
+
+    result = seed_important_dates(args.from_year, to_year, tuple(sorted(set(args.semesters))),
+                                  args.program_ids, args.level, args.prune, args.dry_run)
+    if result is None:
+        return 1
+
+    if args.dry_run:
+        summary = "Would insert {inserted}, update {updated} and delete {deleted} row(s)"
+    else:
+        summary = "Inserted {inserted}, updated {updated} and deleted {deleted} row(s)"
+    print(summary.format(**result) + f"; {result['unchanged']} unchanged ({args.from_year}-{to_year})")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
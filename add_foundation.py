@@ -3,6 +3,7 @@
 import sys
 sys.path.insert(0, '.')
 from utils.db_helper import get_db_connection
+from utils.program_catalog import invalidate_catalog
 
 conn = get_db_connection()
 if not conn:
@@ -52,4 +53,5 @@ for r in results:
 
 cursor.close()
 conn.close()
+invalidate_catalog()
 print("\nDone! Refresh the admission page to see Foundation programs.")
@@ -4,8 +4,6 @@ Flask Application Main Entry Point
 """
 from flask import Flask, render_template, request, jsonify, session
 from flask_cors import CORS
-import mysql.connector
-from mysql.connector import Error
 from datetime import datetime, timedelta
 import re
 import json
@@ -15,24 +13,14 @@ app = Flask(__name__)
 app.secret_key = 'skl-university-secret-key-2025'  # Change in production
 CORS(app)
 
-# Database configuration
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'university_admission_db',
-    'user': 'root',
-    'password': '123456',  # MySQL root password
-    'charset': 'utf8mb4',
-    'collation': 'utf8mb4_unicode_ci'
-}
+# Database configuration and pooled connections live in utils.db_helper
+from utils.db_helper import DB_CONFIG, get_db_connection
 
-def get_db_connection():
-    """Create and return database connection"""
-    try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
+# Reject oversized application uploads before they are read
+from utils.application_submission import UPLOAD_MAX_REQUEST_SIZE
+from utils.document_store import USE_X_SENDFILE
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_REQUEST_SIZE
+app.config['USE_X_SENDFILE'] = USE_X_SENDFILE
 
 # Import routes
 try:
@@ -53,6 +41,15 @@ except Exception as e:
     import traceback
     traceback.print_exc()
 
+# Daily deadline reminders (one process sends them, guarded by a MySQL lock).
+# Process pool workers re-import this module as __mp_main__; they must not start it.
+if __name__ != '__mp_main__':
+    try:
+        from utils.reminder_scheduler import start_reminder_scheduler
+        start_reminder_scheduler()
+    except Exception as e:
+        print(f"Warning: Reminder scheduler not started: {e}")
+
 @app.route('/')
 def index():
     """Home page - redirect to campus life page"""
@@ -0,0 +1,76 @@
+"""
+Benchmark: generating important dates for many years
+
+Compares the original per-call datetime arithmetic (the baseline
+DateCalculator, reimplemented here) with the memoized calls and the
+vectorized get_date_table() used to seed IMPORTANT_DATE.
+
+Run with: python benchmarks/bench_date_calculator.py [number_of_years]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.date_calculator import DateCalculator
+
+DEFAULT_YEARS = 50
+
+
+def legacy_dates(year):
+    """The rows get_all_important_dates() built before memoization"""
+    dates = []
+    for semester in (1, 2, 3):
+        start = datetime(year, getattr(DateCalculator, f'SEMESTER_{semester}_START_MONTH'), 1)
+        for is_international in (False, True):
+            registration_open = start - timedelta(days=DateCalculator.REGISTRATION_OPEN_MONTHS_BEFORE[semester] * 30)
+            registration_close = start - timedelta(weeks=DateCalculator.REGISTRATION_CLOSE_WEEKS_BEFORE[semester])
+            if is_international:
+                registration_open -= timedelta(weeks=DateCalculator.INTERNATIONAL_DEADLINE_WEEKS_EARLIER)
+                registration_close -= timedelta(weeks=DateCalculator.INTERNATIONAL_DEADLINE_WEEKS_EARLIER)
+            deadline = registration_open - timedelta(
+                weeks=DateCalculator.APPLICATION_DEADLINE_WEEKS_BEFORE_REGISTRATION)
+            registration, deadline_label, audience = DateCalculator.event_labels(semester, is_international)
+            dates.append({'event_type': registration, 'start_date': registration_open.date(),
+                          'end_date': registration_close.date(),
+                          'description': f'Registration period for Semester {semester} - {audience}',
+                          'is_international': is_international, 'semester': semester})
+            dates.append({'event_type': deadline_label, 'start_date': deadline.date(),
+                          'end_date': deadline.date(),
+                          'description': f'Application deadline for Semester {semester} - {audience}',
+                          'is_international': is_international, 'semester': semester})
+    return dates
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_YEARS
+    years = range(2000, 2000 + size)
+
+    legacy, legacy_ms = timed(lambda: [row for year in years for row in legacy_dates(year)], 20)
+    memoized, memoized_ms = timed(
+        lambda: [row for year in years for row in DateCalculator.get_all_important_dates(year)], 20)
+
+    def table_rows():
+        DateCalculator._date_table.cache_clear()
+        return DateCalculator.get_date_table(years[0], years[-1])
+    table, table_ms = timed(table_rows, 20)
+    if memoized != legacy or len(table.start_date) != len(legacy):
+        print("Warning: memoized or table output does not match the legacy calculation")
+
+    print(f"Years: {size} ({len(legacy)} dates)")
+    print(f"Per-call datetime arithmetic:  {legacy_ms:.2f} ms")
+    print(f"Memoized get_all_important_dates(): {memoized_ms:.2f} ms")
+    print(f"get_date_table() (uncached):   {table_ms:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
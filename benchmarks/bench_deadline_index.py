@@ -0,0 +1,103 @@
+"""
+Benchmark: date-window queries over IMPORTANT_DATE at 100k dates
+
+Compares a linear scan of the start-sorted dates (what every window query cost
+before) with the interval trees built by DeadlineIndex, for "everything
+overlapping a 30-day window" and "program X in the next 90 days".
+
+Run with: python benchmarks/bench_deadline_index.py [number_of_dates]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.deadline_index import DeadlineIndex
+
+DEFAULT_DATES = 100000
+PROGRAMS = 500
+EVENT_TYPES = ['Application Open', 'Application Deadline', 'Document Submission',
+               'Interview', 'Offer Release', 'Registration', 'Orientation']
+
+
+def synthetic_rows(size, today, seed=42):
+    """Dates spread over ten years around today, a few without an end date"""
+    rng = random.Random(seed)
+    rows = []
+    for date_id in range(1, size + 1):
+        start = today + timedelta(days=rng.randint(-1825, 1825))
+        end = None if rng.random() < 0.05 else start + timedelta(days=rng.randint(0, 60))
+        program_id = rng.randint(1, PROGRAMS)
+        rows.append({
+            'date_id': date_id,
+            'event_type': rng.choice(EVENT_TYPES),
+            'start_date': start,
+            'end_date': end,
+            'description': None,
+            'program_name': f"Programme {program_id:03d}",
+            'program_id': program_id,
+            'level': 'Bachelor',
+        })
+    rows.sort(key=lambda row: (row['start_date'], row['date_id']))
+    return rows
+
+
+def build_index(rows, today):
+    index = DeadlineIndex(ttl=float('inf'))
+    index._rows = rows
+    index._build_trees()
+    index._materialize(today)
+    index._loaded_at = time.monotonic()
+    index._loaded_stamp = index._read_stamp()
+    return index
+
+
+def scan_window(entries, start, end, program_id=None):
+    return [e for e in entries
+            if e['start_date'] <= end and (e['end_date'] or e['start_date']) >= start
+            and (program_id is None or e['program_id'] == program_id)]
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DATES
+    today = date.today()
+    rows = synthetic_rows(size, today)
+
+    started = time.perf_counter()
+    index = build_index(rows, today)
+    build_ms = (time.perf_counter() - started) * 1000
+    entries = index.all()
+
+    window_start, window_end = today + timedelta(days=100), today + timedelta(days=130)
+    scanned, scan_ms = timed(lambda: scan_window(entries, window_start, window_end), 20)
+    found, tree_ms = timed(lambda: index.window(window_start, window_end), 200)
+    if scanned != found:
+        print("Warning: window() does not match the linear scan")
+
+    horizon = today + timedelta(days=90)
+    program_scanned, program_scan_ms = timed(lambda: scan_window(entries, today, horizon, 42), 20)
+    program_found, program_tree_ms = timed(lambda: index.upcoming_within(90, program_id=42), 200)
+    if program_scanned != program_found:
+        print("Warning: upcoming_within() does not match the linear scan")
+
+    print(f"Dates: {size} across {PROGRAMS} programs (index built in {build_ms:.0f} ms)")
+    print(f"30-day window ({len(found)} dates):")
+    print(f"  Linear scan:    {scan_ms:.3f} ms")
+    print(f"  Interval tree:  {tree_ms:.3f} ms")
+    print(f"Program 42, next 90 days ({len(program_found)} dates):")
+    print(f"  Linear scan:    {program_scan_ms:.3f} ms")
+    print(f"  Interval tree:  {program_tree_ms:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: single-pass intent classifier vs. one re.search per pattern
+
+Uses user messages from CHAT_MESSAGE as the corpus (falls back to a small
+built-in sample if the database is not reachable).
+Run with: python benchmarks/bench_intent_classifier.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.chatbot_handler import INTENT_PATTERNS, detect_intent
+from utils.db_helper import get_db_connection
+
+SAMPLE_MESSAGES = [
+    "What are the entry requirements for Computer Science?",
+    "How do I apply for the Foundation in Science program?",
+    "When is the application deadline for the September intake?",
+    "What documents do I need to submit?",
+    "How much is the tuition fee for the MBA?",
+    "Tell me about the Bachelor of Information Technology course",
+    "Is there any scholarship or financial aid available?",
+    "hello",
+    "Can international students apply? What is the closing date?",
+    "I need a checklist of required documents and the application procedure",
+]
+
+
+def legacy_detect_intent(message):
+    """The original implementation: one re.search per pattern"""
+    message_lower = message.lower()
+    intent_scores = {}
+    for intent, patterns in INTENT_PATTERNS.items():
+        score = 0
+        for pattern in patterns:
+            if re.search(pattern, message_lower):
+                score += 1
+        if score > 0:
+            intent_scores[intent] = score
+    if intent_scores:
+        return max(intent_scores, key=intent_scores.get)
+    return 'general'
+
+
+def load_corpus(limit=5000):
+    """Load user messages from CHAT_MESSAGE"""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT message_text FROM CHAT_MESSAGE
+            WHERE sender_type = 'User'
+            ORDER BY message_id DESC
+            LIMIT %s
+        """, (limit,))
+        messages = [row[0] for row in cursor.fetchall() if row[0]]
+        cursor.close()
+        return messages
+    except Exception as e:
+        print(f"Could not load CHAT_MESSAGE corpus: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+def main():
+    corpus = load_corpus()
+    source = "CHAT_MESSAGE"
+    if not corpus:
+        corpus = SAMPLE_MESSAGES
+        source = "built-in sample"
+
+    mismatches = [m for m in corpus if legacy_detect_intent(m) != detect_intent(m)]
+    if mismatches:
+        print(f"✗ {len(mismatches)} message(s) classified differently, e.g. {mismatches[0]!r}")
+        return False
+
+    rounds = max(1, 20000 // len(corpus))
+    legacy = min(timeit.repeat(lambda: [legacy_detect_intent(m) for m in corpus], number=rounds, repeat=5))
+    compiled = min(timeit.repeat(lambda: [detect_intent(m) for m in corpus], number=rounds, repeat=5))
+    per_msg = rounds * len(corpus)
+
+    print(f"Corpus: {len(corpus)} message(s) from {source}")
+    print(f"Legacy (re.search per pattern): {legacy / per_msg * 1e6:8.2f} µs/message")
+    print(f"Single-pass matcher:            {compiled / per_msg * 1e6:8.2f} µs/message")
+    print(f"Speedup: {legacy / compiled:.1f}x")
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,112 @@
+"""
+Benchmark: pooled, parallel SMTP delivery vs. one connection per email
+
+Needs a local SMTP stand-in: pip install aiosmtpd
+
+Run with: python benchmarks/bench_mail_transport.py [number_of_emails] [server_delay_ms] [sessions]
+
+The delay is added to every SMTP command to stand in for the network round
+trip to a real mail server; STARTTLS and AUTH are not simulated, so the
+baseline here is faster than the real per-email handshake.
+"""
+import asyncio
+import os
+import smtplib
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from aiosmtpd.controller import Controller
+    HAS_AIOSMTPD = True
+except ImportError:
+    HAS_AIOSMTPD = False
+
+from utils.email_sender import build_message, deadline_reminder_content
+from utils.mail_transport import MailTransport, SMTPConnectionPool, SMTP_POOL_SIZE
+
+
+class CountingHandler:
+    """Accept every message, optionally after a fixed per-command delay"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.received = 0
+
+    async def _pause(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await self._pause()
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await self._pause()
+        envelope.mail_from = address
+        return '250 OK'
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await self._pause()
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        await self._pause()
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+
+def legacy_send(host, port, msg):
+    """What send_email used to do: connect, send and quit for every email"""
+    server = smtplib.SMTP(host, port)
+    server.send_message(msg)
+    server.quit()
+
+
+def main():
+    if not HAS_AIOSMTPD:
+        print("aiosmtpd is not installed: pip install aiosmtpd")
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    sessions = int(sys.argv[3]) if len(sys.argv) > 3 else SMTP_POOL_SIZE
+
+    handler = CountingHandler(delay)
+    controller = Controller(handler, hostname='127.0.0.1', port=8025)
+    controller.start()
+    try:
+        subject, body_html, body_text = deadline_reminder_content('Bachelor of Computer Science (Honours)',
+                                                                  '2026-12-31', 14)
+        messages = [build_message(f"applicant{i}@example.com", subject, body_html, body_text)
+                    for i in range(count)]
+
+        # The per-connection baseline is slow, so time a sample and extrapolate
+        sample = messages[:max(1, min(count, 200))]
+        started = time.perf_counter()
+        for msg in sample:
+            legacy_send('127.0.0.1', 8025, msg)
+        legacy_rate = len(sample) / (time.perf_counter() - started)
+
+        transport = MailTransport(SMTPConnectionPool('127.0.0.1', 8025, use_tls=False, size=sessions))
+        started = time.perf_counter()
+        results = transport.send_many(messages)
+        pooled_elapsed = time.perf_counter() - started
+        transport.close()
+        pooled_rate = count / pooled_elapsed
+
+        print(f"Server delay per SMTP command: {delay * 1000:.1f} ms")
+        print(f"One connection per email: {legacy_rate:.0f} emails/s "
+              f"(~{count / legacy_rate:.1f} s for {count})")
+        print(f"Pooled, {sessions} sessions:      {pooled_rate:.0f} emails/s "
+              f"({pooled_elapsed:.1f} s for {count}, {results.count(False)} failed)")
+        print(f"Speed-up: {pooled_rate / legacy_rate:.1f}x; pool stats: {transport.pool.stats()}")
+    finally:
+        controller.stop()
+
+
+if __name__ == '__main__':
+    main()
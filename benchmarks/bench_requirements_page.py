@@ -0,0 +1,133 @@
+"""
+Benchmark: grouping and rendering the requirements list at 10x catalog size
+
+Compares the old per-row grouping of the joined PROGRAM/ADMISSION_REQUIREMENT
+result with group_by_faculty(), then renders requirements_list.html.
+
+Run with: python benchmarks/bench_requirements_page.py [number_of_programs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template
+
+from app import app
+from utils.program_catalog import group_by_faculty
+
+# Roughly the number of programs in Database/data.sql plus the setup scripts, times 10
+DEFAULT_PROGRAMS = 600
+QUALIFICATIONS = ['STPM', 'UEC', 'A-Level', 'SAM', 'Matriculation', 'Foundation', 'Diploma', 'SPM']
+LEVELS = ['Bachelor', 'Bachelor', 'Bachelor', 'Diploma', 'Master', 'PhD']
+
+
+def synthetic_catalog(size, seed=42):
+    rng = random.Random(seed)
+    faculties = [f"Faculty of Studies {i:02d}" for i in range(max(1, size // 25))]
+    programs = []
+    requirements = {}
+    requirement_id = 0
+    for program_id in range(1, size + 1):
+        faculty_id = rng.randrange(len(faculties))
+        programs.append({
+            'program_id': program_id,
+            'program_name': f"Programme {program_id:05d}",
+            'level': rng.choice(LEVELS),
+            'duration_years': rng.choice([2, 3, 4]),
+            'faculty_id': faculty_id,
+            'faculty_name': faculties[faculty_id],
+        })
+        rows = []
+        for qualification in rng.sample(QUALIFICATIONS, rng.randint(4, len(QUALIFICATIONS))):
+            requirement_id += 1
+            rows.append({
+                'requirement_id': requirement_id,
+                'program_id': program_id,
+                'qualification_type': qualification,
+                'minimum_grade': 'CGPA 2.50',
+                'additional_requirements': 'Credit in Mathematics and English at SPM level',
+            })
+        requirements[program_id] = rows
+    programs.sort(key=lambda p: (p['faculty_name'], p['program_name']))
+    return programs, requirements
+
+
+def joined_rows(programs, requirements, levels):
+    """The rows the old LEFT JOIN query returned"""
+    rows = []
+    for program in programs:
+        if program['level'] not in levels:
+            continue
+        reqs = sorted(requirements.get(program['program_id'], []), key=lambda r: r['qualification_type'])
+        for req in reqs or [{'qualification_type': None, 'minimum_grade': None, 'additional_requirements': None}]:
+            rows.append(dict(program, **{k: req[k] for k in ('qualification_type', 'minimum_grade',
+                                                              'additional_requirements')}))
+    return rows
+
+
+def legacy_group(rows):
+    faculties = {}
+    for row in rows:
+        faculty_id = row['faculty_id']
+        if faculty_id not in faculties:
+            faculties[faculty_id] = {'faculty_name': row['faculty_name'], 'programs': {}}
+        program_id = row['program_id']
+        if program_id not in faculties[faculty_id]['programs']:
+            faculties[faculty_id]['programs'][program_id] = {
+                'program_name': row['program_name'],
+                'level': row['level'],
+                'duration_years': row['duration_years'],
+                'requirements': []
+            }
+        if row['qualification_type']:
+            faculties[faculty_id]['programs'][program_id]['requirements'].append({
+                'qualification_type': row['qualification_type'],
+                'minimum_grade': row['minimum_grade'],
+                'additional_requirements': row['additional_requirements']
+            })
+    return faculties
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROGRAMS
+    programs, requirements = synthetic_catalog(size)
+    undergrad = [p for p in programs if p['level'] in ('Bachelor', 'Diploma')]
+    postgrad = [p for p in programs if p['level'] in ('Master', 'PhD')]
+    undergrad_rows = joined_rows(programs, requirements, ('Bachelor', 'Diploma'))
+    postgrad_rows = joined_rows(programs, requirements, ('Master', 'PhD'))
+
+    legacy, legacy_ms = timed(lambda: (legacy_group(undergrad_rows), legacy_group(postgrad_rows)), 20)
+    grouped, grouped_ms = timed(lambda: (group_by_faculty(undergrad, requirements),
+                                         group_by_faculty(postgrad, requirements)), 20)
+    if legacy != grouped:
+        print("Warning: group_by_faculty() does not match the legacy grouping")
+
+    foundation_programs = {
+        key: {'program_name': name, 'duration_years': 1, 'requirements': [], 'suggested_degrees': []}
+        for key, name in (('science', 'Foundation in Science'), ('arts', 'Foundation in Arts'))
+    }
+    with app.test_request_context('/admission/requirements'):
+        html, render_ms = timed(lambda: render_template('admission/requirements_list.html',
+                                                        undergrad_faculties=grouped[0],
+                                                        postgrad_faculties=grouped[1],
+                                                        foundation_programs=foundation_programs), 5)
+
+    total_requirements = sum(len(rows) for rows in requirements.values())
+    print(f"Catalog: {size} programs, {total_requirements} requirements")
+    print(f"Legacy row grouping:  {legacy_ms:.2f} ms")
+    print(f"group_by_faculty():   {grouped_ms:.2f} ms (built once per catalog load)")
+    print(f"Template render:      {render_ms:.1f} ms ({len(html) // 1024} KiB of HTML)")
+
+
+if __name__ == '__main__':
+    main()
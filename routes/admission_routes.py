@@ -1,18 +1,26 @@
 """
 Admission Routes - Main admission pages and procedures
 """
-from flask import Blueprint, render_template, request, jsonify, session
-from utils.db_helper import get_db_connection
+from flask import Blueprint, render_template, request, jsonify, session, Response
+from utils.db_helper import get_db_connection, PoolTimeoutError
+from utils.application_submission import submit_application as record_application, SubmissionError
+from utils.document_store import get_document_store
 from utils.eligibility_checker import EligibilityChecker
 from utils.document_generator import DocumentChecklistGenerator
-from utils.deadline_tracker import DeadlineTracker
+from utils.deadline_index import get_deadline_index
+from utils.ical_feed import program_feed, level_feed, feed_timestamp, STUDENT_TYPES
+from utils.program_catalog import get_catalog
+from utils.page_cache import cached_page, catalog_version
 from flask import send_file
-from datetime import datetime
+from datetime import datetime, date
 import io
 
 # Try to import email sender
 try:
     from utils.email_sender import send_deadline_reminder, check_and_send_reminders, send_email
+    from utils.email_outbox import enqueue_email, make_idempotency_key
+    from utils.email_templates import render_subscription_confirmation
+    from utils.reminder_scheduler import get_reminder_scheduler
     HAS_EMAIL_SENDER = True
 except ImportError:
     HAS_EMAIL_SENDER = False
@@ -20,7 +28,10 @@ except ImportError:
 
 # Try to import ApplicationFormGenerator, but don't fail if reportlab isn't installed
 try:
-    from utils.application_form_generator import ApplicationFormGenerator
+    from utils.application_form_generator import ApplicationFormGenerator, get_blank_form
+    from utils.form_cache import (
+        get_form_renderer, get_program_form, get_all_program_forms_zip, program_form_spec, form_filename
+    )
     HAS_PDF_GENERATOR = True
 except ImportError:
     HAS_PDF_GENERATOR = False
@@ -31,106 +42,35 @@ bp = Blueprint('admission', __name__, url_prefix='/admission')
 @bp.route('/')
 def admission_home():
     """Admission module home page"""
-    conn = get_db_connection()
-    if not conn:
-        return render_template('error.html', message="Database connection failed"), 500
-    
     try:
-        cursor = conn.cursor(dictionary=True)
-        
         # Get all programs grouped by level
-        cursor.execute("""
-            SELECT p.program_id, p.program_name, p.level, p.duration_years,
-                   f.faculty_name, p.description
-            FROM PROGRAM p
-            JOIN FACULTY f ON p.faculty_id = f.faculty_id
-            ORDER BY 
-                CASE p.level
-                    WHEN 'Foundation' THEN 1
-                    WHEN 'Diploma' THEN 2
-                    WHEN 'Bachelor' THEN 3
-                    WHEN 'Master' THEN 4
-                    WHEN 'PhD' THEN 5
-                    ELSE 6
-                END,
-                f.faculty_name, 
-                p.program_name
-        """)
-        all_programs = cursor.fetchall()
-        
-        # Group programs by level
-        programs_by_level = {
-            'Foundation': [],
-            'Diploma': [],
-            'Bachelor': [],
-            'Master': [],
-            'PhD': []
-        }
-        
-        for program in all_programs:
-            level = program['level']
-            # Debug: print levels found (can remove later)
-            # print(f"Found program: {program['program_name']} with level: {level}")
-            if level in programs_by_level:
-                programs_by_level[level].append(program)
-            # Also handle case where level might be stored differently
-            elif level and level.lower() == 'foundation':
-                programs_by_level['Foundation'].append(program)
+        programs_by_level = get_catalog().programs_by_level()
         
         # Get upcoming deadlines
-        cursor.execute("""
-            SELECT event_type, start_date, end_date, id.description,
-                   p.program_name, p.program_id
-            FROM IMPORTANT_DATE id
-            JOIN PROGRAM p ON id.program_id = p.program_id
-            WHERE end_date >= CURDATE()
-            ORDER BY start_date ASC
-            LIMIT 10
-        """)
-        deadlines = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        deadlines = get_deadline_index().upcoming(10)
         
         return render_template('admission/home.html', 
                              programs_by_level=programs_by_level, 
                              deadlines=deadlines)
     except Exception as e:
-        if conn:
-            conn.close()
         return render_template('error.html', message=str(e)), 500
 
 @bp.route('/requirements')
+@cached_page()
 def requirements():
     """Admission requirements page"""
     program_id = request.args.get('program_id', type=int)
     
-    conn = get_db_connection()
-    if not conn:
-        return render_template('error.html', message="Database connection failed"), 500
-    
     try:
-        cursor = conn.cursor(dictionary=True)
+        catalog = get_catalog()
         
         if program_id:
             # Get specific program requirements
-            cursor.execute("""
-                SELECT p.program_id, p.program_name, p.level, p.duration_years,
-                       f.faculty_name, p.description,
-                       ar.requirement_id, ar.qualification_type, ar.minimum_grade,
-                       ar.additional_requirements, ar.entrance_exam_info
-                FROM PROGRAM p
-                JOIN FACULTY f ON p.faculty_id = f.faculty_id
-                LEFT JOIN ADMISSION_REQUIREMENT ar ON p.program_id = ar.program_id
-                WHERE p.program_id = %s
-            """, (program_id,))
-            requirements = cursor.fetchall()
-            
-            if not requirements:
+            program_info = catalog.get_program(program_id)
+            if not program_info:
                 return render_template('error.html', message="Program not found"), 404
             
-            program_info = requirements[0]
-            requirements_list = [r for r in requirements if r['requirement_id']]
+            requirements_list = catalog.requirements(program_id)
             
             # Sort requirements by priority order (like UTAR website)
             qualification_order = ['STPM', 'UEC', 'A-Level', 'SAM', 'Matriculation', 'Foundation', 'Diploma', 'SPM']
@@ -140,100 +80,16 @@ def requirements():
                 else 999
             ))
             
-            cursor.close()
-            conn.close()
-            
             return render_template('admission/requirements.html',
                                  program=program_info,
                                  requirements=requirements_list)
         else:
-            # Get undergraduate programs (Bachelor, Diploma) grouped by faculty with requirements
-            cursor.execute("""
-                SELECT p.program_id, p.program_name, p.level, p.duration_years,
-                       f.faculty_id, f.faculty_name,
-                       ar.qualification_type, ar.minimum_grade, ar.additional_requirements
-                FROM PROGRAM p
-                JOIN FACULTY f ON p.faculty_id = f.faculty_id
-                LEFT JOIN ADMISSION_REQUIREMENT ar ON p.program_id = ar.program_id
-                WHERE p.level IN ('Bachelor', 'Diploma')
-                ORDER BY f.faculty_name, p.program_name, ar.qualification_type
-            """)
-            undergrad_data = cursor.fetchall()
-            
-            # Get postgraduate programs (Master, PhD) grouped by faculty with requirements
-            cursor.execute("""
-                SELECT p.program_id, p.program_name, p.level, p.duration_years,
-                       f.faculty_id, f.faculty_name,
-                       ar.qualification_type, ar.minimum_grade, ar.additional_requirements
-                FROM PROGRAM p
-                JOIN FACULTY f ON p.faculty_id = f.faculty_id
-                LEFT JOIN ADMISSION_REQUIREMENT ar ON p.program_id = ar.program_id
-                WHERE p.level IN ('Master', 'PhD')
-                ORDER BY f.faculty_name, p.program_name, ar.qualification_type
-            """)
-            postgrad_data = cursor.fetchall()
+            # Undergraduate and postgraduate programs grouped by faculty with requirements
+            undergrad_faculties = catalog.faculty_tree(('Bachelor', 'Diploma'))
+            postgrad_faculties = catalog.faculty_tree(('Master', 'PhD'))
             
             # Get all Bachelor programs for foundation suggestions
-            cursor.execute("""
-                SELECT p.program_id, p.program_name, p.level, f.faculty_name
-                FROM PROGRAM p
-                JOIN FACULTY f ON p.faculty_id = f.faculty_id
-                WHERE p.level = 'Bachelor'
-                ORDER BY f.faculty_name, p.program_name
-            """)
-            bachelor_programs = cursor.fetchall()
-            
-            # Group undergraduate programs by faculty
-            undergrad_faculties = {}
-            for row in undergrad_data:
-                faculty_id = row['faculty_id']
-                if faculty_id not in undergrad_faculties:
-                    undergrad_faculties[faculty_id] = {
-                        'faculty_name': row['faculty_name'],
-                        'programs': {}
-                    }
-                
-                program_id = row['program_id']
-                if program_id not in undergrad_faculties[faculty_id]['programs']:
-                    undergrad_faculties[faculty_id]['programs'][program_id] = {
-                        'program_name': row['program_name'],
-                        'level': row['level'],
-                        'duration_years': row['duration_years'],
-                        'requirements': []
-                    }
-                
-                if row['qualification_type']:
-                    undergrad_faculties[faculty_id]['programs'][program_id]['requirements'].append({
-                        'qualification_type': row['qualification_type'],
-                        'minimum_grade': row['minimum_grade'],
-                        'additional_requirements': row['additional_requirements']
-                    })
-            
-            # Group postgraduate programs by faculty
-            postgrad_faculties = {}
-            for row in postgrad_data:
-                faculty_id = row['faculty_id']
-                if faculty_id not in postgrad_faculties:
-                    postgrad_faculties[faculty_id] = {
-                        'faculty_name': row['faculty_name'],
-                        'programs': {}
-                    }
-                
-                program_id = row['program_id']
-                if program_id not in postgrad_faculties[faculty_id]['programs']:
-                    postgrad_faculties[faculty_id]['programs'][program_id] = {
-                        'program_name': row['program_name'],
-                        'level': row['level'],
-                        'duration_years': row['duration_years'],
-                        'requirements': []
-                    }
-                
-                if row['qualification_type']:
-                    postgrad_faculties[faculty_id]['programs'][program_id]['requirements'].append({
-                        'qualification_type': row['qualification_type'],
-                        'minimum_grade': row['minimum_grade'],
-                        'additional_requirements': row['additional_requirements']
-                    })
+            bachelor_programs = catalog.programs(level='Bachelor')
             
             # Create Foundation programs data structure
             foundation_programs = {
@@ -273,16 +129,11 @@ def requirements():
                 if is_arts:
                     foundation_programs['arts']['suggested_degrees'].append(prog_info)
             
-            cursor.close()
-            conn.close()
-            
             return render_template('admission/requirements_list.html',
                                  undergrad_faculties=undergrad_faculties,
                                  postgrad_faculties=postgrad_faculties,
                                  foundation_programs=foundation_programs)
     except Exception as e:
-        if conn:
-            conn.close()
         return render_template('error.html', message=str(e)), 500
 
 @bp.route('/check-eligibility')
@@ -295,125 +146,143 @@ def application_procedure():
     """Application procedure page"""
     procedure_type = request.args.get('type', 'online')  # online or offline
     
-    conn = get_db_connection()
-    if not conn:
-        return render_template('error.html', message="Database connection failed"), 500
-    
     try:
-        cursor = conn.cursor(dictionary=True)
-        
         # Get all programs for selection
-        cursor.execute("""
-            SELECT p.program_id, p.program_name, p.level,
-                   f.faculty_name
-            FROM PROGRAM p
-            JOIN FACULTY f ON p.faculty_id = f.faculty_id
-            ORDER BY f.faculty_name, p.program_name
-        """)
-        programs = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        programs = get_catalog().programs()
         
         return render_template('admission/application_procedure.html',
                              procedure_type=procedure_type,
                              programs=programs)
     except Exception as e:
-        if conn:
-            conn.close()
         return render_template('error.html', message=str(e)), 500
 
 @bp.route('/application-form')
 def application_form():
     """Online application form page"""
-    conn = get_db_connection()
-    if not conn:
-        return render_template('error.html', message="Database connection failed"), 500
-    
     try:
-        cursor = conn.cursor(dictionary=True)
-        
         # Get all programs for selection
-        cursor.execute("""
-            SELECT p.program_id, p.program_name, p.level,
-                   f.faculty_name
-            FROM PROGRAM p
-            JOIN FACULTY f ON p.faculty_id = f.faculty_id
-            ORDER BY f.faculty_name, p.program_name
-        """)
-        programs = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        programs = get_catalog().programs()
         
         return render_template('admission/application_form.html',
                              programs=programs)
     except Exception as e:
-        if conn:
-            conn.close()
         return render_template('error.html', message=str(e)), 500
 
 @bp.route('/submit-application', methods=['POST'])
 def submit_application():
     """Handle application form submission"""
     try:
-        # Get form data
-        form_data = request.form.to_dict()
-        files = request.files
-        
-        # Here you would typically:
-        # 1. Validate the form data
-        # 2. Save uploaded files
-        # 3. Store application in database
-        # 4. Send confirmation email
-        # 5. Generate application reference number
-        
-        # For now, return a success message
+        submission = record_application(request.form, request.files)
         return jsonify({
             'success': True,
             'message': 'Application submitted successfully!',
-            'reference_number': 'APP' + datetime.now().strftime('%Y%m%d%H%M%S')
+            'reference_number': submission.reference_number,
+            'documents': len(submission.documents)
         }), 200
         
+    except SubmissionError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Please correct the following: ' + '; '.join(e.errors),
+            'errors': e.errors
+        }), 400
+    except PoolTimeoutError:
+        # Every connection is busy (deadline rush): ask the client to retry shortly
+        response = jsonify({
+            'success': False,
+            'message': 'The server is busy. Please try submitting again in a moment.'
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error submitting application: {str(e)}'
         }), 500
 
-@bp.route('/deadlines')
-def deadlines():
-    """Important dates and deadlines page with calendar view"""
+@bp.route('/applications/<reference_number>/documents/<int:doc_id>')
+def download_application_document(reference_number, doc_id):
+    """Download an uploaded document; the reference number is required to reach it"""
     conn = get_db_connection()
     if not conn:
-        return render_template('error.html', message="Database connection failed"), 500
+        return jsonify({'error': 'Database connection failed'}), 500
     
     try:
-        tracker = DeadlineTracker(conn)
-        upcoming_dates = tracker.get_upcoming_dates()
-        all_dates = tracker.get_all_dates()
-        
-        # Get all programs for email subscription
         cursor = conn.cursor(dictionary=True)
         cursor.execute("""
-            SELECT p.program_id, p.program_name, p.level, f.faculty_name
-            FROM PROGRAM p
-            JOIN FACULTY f ON p.faculty_id = f.faculty_id
-            ORDER BY p.level, f.faculty_name, p.program_name
-        """)
-        programs = cursor.fetchall()
+            SELECT d.file_path, d.original_filename, d.content_type, d.sha256
+            FROM APPLICATION_DOCUMENT d
+            JOIN APPLICATION a ON d.application_id = a.application_id
+            WHERE a.reference_number = %s AND d.doc_id = %s
+        """, (reference_number, doc_id))
+        document = cursor.fetchone()
         cursor.close()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
         conn.close()
+    
+    if not document:
+        return jsonify({'error': 'Document not found'}), 404
+    
+    path = get_document_store().path_for(document['sha256']) if document['sha256'] else document['file_path']
+    # send_file hands the open file to the server (sendfile / X-Sendfile), so it is not copied through Python
+    response = send_file(path, mimetype=document['content_type'] or 'application/octet-stream',
+                         as_attachment=True, download_name=document['original_filename'] or f"document-{doc_id}",
+                         etag=document['sha256'] or True, conditional=True, max_age=86400)
+    # Content-addressed blobs never change, but they are personal documents
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+def _deadlines_version():
+    # Deadline status depends on today's date as well as the catalog and the dates
+    return (catalog_version(), get_deadline_index().version, date.today())
+
+@bp.route('/deadlines')
+@cached_page(validator=_deadlines_version, vary_query=False)
+def deadlines():
+    """Important dates and deadlines page with calendar view"""
+    try:
+        # Get all programs for email subscription
+        programs = get_catalog().programs(order_by_level=True)
         
-        return render_template('admission/deadlines_calendar.html',
-                             upcoming_dates=upcoming_dates,
-                             all_dates=all_dates,
-                             programs=programs)
+        return render_template('admission/deadlines_calendar.html', programs=programs)
     except Exception as e:
-        if conn:
-            conn.close()
         return render_template('error.html', message=str(e)), 500
 
+def _calendar_response(feed, updated):
+    if feed is None:
+        return jsonify({'error': 'Calendar not found'}), 404
+    response = Response(feed, mimetype='text/calendar')
+    # Same data, same bytes and Last-Modified in every process (see utils/ical_feed.py)
+    response.last_modified = updated
+    return response
+
+def _student_type():
+    student = request.args.get('student')
+    return student if student in STUDENT_TYPES else None
+
+@bp.route('/calendar/program/<int:program_id>.ics')
+@cached_page(validator=_deadlines_version, vary_query=_student_type)
+def program_calendar(program_id):
+    """iCalendar feed of a program's important dates (?student=local|international)"""
+    try:
+        updated = feed_timestamp()
+        return _calendar_response(program_feed(program_id, _student_type(), updated), updated)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/calendar/level/<level>.ics')
+@cached_page(validator=_deadlines_version, vary_query=_student_type)
+def level_calendar(level):
+    """iCalendar feed of the important dates of every program at a level"""
+    try:
+        updated = feed_timestamp()
+        return _calendar_response(level_feed(level, _student_type(), updated), updated)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/subscribe-email', methods=['POST'])
 def subscribe_email():
     """Subscribe user to email notifications for deadline reminders"""
@@ -471,44 +340,22 @@ def subscribe_email():
             except Exception as e:
                 print(f"Warning: Could not fetch program names: {e}")
             
+            # Queue the confirmation email in the same transaction; the outbox worker sends it
+            if HAS_EMAIL_SENDER:
+                try:
+                    subject, body_html = render_subscription_confirmation(program_names)
+                    # One confirmation per address, program selection and day
+                    key = make_idempotency_key('subscription-confirmation', email.lower(),
+                                               sorted(subscribed_programs), date.today())
+                    enqueue_email(email, subject, body_html, idempotency_key=key, conn=conn)
+                except Exception as e:
+                    print(f"Warning: Could not queue confirmation email: {e}")
+            
         conn.commit()
         cursor.close()
         conn.close()
         
         if subscribed_programs:
-            # Send confirmation email if email sender is available
-            if HAS_EMAIL_SENDER:
-                try:
-                    # Send confirmation email
-                    subject = "Email Subscription Confirmation - SKL University"
-                    body_html = f"""
-                    <html>
-                      <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                          <h2 style="color: #1e3a8a;">Thank You for Subscribing!</h2>
-                          <p>Dear Applicant,</p>
-                          <p>You have successfully subscribed to email reminders for the following program(s):</p>
-                          <ul>
-                            {'<li>'.join([''] + program_names) if program_names else '<li>No programs selected</li>'}
-                          </ul>
-                          <p>You will receive email reminders <strong>14 days before</strong> application deadlines.</p>
-                          <p>If you did not subscribe to this service, please ignore this email.</p>
-                          <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;">
-                          <p style="font-size: 0.9em; color: #666;">
-                            Best regards,<br>
-                            <strong>SKL University Admission Office</strong><br>
-                            123, Jalan Bandar Timah, 31900 Kampar Perak.<br>
-                            Phone: +60-3-1234-5678<br>
-                            Email: SKL123@edu.my
-                          </p>
-                        </div>
-                      </body>
-                    </html>
-                    """
-                    send_email(email, subject, body_html)
-                except Exception as e:
-                    print(f"Warning: Could not send confirmation email: {e}")
-            
             return jsonify({
                 'success': True, 
                 'message': f'Successfully subscribed to email reminders for {len(subscribed_programs)} program(s)!'
@@ -523,24 +370,102 @@ def subscribe_email():
 
 @bp.route('/download-application-form')
 def download_application_form():
-    """Generate and download offline application form PDF"""
+    """
+    Download the offline application form PDF
+
+    Without program_id this is the blank form (rendered once, then served from
+    memory); with program_id (and optionally country) the form comes prefilled
+    with the program, its entry requirements and its document checklist.
+    """
     if not HAS_PDF_GENERATOR:
         return render_template('error.html', 
                              message="PDF form generation is not available. Please install reportlab: pip install reportlab"), 503
     
+    program_id = request.args.get('program_id', type=int)
+    if program_id is not None:
+        return _download_program_form(program_id, request.args.get('country', 'Malaysia'))
+    
     try:
-        generator = ApplicationFormGenerator()
-        pdf_buffer = generator.generate_form()
+        form = get_blank_form()
         
-        return send_file(
-            pdf_buffer,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f'SKL_Application_Form_{datetime.now().strftime("%Y%m%d")}.pdf'
+        response = Response(form.data, mimetype='application/pdf')
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename=SKL_Application_Form_{datetime.now().strftime("%Y%m%d")}.pdf'
         )
+        response.set_etag(form.etag)
+        response.last_modified = form.last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = 86400
+        # Handles If-None-Match / If-Modified-Since (304) and Range requests (206)
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(form.data))
     except Exception as e:
         return render_template('error.html', message=f"Error generating form: {str(e)}"), 500
 
+def _download_program_form(program_id, country):
+    """Serve the cached program-specific form"""
+    try:
+        form = get_program_form(program_id, country)
+        if form is None:
+            return render_template('error.html', message="Program not found"), 404
+        
+        key, path = form
+        program = get_catalog().get_program(program_id)
+        response = send_file(path, mimetype='application/pdf', as_attachment=True,
+                             download_name=f"SKL_Application_Form_{form_filename(program)}",
+                             etag=key[:32], conditional=True, max_age=3600)
+        response.cache_control.public = True
+        return response
+    except Exception as e:
+        return render_template('error.html', message=f"Error generating form: {str(e)}"), 500
+
+@bp.route('/application-form/prefilled', methods=['POST'])
+def prefilled_application_form():
+    """Application form PDF prefilled with the posted applicant details (never cached)"""
+    if not HAS_PDF_GENERATOR:
+        return jsonify({'error': 'PDF form generation is not available'}), 503
+    
+    applicant = request.get_json(silent=True) or request.form.to_dict()
+    try:
+        program_id = int(applicant.get('program_id') or applicant.get('program_choice_1'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'program_id is required'}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({'error': 'Database connection failed'}), 500
+    
+    try:
+        spec = program_form_spec(conn, program_id, applicant.get('nationality') or 'Malaysia', applicant)
+        if spec is None:
+            return jsonify({'error': 'Program not found'}), 404
+        data = get_form_renderer().render(spec)
+        
+        response = Response(data, mimetype='application/pdf')
+        response.headers['Content-Disposition'] = 'attachment; filename=SKL_Application_Form_Prefilled.pdf'
+        # Personal data: keep it out of shared and browser caches
+        response.cache_control.no_store = True
+        response.cache_control.private = True
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+@bp.route('/download-application-forms.zip')
+def download_application_forms_zip():
+    """ZIP with the prefilled form of every program"""
+    if not HAS_PDF_GENERATOR:
+        return render_template('error.html', 
+                             message="PDF form generation is not available. Please install reportlab: pip install reportlab"), 503
+    
+    try:
+        key, path = get_all_program_forms_zip(request.args.get('country', 'Malaysia'))
+        return send_file(path, mimetype='application/zip', as_attachment=True,
+                         download_name='SKL_Application_Forms.zip',
+                         etag=key[:32], conditional=True, max_age=3600)
+    except Exception as e:
+        return render_template('error.html', message=f"Error generating forms: {str(e)}"), 500
+
 @bp.route('/document-checklist')
 def document_checklist():
     """Document checklist page"""
@@ -565,19 +490,11 @@ def document_checklist():
                                  program=program_info,
                                  country=country)
         else:
-            # Get all programs for selection
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT p.program_id, p.program_name, p.level,
-                       f.faculty_name
-                FROM PROGRAM p
-                JOIN FACULTY f ON p.faculty_id = f.faculty_id
-                ORDER BY f.faculty_name, p.program_name
-            """)
-            programs = cursor.fetchall()
-            cursor.close()
             conn.close()
             
+            # Get all programs for selection
+            programs = get_catalog().programs()
+            
             return render_template('admission/document_checklist_select.html',
                                  programs=programs)
     except Exception as e:
@@ -587,7 +504,7 @@ def document_checklist():
 
 @bp.route('/send-email-reminders', methods=['POST'])
 def send_email_reminders():
-    """Manually trigger email reminder sending (for testing or scheduled tasks)"""
+    """Run the daily reminder job now (normally started by the reminder scheduler)"""
     if not HAS_EMAIL_SENDER:
         return jsonify({
             'success': False, 
@@ -595,15 +512,24 @@ def send_email_reminders():
         }), 503
     
     try:
-        sent_count = check_and_send_reminders()
+        result = get_reminder_scheduler().run_now()
+        if result['status'] == 'skipped':
+            return jsonify({
+                'success': False,
+                'message': f"Reminder run skipped: {result['reason']}."
+            }), 409
+        if result['status'] == 'failed':
+            return jsonify({
+                'success': False,
+                'message': f"Error sending reminders: {result['error']}"
+            }), 500
         return jsonify({
             'success': True,
-            'message': f'Email reminder check completed. Sent {sent_count} reminder(s).'
+            'message': f"Email reminder check completed. Queued {result['queued']} reminder(s) for delivery.",
+            'run': result
         }), 200
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error sending reminders: {str(e)}'
         }), 500
-
-
@@ -1,12 +1,19 @@
 """
 API Routes - RESTful endpoints for admission module
 """
-from flask import Blueprint, request, jsonify
-from utils.db_helper import get_db_connection
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from utils.db_helper import get_db_connection, get_pool_stats
 from utils.eligibility_checker import EligibilityChecker
+from utils.eligibility_engine import get_eligibility_engine
+from utils import batch_screening
 from utils.document_generator import DocumentChecklistGenerator
 from utils.deadline_tracker import DeadlineTracker
+from utils.deadline_index import URGENCY_LEVELS, STATUSES, DEADLINE_PAGE_SIZE
+from utils.program_catalog import get_catalog
+from utils.reminder_scheduler import get_reminder_scheduler
 import json
+import tempfile
+from datetime import date
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -46,6 +53,90 @@ def api_check_eligibility():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/check-eligibility/batch', methods=['POST'])
+def api_check_eligibility_batch():
+    """
+    API endpoint for screening a CSV or JSONL file of applicants
+
+    Accepts a multipart upload ('file') or a raw request body and streams one
+    JSON result per line, followed by a summary line.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload:
+            # Uploaded files are closed when the view returns, before the response streams
+            spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+            upload.save(spool)
+            spool.seek(0)
+            stream = batch_screening.open_text_stream(spool)
+            fmt = request.args.get('format') or batch_screening.detect_format(upload.filename, upload.mimetype)
+        elif request.content_length:
+            stream = batch_screening.open_text_stream(request.stream)
+            fmt = request.args.get('format') or batch_screening.detect_format(content_type=request.content_type)
+        else:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        if fmt not in ('csv', 'jsonl'):
+            return jsonify({'error': 'Unsupported format'}), 400
+        
+        # Version first: a reload in between only means the pool is rebuilt once more
+        version = get_catalog().version
+        requirements = batch_screening.load_requirement_table()
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        summary = batch_screening.ScreeningSummary()
+        try:
+            applicants = batch_screening.read_applicants(stream, fmt)
+            # All requests share one pool of BATCH_SCREENING_WORKERS processes
+            with batch_screening.shared_pool(version, requirements) as (pool, workers):
+                for result in batch_screening.screen_in_pool(pool, applicants, workers):
+                    summary.add(result)
+                    yield json.dumps(result, default=str) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': str(e)}) + '\n'
+        finally:
+            stream.close()
+        yield json.dumps({'summary': summary.as_dict()}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@bp.route('/eligible-programs', methods=['POST'])
+def api_eligible_programs():
+    """API endpoint listing every program the applicant is eligible for"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        qualification = data.get('qualification')
+        grades = data.get('grades', {})
+        additional_info = data.get('additional_info', {})
+        include_ineligible = bool(data.get('include_ineligible', False))
+        
+        if not qualification:
+            return jsonify({'error': 'Missing required fields'}), 400
+        
+        engine = get_eligibility_engine()
+        programs = engine.eligible_programs(
+            qualification=qualification,
+            grades=grades,
+            additional_info=additional_info,
+            include_ineligible=include_ineligible
+        )
+        
+        return jsonify({
+            'programs': programs,
+            'count': len(programs),
+            'programs_checked': len(engine)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/document-checklist', methods=['GET', 'POST'])
 def api_document_checklist():
     """API endpoint for document checklist generation"""
@@ -82,24 +173,27 @@ def api_document_checklist():
 
 @bp.route('/deadlines', methods=['GET'])
 def api_deadlines():
-    """API endpoint for deadline information"""
+    """Deadlines starting within the next `days` days, or overlapping the `from`/`to` window (YYYY-MM-DD)"""
+    program_id = request.args.get('program_id', type=int)
+    days_ahead = request.args.get('days', type=int, default=90)
     try:
-        program_id = request.args.get('program_id', type=int)
-        days_ahead = request.args.get('days', type=int, default=90)
-        
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        tracker = DeadlineTracker(conn)
+        window_start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        window_end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates in YYYY-MM-DD format'}), 400
+    if days_ahead < 0:
+        return jsonify({'error': 'days must not be negative'}), 400
+    
+    try:
+        tracker = DeadlineTracker()
         
-        if program_id:
+        if window_start or window_end:
+            dates = tracker.get_dates_between(window_start or date.min, window_end, program_id=program_id)
+        elif program_id:
             dates = tracker.get_program_dates(program_id, days_ahead)
         else:
             dates = tracker.get_upcoming_dates(days_ahead)
         
-        conn.close()
-        
         return jsonify({
             'deadlines': dates,
             'count': len(dates)
@@ -108,6 +202,30 @@ def api_deadlines():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/deadline-status', methods=['GET'])
+def api_deadline_status():
+    """Paginated important dates with status, urgency and days remaining (filter by program, level, status, urgency)"""
+    urgency = request.args.get('urgency')
+    status = request.args.get('status')
+    if urgency and urgency not in URGENCY_LEVELS:
+        return jsonify({'error': f"urgency must be one of {', '.join(URGENCY_LEVELS)}"}), 400
+    if status and status not in STATUSES:
+        return jsonify({'error': f"status must be one of {', '.join(STATUSES)}"}), 400
+    
+    try:
+        tracker = DeadlineTracker()
+        result = tracker.get_dates_page(
+            program_id=request.args.get('program_id', type=int),
+            level=request.args.get('level'),
+            status=status,
+            urgency=urgency,
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', DEADLINE_PAGE_SIZE, type=int)
+        )
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/programs', methods=['GET'])
 def api_programs():
     """API endpoint to get all programs"""
@@ -115,37 +233,19 @@ def api_programs():
         faculty_id = request.args.get('faculty_id', type=int)
         level = request.args.get('level')
         
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({'error': 'Database connection failed'}), 500
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        query = """
-            SELECT p.program_id, p.program_name, p.level, p.duration_years,
-                   p.description, p.career_prospects,
-                   f.faculty_id, f.faculty_name
-            FROM PROGRAM p
-            JOIN FACULTY f ON p.faculty_id = f.faculty_id
-            WHERE 1=1
-        """
-        params = []
-        
-        if faculty_id:
-            query += " AND f.faculty_id = %s"
-            params.append(faculty_id)
-        
-        if level:
-            query += " AND p.level = %s"
-            params.append(level)
-        
-        query += " ORDER BY f.faculty_name, p.program_name"
-        
-        cursor.execute(query, params)
-        programs = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        programs = [
+            {
+                'program_id': p['program_id'],
+                'program_name': p['program_name'],
+                'level': p['level'],
+                'duration_years': p['duration_years'],
+                'description': p['description'],
+                'career_prospects': p['career_prospects'],
+                'faculty_id': p['faculty_id'],
+                'faculty_name': p['faculty_name']
+            }
+            for p in get_catalog().programs(faculty_id=faculty_id or None, level=level or None)
+        ]
         
         return jsonify({
             'programs': programs,
@@ -181,4 +281,18 @@ def api_qualifications():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/db-pool-stats', methods=['GET'])
+def api_db_pool_stats():
+    """API endpoint exposing database connection pool metrics"""
+    try:
+        return jsonify(get_pool_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@bp.route('/reminder-scheduler-stats', methods=['GET'])
+def api_reminder_scheduler_stats():
+    """API endpoint exposing the deadline reminder scheduler's last run and throughput"""
+    try:
+        return jsonify(get_reminder_scheduler().stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,8 +2,8 @@
 Dialogflow webhook to return deep links for program-specific pages
 """
 from flask import Blueprint, request, jsonify
-from utils.db_helper import get_db_connection
-import re
+from utils.program_catalog import get_catalog
+from utils.program_matcher import ProgramMatcher, normalize_program_name
 import logging
 
 # Set up logging
@@ -12,47 +12,42 @@ logger = logging.getLogger(__name__)
 
 bp = Blueprint('dialogflow_webhook', __name__)
 
-# Simple in-memory cache to avoid repeated DB hits
+# In-memory cache to avoid repeated DB hits. It is rebuilt whenever the program
+# catalog reloads (CATALOG_TTL or invalidate_catalog()) or the base URL changes.
 _program_links_cache = None
 _program_names_cache = None
+_program_matcher = None
+_program_links_key = None  # (catalog version, base url) the caches were built for
 
 
 def _normalize_program_name(name: str) -> str:
     """Normalize program name for matching (lowercase, remove extra spaces)"""
-    if not name:
-        return ""
-    # Convert to lowercase, remove extra spaces, strip
-    normalized = re.sub(r'\s+', ' ', name.lower().strip())
-    return normalized
+    return normalize_program_name(name)
 
 
 def _build_program_links(base_url: str):
     """
     Build a mapping of program_name -> {requirements, deadlines, apply, documents}
-    using data from the PROGRAM table. base_url should be something like
+    using data from the program catalog. base_url should be something like
     https://yourdomain (derived from request.url_root).
     """
-    global _program_links_cache, _program_names_cache
-    if _program_links_cache is not None:
-        return _program_links_cache, _program_names_cache
-
-    conn = get_db_connection()
-    if not conn:
-        return {}, {}
+    global _program_links_cache, _program_names_cache, _program_matcher, _program_links_key
+    base = base_url.rstrip("/")
 
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT program_id, program_name FROM PROGRAM ORDER BY program_name")
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        catalog = get_catalog()
+        cache_key = (catalog.version, base)
+        if _program_links_cache is not None and _program_links_key == cache_key:
+            return _program_links_cache, _program_names_cache
+        rows = sorted(catalog.programs(), key=lambda row: row["program_name"])
     except Exception as e:
         logger.error(f"Dialogflow webhook: failed to load programs: {e}")
+        if _program_links_cache is not None:
+            return _program_links_cache, _program_names_cache
         return {}, {}
 
     links = {}
     names_map = {}  # normalized -> original name mapping
-    base = base_url.rstrip("/")
     
     for row in rows:
         pid = row["program_id"]
@@ -72,6 +67,8 @@ def _build_program_links(base_url: str):
     
     _program_links_cache = links
     _program_names_cache = names_map
+    _program_matcher = ProgramMatcher(links.keys())
+    _program_links_key = cache_key
     logger.info(f"Loaded {len(links)} programs into cache")
     return links, names_map
 
@@ -81,42 +78,15 @@ def _find_program_match(query_name: str, links_map: dict) -> tuple:
     Find the best matching program name.
     Returns (normalized_key, program_data) or (None, None) if not found.
     """
-    if not query_name:
+    if not query_name or not links_map:
         return None, None
     
-    normalized_query = _normalize_program_name(query_name)
-    
-    # Exact match first
-    if normalized_query in links_map:
-        return normalized_query, links_map[normalized_query]
-    
-    # Partial match - check if query is contained in any program name
-    for key, data in links_map.items():
-        if normalized_query in key or key in normalized_query:
-            return key, data
-    
-    # Fuzzy match - remove common words and try again
-    query_words = set(normalized_query.split())
-    common_words = {'in', 'of', 'the', 'and', 'for', 'to', 'a', 'an'}
-    query_words = query_words - common_words
-    
-    best_match = None
-    best_score = 0
-    
-    for key, data in links_map.items():
-        key_words = set(key.split())
-        key_words = key_words - common_words
-        
-        # Count matching words
-        matches = len(query_words & key_words)
-        if matches > 0 and matches > best_score:
-            best_score = matches
-            best_match = (key, data)
-    
-    if best_match:
-        return best_match
-    
-    return None, None
+    # The cached matcher indexes the cached links; anything else gets a throwaway index
+    matcher = _program_matcher if links_map is _program_links_cache else ProgramMatcher(links_map.keys())
+    key = matcher.match(query_name)
+    if key is None:
+        return None, None
+    return key, links_map[key]
 
 
 @bp.route('/dialogflow-webhook', methods=['POST'])
@@ -15,9 +15,13 @@ from reportlab.platypus import (
 )
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from datetime import datetime
+from collections import namedtuple
+from xml.sax.saxutils import escape
+from datetime import datetime, timezone
+import hashlib
 import io
 import os
+import threading
 
 
 class ApplicationFormGenerator:
@@ -168,12 +172,76 @@ class ApplicationFormGenerator:
 
         return table, field_table
 
-    def generate_form(self, output_path=None):
-        """Generate application form PDF"""
+    @staticmethod
+    def _choices(options, selected=None):
+        """Render '☐ A    ☐ B' with the selected option ticked"""
+        selected = (selected or '').strip().lower()
+        return "    ".join(
+            f"{'☒' if option.lower() == selected else '☐'} {option}" for option in options
+        )
+
+    def _build_requirements_section(self, story, requirements):
+        """List the program's entry requirements"""
+        rows = []
+        for req in requirements:
+            if not req.get("qualification_type"):
+                continue
+            details = escape(req.get("minimum_grade") or "")
+            if req.get("additional_requirements"):
+                details += "<br/>" + escape(req["additional_requirements"])
+            rows.append(
+                [
+                    Paragraph(escape(req["qualification_type"]) + ":", self.styles["FieldLabel"]),
+                    Paragraph(details, self.styles["FieldValue"]),
+                ]
+            )
+        if not rows:
+            return
+        r_header, r_table = self._build_section_table("ENTRY REQUIREMENTS", rows)
+        story.append(r_header)
+        story.append(r_table)
+        story.append(Spacer(1, 0.2 * inch))
+
+    @staticmethod
+    def _documents_text(checklist):
+        """Bullet list of the documents in a DocumentChecklistGenerator checklist"""
+        lines = []
+        for group in ("mandatory", "country_specific", "program_specific", "optional"):
+            for doc in checklist.get(group, []):
+                mandatory = doc.get("mandatory", group in ("mandatory", "program_specific"))
+                suffix = "" if mandatory else " (optional)"
+                lines.append(f"☐ {escape(doc['name'])}{suffix}")
+        return "<br/>".join(lines)
+
+    def generate_form(self, output_path=None, invariant=False, program=None, applicant=None,
+                      requirements=None, checklist=None):
+        """
+        Generate application form PDF
+
+        invariant=True leaves out the creation date and random document ID,
+        so the same form always produces byte-identical output.
+
+        Optional prefill data:
+            program: PROGRAM row (program_name, faculty_name, level)
+            applicant: Dict keyed like the online form (full_name, ic_passport, email, ...)
+            requirements: ADMISSION_REQUIREMENT rows, listed in an Entry Requirements section
+            checklist: DocumentChecklistGenerator.generate_checklist() result, replacing
+                       the generic document list in the submission instructions
+        """
+        program = program or {}
+        applicant = applicant or {}
+
+        def value(key, default=""):
+            text = applicant.get(key)
+            if text in (None, ""):
+                return default
+            return escape(str(text)).replace("\n", "<br/>")
+
         buffer = io.BytesIO() if output_path is None else output_path
 
         doc = SimpleDocTemplate(
             buffer,
+            invariant=invariant,
             pagesize=A4,
             rightMargin=0.75 * inch,
             leftMargin=0.75 * inch,
@@ -190,40 +258,47 @@ class ApplicationFormGenerator:
         personal_rows = [
             [
                 Paragraph("Full Name (as per IC/Passport):", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("full_name"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("IC/Passport Number:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("ic_passport"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Date of Birth (DD/MM/YYYY):", self.styles["FieldLabel"]),
-                Paragraph("________ / ________ / ________", self.styles["FieldValue"]),
+                Paragraph(
+                    value("date_of_birth", "________ / ________ / ________"),
+                    self.styles["FieldValue"],
+                ),
             ],
             [
                 Paragraph("Gender:", self.styles["FieldLabel"]),
                 Paragraph(
-                    "☐ Male    ☐ Female    ☐ Other", self.styles["FieldValue"]
+                    self._choices(["Male", "Female", "Other"], applicant.get("gender")),
+                    self.styles["FieldValue"],
                 ),
             ],
             [
                 Paragraph("Nationality:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("nationality"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Email Address:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("email"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Phone Number:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("phone"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Mailing Address:", self.styles["FieldLabel"]),
                 Paragraph(
-                    "______________________________________________<br/>"
-                    "______________________________________________<br/>"
-                    "______________________________________________",
+                    value(
+                        "address",
+                        "______________________________________________<br/>"
+                        "______________________________________________<br/>"
+                        "______________________________________________",
+                    ),
                     self.styles["FieldValue"],
                 ),
             ],
@@ -240,28 +315,34 @@ class ApplicationFormGenerator:
             [
                 Paragraph("Level of Study:", self.styles["FieldLabel"]),
                 Paragraph(
-                    "☐ Foundation    ☐ Diploma    ☐ Bachelor    ☐ Master    ☐ PhD",
+                    self._choices(
+                        ["Foundation", "Diploma", "Bachelor", "Master", "PhD"],
+                        program.get("level"),
+                    ),
                     self.styles["FieldValue"],
                 ),
             ],
             [
                 Paragraph("Program Applied For:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(escape(program.get("program_name") or ""), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Faculty:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(escape(program.get("faculty_name") or ""), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Intake Semester:", self.styles["FieldLabel"]),
                 Paragraph(
-                    "☐ Semester 1    ☐ Semester 2    ☐ Semester 3",
+                    self._choices(
+                        ["Semester 1", "Semester 2", "Semester 3"],
+                        applicant.get("intake_semester"),
+                    ),
                     self.styles["FieldValue"],
                 ),
             ],
             [
                 Paragraph("Academic Year:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("academic_year"), self.styles["FieldValue"]),
             ],
         ]
         a_header, a_table = self._build_section_table(
@@ -275,19 +356,19 @@ class ApplicationFormGenerator:
         edu_rows = [
             [
                 Paragraph("Highest Qualification:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("highest_qualification"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Institution:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("institution"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("Year of Completion:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("year_of_completion"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph("CGPA/Grade:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("cgpa"), self.styles["FieldValue"]),
             ],
         ]
         e_header, e_table = self._build_section_table(
@@ -297,18 +378,24 @@ class ApplicationFormGenerator:
         story.append(e_table)
         story.append(PageBreak())
 
+        if requirements:
+            self._build_requirements_section(story, requirements)
+
         # 4. ADDITIONAL INFORMATION
         add_rows = [
             [
                 Paragraph("English Proficiency:", self.styles["FieldLabel"]),
                 Paragraph(
-                    "☐ IELTS    ☐ TOEFL    ☐ MUET    ☐ Other: _____________",
+                    self._choices(
+                        ["IELTS", "TOEFL", "MUET"], applicant.get("english_proficiency_test")
+                    )
+                    + "    ☐ Other: _____________",
                     self.styles["FieldValue"],
                 ),
             ],
             [
                 Paragraph("Score:", self.styles["FieldLabel"]),
-                Paragraph("", self.styles["FieldValue"]),
+                Paragraph(value("english_test_score"), self.styles["FieldValue"]),
             ],
             [
                 Paragraph(
@@ -365,9 +452,12 @@ class ApplicationFormGenerator:
 
         # 6. SUBMISSION INSTRUCTIONS
         story.append(Paragraph("6. SUBMISSION INSTRUCTIONS", self.styles["SectionHeader"]))
-        instructions_text = """
-        <b>Please submit this completed form along with the following documents:</b>
-        <br/><br/>
+        if checklist:
+            documents_text = self._documents_text(checklist) + """
+        <br/>
+        ☐ Application fee payment receipt (RM 50)"""
+        else:
+            documents_text = """
         • Certified copies of academic certificates and transcripts
         <br/>
         • Copy of IC/Passport
@@ -376,7 +466,12 @@ class ApplicationFormGenerator:
         <br/>
         • English proficiency test results (if applicable)
         <br/>
-        • Application fee payment receipt (RM 50)
+        • Application fee payment receipt (RM 50)"""
+
+        instructions_text = """
+        <b>Please submit this completed form along with the following documents:</b>
+        <br/><br/>
+        """ + documents_text + """
         <br/><br/>
         <b>Submission Methods:</b>
         <br/><br/>
@@ -405,3 +500,25 @@ class ApplicationFormGenerator:
             return buffer
 
         return output_path
+
+
+# The blank form is identical for everyone, so it is laid out once per process
+BlankForm = namedtuple('BlankForm', ['data', 'etag', 'last_modified'])
+
+_blank_form = None
+_blank_form_lock = threading.Lock()
+
+
+def get_blank_form():
+    """Return the blank application form as immutable bytes with its ETag, rendering it on first use"""
+    global _blank_form
+    if _blank_form is None:
+        with _blank_form_lock:
+            if _blank_form is None:
+                data = ApplicationFormGenerator().generate_form(invariant=True).getvalue()
+                _blank_form = BlankForm(
+                    data=data,
+                    etag=hashlib.sha256(data).hexdigest()[:32],
+                    last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+                )
+    return _blank_form
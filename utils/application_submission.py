@@ -0,0 +1,380 @@
+"""
+Application Submission - Validate, store and record online applications
+
+Uploaded documents are copied to temporary files of the content-addressed
+document store (utils/document_store.py) in fixed-size chunks and hashed on
+the way, before any database work starts; the APPLICANT, APPLICATION,
+APPLICATION_STATUS, APPLICATION_DOCUMENT and DOCUMENT_BLOB rows (and the
+confirmation email in EMAIL_OUTBOX) are then written in one short
+transaction, which also moves the files into the store once their
+DOCUMENT_BLOB rows are locked.
+
+The APPLICANT row is created by the first application from an email address
+and never changed by later ones: the form needs no login, so the personal
+details of each submission are stored on its APPLICATION row instead.
+
+Reference numbers are random (APP20250115-7KQ2M9XD) and the UNIQUE index on
+APPLICATION.reference_number is the arbiter: a duplicate is retried with a
+new number instead of being checked for beforehand.
+
+Table changes: Database/application_submission_migration.sql,
+Database/document_store_migration.sql
+"""
+import os
+import re
+import secrets
+from collections import namedtuple
+from datetime import date, datetime
+
+from mysql.connector import Error, errorcode
+
+from utils.db_helper import get_pool, PoolTimeoutError
+from utils.document_store import get_document_store, add_references, BlobTooLargeError
+from utils.program_catalog import get_catalog
+
+try:
+    from utils.email_outbox import enqueue_email, make_idempotency_key
+    from utils.email_templates import render_application_confirmation
+    HAS_EMAIL_OUTBOX = True
+except ImportError:
+    HAS_EMAIL_OUTBOX = False
+
+# Upload configuration - can be set via environment variables
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(64 * 1024)))  # bytes per read/write
+UPLOAD_MAX_FILE_SIZE = int(os.getenv('UPLOAD_MAX_FILE_SIZE', str(10 * 1024 * 1024)))  # per document
+UPLOAD_MAX_REQUEST_SIZE = int(os.getenv('UPLOAD_MAX_REQUEST_SIZE', str(60 * 1024 * 1024)))  # whole form
+REFERENCE_RETRIES = int(os.getenv('REFERENCE_RETRIES', '5'))
+
+ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png'}
+
+# Document fields of the online form: (label, required, DOCUMENT_CHECKLIST name keywords)
+DOCUMENT_FIELDS = {
+    'doc_ic': ('Identity Card / Passport', True, ('identity', 'mykad', 'passport')),
+    'doc_certificates': ('Academic Certificates', True, ('certificate', 'qualification')),
+    'doc_transcripts': ('Academic Transcripts', False, ('transcript',)),
+    'doc_photo': ('Passport Photo', True, ('photo',)),
+    'doc_birth': ('Birth Certificate', False, ('birth',)),
+    'doc_english': ('English Proficiency Test', False, ('english', 'ielts', 'toefl', 'muet')),
+    'doc_passport': ('Valid Passport', False, ('passport',)),
+    'doc_medical': ('Medical Examination Report', False, ('medical',)),
+    'doc_financial': ('Financial Proof', False, ('financial', 'bank')),
+    'doc_noc': ('No-Objection Certificate', False, ('no-objection', 'noc')),
+}
+
+REQUIRED_FIELDS = {
+    'full_name': 'Full name',
+    'ic_passport': 'IC / passport number',
+    'date_of_birth': 'Date of birth',
+    'gender': 'Gender',
+    'nationality': 'Nationality',
+    'email': 'Email address',
+    'phone': 'Phone number',
+    'program_choice_1': '1st choice program',
+}
+
+# Column limits from Database/schema.sql and Database/application_submission_migration.sql
+FIELD_LENGTHS = {'full_name': 200, 'ic_passport': 50, 'email': 100, 'phone': 20, 'nationality': 100}
+
+GENDERS = ('Male', 'Female')
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Unambiguous characters for reference numbers (no 0/O, 1/I/L)
+_REFERENCE_ALPHABET = 'ABCDEFGHJKMNPQRSTUVWXYZ23456789'
+
+StoredFile = namedtuple('StoredFile', ['field', 'path', 'original_filename', 'content_type', 'size', 'sha256',
+                                       'tmp_path'])
+Submission = namedtuple('Submission', ['reference_number', 'application_id', 'applicant_id', 'documents'])
+
+
+class SubmissionError(ValueError):
+    """Raised when the submitted form is invalid; errors is a list of messages"""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def generate_reference_number(today=None):
+    """Random reference number, e.g. APP20250115-7KQ2M9XD"""
+    today = today or date.today()
+    token = ''.join(secrets.choice(_REFERENCE_ALPHABET) for _ in range(8))
+    return f"APP{today.strftime('%Y%m%d')}-{token}"
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _form_values(form):
+    """
+    First non-empty value of every field
+
+    The online form has a Malaysian and an international variant of some
+    inputs under the same name; only the visible one is filled in.
+    """
+    if not hasattr(form, 'getlist'):
+        return {key: (value or '').strip() for key, value in form.items()}
+    return {
+        key: next((value.strip() for value in form.getlist(key) if value and value.strip()), '')
+        for key in form.keys()
+    }
+
+
+def validate_application(form, files):
+    """
+    Check the submitted form
+
+    Args:
+        form: request.form (MultiDict) or a plain dict
+        files: request.files
+
+    Returns:
+        dict of cleaned values
+
+    Raises:
+        SubmissionError: with every problem found
+    """
+    data = _form_values(form)
+    errors = []
+
+    for field, label in REQUIRED_FIELDS.items():
+        if not data.get(field):
+            errors.append(f"{label} is required")
+    for field, limit in FIELD_LENGTHS.items():
+        if len(data.get(field, '')) > limit:
+            errors.append(f"{REQUIRED_FIELDS.get(field, field)} must be at most {limit} characters")
+
+    if data.get('email') and not EMAIL_PATTERN.match(data['email']):
+        errors.append("Email address is not valid")
+
+    if data.get('gender') and data['gender'] not in GENDERS:
+        errors.append("Gender is not valid")
+
+    if data.get('date_of_birth'):
+        birth_date = _parse_date(data['date_of_birth'])
+        if birth_date is None or birth_date >= date.today():
+            errors.append("Date of birth is not valid")
+        data['date_of_birth'] = birth_date
+
+    is_international = data.get('applicant_type', '').lower() == 'international'
+    if is_international:
+        for field, label in (('english_proficiency_test', 'English proficiency test'),
+                             ('english_test_score', 'English test score'),
+                             ('passport_expiry_date', 'Passport expiry date')):
+            if not data.get(field):
+                errors.append(f"{label} is required for international applicants")
+    data['is_international'] = is_international
+
+    if form.get('declaration') is None or form.get('consent') is None:
+        errors.append("The declaration and consent must be accepted")
+
+    program_ids = []
+    for field in ('program_choice_1', 'program_choice_2', 'program_choice_3'):
+        if not data.get(field):
+            continue
+        try:
+            program_id = int(data[field])
+        except ValueError:
+            errors.append(f"Program choice '{data[field]}' is not valid")
+            continue
+        if get_catalog().get_program(program_id) is None:
+            errors.append(f"Program {program_id} does not exist")
+        elif program_id not in program_ids:
+            program_ids.append(program_id)
+    data['program_ids'] = program_ids
+
+    for field, (label, required, _) in DOCUMENT_FIELDS.items():
+        upload = files.get(field)
+        if upload is None or not upload.filename:
+            if required:
+                errors.append(f"{label} must be uploaded")
+            continue
+        extension = os.path.splitext(upload.filename)[1].lower()
+        if extension not in ALLOWED_EXTENSIONS:
+            errors.append(f"{label}: only {', '.join(sorted(ALLOWED_EXTENSIONS))} files are accepted")
+
+    if errors:
+        raise SubmissionError(errors)
+    return data
+
+
+def store_upload(upload, field):
+    """Copy an uploaded file to a document store temporary file in chunks, hashing it as it is written"""
+    label = DOCUMENT_FIELDS[field][0]
+    try:
+        blob = get_document_store().put(upload.stream, UPLOAD_MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE)
+    except BlobTooLargeError:
+        raise SubmissionError([f"{label} is larger than {UPLOAD_MAX_FILE_SIZE // (1024 * 1024)} MB"])
+    if blob.size == 0:
+        get_document_store().discard(blob.tmp_path)
+        raise SubmissionError([f"{label} is empty"])
+
+    return StoredFile(field, blob.path, os.path.basename(upload.filename)[:255],
+                      (upload.mimetype or '')[:100] or None, blob.size, blob.sha256, blob.tmp_path)
+
+
+def _discard_uploads(stored):
+    """Remove the temporary files of uploads that were not placed in the store"""
+    store = get_document_store()
+    for f in stored:
+        store.discard(f.tmp_path)
+
+
+def _store_uploads(files):
+    """Copy every uploaded document to a temporary file; identical files later share one blob"""
+    stored = []
+    try:
+        for field in DOCUMENT_FIELDS:
+            if files.get(field) is not None and files[field].filename:
+                stored.append(store_upload(files[field], field))
+    except BaseException:
+        _discard_uploads(stored)
+        raise
+    return stored
+
+
+def _checklist_ids(cursor, program_id):
+    """Map form document fields onto the program's DOCUMENT_CHECKLIST rows by name"""
+    cursor.execute("""
+        SELECT checklist_id, document_name
+        FROM DOCUMENT_CHECKLIST
+        WHERE program_id = %s
+        ORDER BY is_mandatory DESC, checklist_id
+    """, (program_id,))
+    rows = cursor.fetchall()
+    mapping = {}
+    for field, (_, _, keywords) in DOCUMENT_FIELDS.items():
+        for checklist_id, document_name in rows:
+            name = document_name.lower()
+            if any(keyword in name for keyword in keywords):
+                mapping[field] = checklist_id
+                break
+    return mapping
+
+
+def _insert_application(cursor, applicant_id, program_id, data, remarks):
+    """Insert the APPLICATION row, drawing a new reference number on a collision"""
+    for _ in range(REFERENCE_RETRIES):
+        reference_number = generate_reference_number()
+        try:
+            cursor.execute("""
+                INSERT INTO APPLICATION (applicant_id, program_id, reference_number, status,
+                                         submission_date, remarks, full_name, ic_passport, gender,
+                                         date_of_birth, nationality, phone, address)
+                VALUES (%s, %s, %s, 'Submitted', CURDATE(), %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (applicant_id, program_id, reference_number, remarks, data['full_name'],
+                  data['ic_passport'], data['gender'], data['date_of_birth'], data['nationality'],
+                  data['phone'], data.get('address') or None))
+            return cursor.lastrowid, reference_number
+        except Error as e:
+            # A failed INSERT only rolls back itself, not the surrounding transaction
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+    raise RuntimeError("Could not allocate a unique reference number")
+
+
+def _record(conn, data, stored):
+    cursor = conn.cursor()
+
+    # One applicant per email address; an existing row is reused as it is, never updated
+    cursor.execute("""
+        INSERT INTO APPLICANT (full_name, email, phone, nationality, date_of_birth, address)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE applicant_id = LAST_INSERT_ID(applicant_id)
+    """, (data['full_name'], data['email'].lower(), data['phone'], data['nationality'],
+          data['date_of_birth'], data.get('address') or None))
+    applicant_id = cursor.lastrowid
+
+    program_id = data['program_ids'][0]
+    alternatives = data['program_ids'][1:]
+    remarks = f"Alternative program choices: {', '.join(map(str, alternatives))}" if alternatives else None
+    application_id, reference_number = _insert_application(cursor, applicant_id, program_id, data, remarks)
+
+    cursor.execute("""
+        INSERT INTO APPLICATION_STATUS (application_id, status, remarks)
+        VALUES (%s, 'Submitted', 'Online application received')
+    """, (application_id,))
+
+    checklist_ids = _checklist_ids(cursor, program_id)
+    if stored:
+        # Lock the DOCUMENT_BLOB rows first, then move the files into the store under that lock
+        add_references(cursor, [(f.sha256, f.size, f.content_type) for f in stored])
+        store = get_document_store()
+        for f in stored:
+            store.place(f.sha256, f.tmp_path)
+        cursor.executemany("""
+            INSERT INTO APPLICATION_DOCUMENT
+            (application_id, checklist_id, document_type, file_path, original_filename,
+             content_type, file_size, sha256)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, [
+            (application_id, checklist_ids.get(f.field), f.field, f.path, f.original_filename,
+             f.content_type, f.size, f.sha256)
+            for f in stored
+        ])
+    cursor.close()
+    return application_id, applicant_id, reference_number
+
+
+def _queue_confirmation(conn, data, reference_number, document_count):
+    if not HAS_EMAIL_OUTBOX:
+        return
+    program = get_catalog().get_program(data['program_ids'][0])
+    subject, body_html = render_application_confirmation(
+        data['full_name'], program['program_name'], reference_number, document_count
+    )
+    enqueue_email(data['email'], subject, body_html,
+                  idempotency_key=make_idempotency_key('application-confirmation', reference_number),
+                  conn=conn)
+
+
+def _acquire_connection():
+    """
+    Borrow a pooled connection for a submission
+
+    Unlike get_db_connection(), a full pool raises PoolTimeoutError so the
+    route can answer 503 and the applicant can retry.
+    """
+    try:
+        return get_pool().acquire()
+    except PoolTimeoutError:
+        raise
+    except Error as e:
+        print(f"Error connecting to MySQL: {e}")
+        raise RuntimeError("Database connection failed")
+
+
+def submit_application(form, files):
+    """
+    Validate and record an online application
+
+    Returns:
+        Submission
+
+    Raises:
+        SubmissionError: the form is invalid (nothing is stored)
+        PoolTimeoutError: no database connection became free in time (retryable)
+        RuntimeError / mysql Error: the application could not be recorded
+    """
+    data = validate_application(form, files)
+    stored = _store_uploads(files)
+
+    # Files placed by a transaction that then rolls back have no DOCUMENT_BLOB
+    # row and are removed by collect_garbage(); unplaced temporary files go here
+    try:
+        with _acquire_connection() as conn:
+            try:
+                application_id, applicant_id, reference_number = _record(conn, data, stored)
+                _queue_confirmation(conn, data, reference_number, len(stored))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    finally:
+        _discard_uploads(stored)
+
+    return Submission(reference_number, application_id, applicant_id, stored)
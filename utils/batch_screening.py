@@ -0,0 +1,353 @@
+"""
+Batch Screening - Run applicant spreadsheets through EligibilityChecker
+
+Admission requirements are loaded once from the program catalog and shipped
+to a pool of worker processes; applicants are read from CSV or JSONL and
+screened in chunks, with results yielded in input order as soon as they are
+ready.
+
+Command line:
+    python -m utils.batch_screening applicants.csv --output results.jsonl
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.eligibility_checker import EligibilityChecker
+from utils.process_pool import new_process_pool
+
+# Batch configuration - can be set via environment variables
+BATCH_SCREENING_WORKERS = int(os.getenv('BATCH_SCREENING_WORKERS', str(os.cpu_count() or 1)))
+BATCH_SCREENING_CHUNK_SIZE = int(os.getenv('BATCH_SCREENING_CHUNK_SIZE', '500'))  # applicants per task
+
+# Columns with a fixed meaning; any other CSV column is passed on as additional_info
+APPLICANT_FIELDS = ('applicant_id', 'program_id', 'qualification', 'cgpa', 'grade', 'additional_info')
+
+
+def load_requirement_table():
+    """Return {program_id: [requirement rows with program_name and level]} from the catalog"""
+    from utils.program_catalog import get_catalog
+
+    catalog = get_catalog()
+    table = {}
+    for program_id, requirements in catalog.requirements_by_program().items():
+        program = catalog.get_program(program_id)
+        table[program_id] = [
+            dict(req, program_name=program['program_name'], level=program['level'])
+            for req in requirements
+        ]
+    return table
+
+
+def detect_format(filename=None, content_type=None):
+    """Guess 'csv' or 'jsonl' from a file name or MIME type (defaults to csv)"""
+    name = (filename or '').lower()
+    mime = (content_type or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')) or 'json' in mime:
+        return 'jsonl'
+    return 'csv'
+
+
+def open_text_stream(binary_stream):
+    """Wrap an uploaded binary stream for read_applicants"""
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+def _parse_program_id(value):
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return value
+
+
+def _applicant_from_csv(row):
+    extra = {key: value for key, value in row.items()
+             if key not in APPLICANT_FIELDS and key is not None and value not in (None, '')}
+    additional_info = row.get('additional_info') or ''
+    if extra:
+        additional_info = dict(extra, notes=additional_info) if additional_info else extra
+    return {
+        'applicant_id': row.get('applicant_id') or None,
+        'program_id': _parse_program_id(row.get('program_id')),
+        'qualification': (row.get('qualification') or '').strip(),
+        'grades': {'cgpa': row.get('cgpa') or None, 'grade': row.get('grade') or None},
+        'additional_info': additional_info or {},
+    }
+
+
+def _applicant_from_json(record):
+    grades = record.get('grades') or {'cgpa': record.get('cgpa'), 'grade': record.get('grade')}
+    return {
+        'applicant_id': record.get('applicant_id'),
+        'program_id': _parse_program_id(record.get('program_id')),
+        'qualification': str(record.get('qualification') or '').strip(),
+        'grades': grades,
+        'additional_info': record.get('additional_info') or {},
+    }
+
+
+def read_applicants(stream, fmt='csv'):
+    """
+    Yield (row_number, applicant) pairs from a text stream.
+
+    Rows that cannot be parsed are yielded as (row_number, {'error': ...}) so
+    they show up in the results instead of stopping the run.
+    """
+    if fmt == 'jsonl':
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError('expected a JSON object')
+                yield row_number, _applicant_from_json(record)
+            except ValueError as e:
+                yield row_number, {'error': f'Invalid JSON: {e}'}
+    else:
+        # Row numbers count the header as row 1, like a spreadsheet
+        for row_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, _applicant_from_csv(row)
+
+
+# Per-process state of pool workers
+_worker_checker = None
+_worker_requirements = None
+
+
+def _init_worker(requirements):
+    global _worker_checker, _worker_requirements
+    _worker_checker = EligibilityChecker(None)
+    _worker_requirements = requirements
+
+
+def screen_one(checker, requirements, row_number, applicant):
+    """Screen a single applicant; errors are reported on the row instead of raised"""
+    result = {'row': row_number, 'applicant_id': applicant.get('applicant_id')}
+    if 'error' in applicant:
+        result['error'] = applicant['error']
+        return result
+
+    program_id = applicant['program_id']
+    result['program_id'] = program_id
+    if not program_id or not applicant['qualification']:
+        result['error'] = 'Missing required fields'
+        return result
+
+    try:
+        # JSON input can carry any type here, e.g. a list, which is not even hashable
+        program_id = int(str(program_id).strip())
+    except ValueError:
+        result['error'] = f'Invalid program_id: {program_id!r}'
+        return result
+    result['program_id'] = program_id
+    if program_id not in requirements:
+        result['error'] = 'No admission requirements found for this program.'
+        return result
+
+    try:
+        check = checker.evaluate_requirements(
+            requirements[program_id],
+            applicant['qualification'],
+            applicant['grades'],
+            applicant['additional_info']
+        )
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
+    best_match = check.get('best_match')
+    result.update({
+        'program_name': check.get('program_name'),
+        'eligible': check['eligible'],
+        'confidence_score': check.get('confidence_score', 0.0),
+        'matched_count': len(check['matched_requirements']),
+        'best_requirement_id': best_match['requirement_id'] if best_match else None,
+        'message': check['message'],
+    })
+    return result
+
+
+def _screen_chunk(chunk):
+    return [screen_one(_worker_checker, _worker_requirements, row_number, applicant)
+            for row_number, applicant in chunk]
+
+
+def _chunks(applicants, size):
+    chunk = []
+    for item in applicants:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def screen_applicants(applicants, requirements, workers=BATCH_SCREENING_WORKERS,
+                      chunk_size=BATCH_SCREENING_CHUNK_SIZE, progress=None):
+    """
+    Screen (row_number, applicant) pairs and yield one result dict per row, in order.
+
+    With more than one worker the chunks are spread over a process pool; at
+    most two chunks per worker are in flight, so memory stays flat no matter
+    how large the input is. progress(done_rows) is called after every chunk.
+    """
+    if workers <= 1:
+        done = 0
+        checker = EligibilityChecker(None)
+        for chunk in _chunks(applicants, chunk_size):
+            for row_number, applicant in chunk:
+                yield screen_one(checker, requirements, row_number, applicant)
+            done += len(chunk)
+            if progress:
+                progress(done)
+        return
+
+    with new_process_pool(workers, _init_worker, (requirements,)) as pool:
+        yield from screen_in_pool(pool, applicants, workers, chunk_size, progress)
+
+
+def screen_in_pool(pool, applicants, workers, chunk_size=BATCH_SCREENING_CHUNK_SIZE, progress=None):
+    """Like screen_applicants, on a pool whose workers were started with _init_worker"""
+    done = 0
+    pending = deque()
+    for chunk in _chunks(applicants, chunk_size):
+        pending.append(pool.submit(_screen_chunk, chunk))
+        if len(pending) >= workers * 2:
+            results = pending.popleft().result()
+            done += len(results)
+            yield from results
+            if progress:
+                progress(done)
+    while pending:
+        results = pending.popleft().result()
+        done += len(results)
+        yield from results
+        if progress:
+            progress(done)
+
+
+class _SharedPool:
+    """A worker pool loaded with one version of the requirement table"""
+
+    def __init__(self, version, requirements, workers):
+        self.version = version
+        self.workers = workers
+        self.executor = new_process_pool(workers, _init_worker, (requirements,))
+        self.users = 0
+        self.retired = False
+
+
+_shared_pool = None
+_shared_pool_pid = None
+_shared_pool_lock = threading.Lock()
+
+
+@contextmanager
+def shared_pool(version, requirements):
+    """
+    Borrow the process-wide screening pool (used by the web API)
+
+    Every request shares BATCH_SCREENING_WORKERS processes instead of starting
+    its own pool. When the requirement table changes (a new version), a new
+    pool is started and the old one is shut down once its last user is done.
+
+    Yields:
+        (executor, workers)
+    """
+    global _shared_pool, _shared_pool_pid
+    pid = os.getpid()
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_pid != pid or _shared_pool.version != version:
+            if _shared_pool is not None and _shared_pool_pid == pid:
+                _shared_pool.retired = True
+                if _shared_pool.users == 0:
+                    _shared_pool.executor.shutdown(wait=False)
+            _shared_pool = _SharedPool(version, requirements, max(1, BATCH_SCREENING_WORKERS))
+            _shared_pool_pid = pid
+        handle = _shared_pool
+        handle.users += 1
+    try:
+        yield handle.executor, handle.workers
+    finally:
+        with _shared_pool_lock:
+            handle.users -= 1
+            if handle.retired and handle.users == 0:
+                handle.executor.shutdown(wait=False)
+
+
+class ScreeningSummary:
+    """Running totals for a batch run"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.total = 0
+        self.eligible = 0
+        self.errors = 0
+
+    def add(self, result):
+        self.total += 1
+        if 'error' in result:
+            self.errors += 1
+        elif result['eligible']:
+            self.eligible += 1
+
+    def as_dict(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            'total': self.total,
+            'eligible': self.eligible,
+            'not_eligible': self.total - self.eligible - self.errors,
+            'errors': self.errors,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.total / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Screen a CSV or JSONL file of applicants for eligibility')
+    parser.add_argument('input', help="applicants file ('-' for stdin)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='input format (default: from file extension)')
+    parser.add_argument('--output', '-o', default='-', help="JSONL results file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=BATCH_SCREENING_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=BATCH_SCREENING_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.input)
+    requirements = load_requirement_table()
+    print(f"Loaded requirements for {len(requirements)} programs", file=sys.stderr)
+
+    summary = ScreeningSummary()
+
+    def report(done):
+        elapsed = time.monotonic() - summary.started
+        rate = done / elapsed if elapsed > 0 else 0
+        print(f"\r{done} rows screened ({rate:.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8-sig')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        applicants = read_applicants(source, fmt)
+        for result in screen_applicants(applicants, requirements, args.workers, args.chunk_size, report):
+            summary.add(result)
+            output.write(json.dumps(result, default=str) + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(file=sys.stderr)
+    print(json.dumps(summary.as_dict()), file=sys.stderr)
+    return 0 if summary.errors == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
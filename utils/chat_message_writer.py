@@ -0,0 +1,167 @@
+"""
+Chat Message Writer - Write-behind persistence for chatbot conversations
+
+Chat turns are queued in memory and a background thread writes them to
+CHAT_SESSION / CHAT_MESSAGE in multi-row batches, so the chatbot response
+never waits on MySQL.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from utils.db_helper import db_connection
+
+# Write-behind configuration - can be set via environment variables
+CHAT_FLUSH_INTERVAL_MS = int(os.getenv('CHAT_FLUSH_INTERVAL_MS', '200'))  # max delay before a batch is written
+CHAT_FLUSH_BATCH_SIZE = int(os.getenv('CHAT_FLUSH_BATCH_SIZE', '200'))  # max rows per batch
+CHAT_QUEUE_MAX_SIZE = int(os.getenv('CHAT_QUEUE_MAX_SIZE', '20000'))  # messages buffered before dropping
+CHAT_SESSION_CACHE_SIZE = int(os.getenv('CHAT_SESSION_CACHE_SIZE', '50000'))  # sessions known to exist
+
+
+class ChatMessageWriter:
+    """Coalesce chat messages from many sessions into batched INSERTs"""
+
+    def __init__(self, flush_interval_ms=CHAT_FLUSH_INTERVAL_MS, batch_size=CHAT_FLUSH_BATCH_SIZE,
+                 max_queue_size=CHAT_QUEUE_MAX_SIZE, session_cache_size=CHAT_SESSION_CACHE_SIZE):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self.session_cache_size = session_cache_size
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._known_sessions = OrderedDict()  # LRU of session ids already in CHAT_SESSION
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='chat-message-writer', daemon=True)
+                self._thread.start()
+
+    def enqueue(self, session_id, sender_type, message_text, intent, confidence_score=0.80):
+        """Queue a message for writing; never blocks the caller"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((session_id, sender_type, message_text, intent,
+                                    confidence_score, datetime.now()))
+        except queue.Full:
+            self.dropped += 1
+            print("Warning: Chat message queue is full, dropping message")
+
+    def flush(self):
+        """Block until every queued message has been written (or failed)"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def _next_batch(self):
+        """Wait for one message, then collect more until the batch is full or the interval passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Error saving chat messages, retrying {len(batch)} one at a time: {e}")
+                self._write_each(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_each(self, batch):
+        """Retry a failed batch row by row so only the rows that fail are dropped"""
+        for row in batch:
+            try:
+                self._write([row])
+            except Exception as e:
+                self.failed += 1
+                print(f"Error saving chat message for session {row[0]} ({row[1]}), dropping it: {e}")
+
+    def _write(self, batch):
+        new_sessions = []
+        for row in batch:
+            session_id = row[0]
+            if session_id not in self._known_sessions and session_id not in new_sessions:
+                new_sessions.append(session_id)
+
+        with db_connection() as conn:
+            if not conn:
+                raise RuntimeError("Database connection failed")
+
+            cursor = conn.cursor()
+            if new_sessions:
+                # Multi-row insert; sessions that already exist are left untouched
+                cursor.executemany("""
+                    INSERT INTO CHAT_SESSION (session_id, start_time, session_status)
+                    VALUES (%s, NOW(), 'Active')
+                    ON DUPLICATE KEY UPDATE session_id = session_id
+                """, [(session_id,) for session_id in new_sessions])
+
+            cursor.executemany("""
+                INSERT INTO CHAT_MESSAGE
+                (session_id, sender_type, message_text, intent_detected, confidence_score, timestamp)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, batch)
+            conn.commit()
+            cursor.close()
+
+        for session_id in new_sessions:
+            self._known_sessions[session_id] = True
+        for row in batch:
+            self._known_sessions.move_to_end(row[0])
+        while len(self._known_sessions) > self.session_cache_size:
+            self._known_sessions.popitem(last=False)
+
+        self.written += len(batch)
+        self.batches += 1
+
+    def stats(self):
+        """Snapshot of writer metrics"""
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_chat_writer():
+    """Return the process-wide chat message writer"""
+    global _writer, _writer_pid
+    pid = os.getpid()
+    if _writer is None or _writer_pid != pid:
+        with _writer_lock:
+            if _writer is None or _writer_pid != pid:
+                _writer = ChatMessageWriter()
+                _writer_pid = pid
+                atexit.register(_writer.flush)
+    return _writer
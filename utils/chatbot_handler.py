@@ -3,6 +3,96 @@ Chatbot Handler - Process admission-related queries
 """
 import re
 from datetime import datetime
+from utils.chat_message_writer import get_chat_writer
+
+# Intent phrases. Scores tie-break in this order, so keep it stable.
+INTENT_PATTERNS = {
+    'admission_requirements': [
+        r'requirement', r'eligibility', r'qualification', r'need to apply',
+        r'what do i need', r'admission criteria', r'entry requirement'
+    ],
+    'application_procedure': [
+        r'how to apply', r'application process', r'apply', r'application procedure',
+        r'steps to apply', r'application guide', r'how do i apply'
+    ],
+    'deadlines': [
+        r'deadline', r'when is', r'closing date', r'application period',
+        r'intake', r'when can i', r'important date', r'due date'
+    ],
+    'documents': [
+        r'document', r'what document', r'checklist', r'need to submit',
+        r'required document', r'paperwork', r'certificate'
+    ],
+    'fees': [
+        r'fee', r'tuition', r'cost', r'price', r'how much', r'payment',
+        r'scholarship', r'financial aid'
+    ],
+    'program_info': [
+        r'program', r'course', r'what is', r'tell me about', r'information about'
+    ]
+}
+
+
+def _trie_pattern(phrases):
+    """Build a regex from a prefix trie of phrases so each position is checked one character at a time"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Optional tail: a phrase ends here, but a greedy match prefers the longer one
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+def _compile_intent_matcher(intent_patterns):
+    """
+    Compile every intent phrase into one regex that finds all occurrences in a single scan.
+
+    The trie-shaped alternation sits inside a lookahead so matches may overlap,
+    and at each position it matches the longest phrase. Shorter phrases that are
+    a prefix of the match (e.g. 'fee' / 'fees') are implied by it, which keeps
+    the scores identical to running one re.search per phrase.
+    """
+    phrases = sorted({p for patterns in intent_patterns.values() for p in patterns})
+    matcher = re.compile('(?=(' + _trie_pattern(phrases) + '))')
+    implied = {p: frozenset(q for q in phrases if p.startswith(q)) for p in phrases}
+    intent_rank = {intent: rank for rank, intent in enumerate(intent_patterns)}
+    phrase_intents = {}
+    for intent, patterns in intent_patterns.items():
+        for pattern in patterns:
+            phrase_intents.setdefault(pattern, []).append(intent_rank[intent])
+    return matcher, implied, phrase_intents
+
+
+_INTENT_MATCHER, _IMPLIED_PHRASES, _PHRASE_INTENTS = _compile_intent_matcher(INTENT_PATTERNS)
+_INTENT_NAMES = list(INTENT_PATTERNS)
+
+
+def detect_intent(message):
+    """Detect user intent from message with a single pass over the text"""
+    found = set()
+    for match in _INTENT_MATCHER.finditer(message.lower()):
+        found.update(_IMPLIED_PHRASES[match.group(1)])
+
+    if not found:
+        return 'general'
+
+    scores = [0] * len(_INTENT_NAMES)
+    for phrase in found:
+        for rank in _PHRASE_INTENTS[phrase]:
+            scores[rank] += 1
+    # max() returns the first intent with the top score, as the per-pattern loop did
+    return _INTENT_NAMES[scores.index(max(scores))]
+
 
 class ChatbotHandler:
     """Handle chatbot messages with intent detection and response generation"""
@@ -10,50 +100,12 @@ class ChatbotHandler:
     def __init__(self, db_connection):
         self.conn = db_connection
         
-        # Intent patterns
-        self.intent_patterns = {
-            'admission_requirements': [
-                r'requirement', r'eligibility', r'qualification', r'need to apply',
-                r'what do i need', r'admission criteria', r'entry requirement'
-            ],
-            'application_procedure': [
-                r'how to apply', r'application process', r'apply', r'application procedure',
-                r'steps to apply', r'application guide', r'how do i apply'
-            ],
-            'deadlines': [
-                r'deadline', r'when is', r'closing date', r'application period',
-                r'intake', r'when can i', r'important date', r'due date'
-            ],
-            'documents': [
-                r'document', r'what document', r'checklist', r'need to submit',
-                r'required document', r'paperwork', r'certificate'
-            ],
-            'fees': [
-                r'fee', r'tuition', r'cost', r'price', r'how much', r'payment',
-                r'scholarship', r'financial aid'
-            ],
-            'program_info': [
-                r'program', r'course', r'what is', r'tell me about', r'information about'
-            ]
-        }
+        # Intent patterns (shared, compiled once at import)
+        self.intent_patterns = INTENT_PATTERNS
     
     def detect_intent(self, message):
         """Detect user intent from message"""
-        message_lower = message.lower()
-        
-        intent_scores = {}
-        
-        for intent, patterns in self.intent_patterns.items():
-            score = 0
-            for pattern in patterns:
-                if re.search(pattern, message_lower):
-                    score += 1
-            if score > 0:
-                intent_scores[intent] = score
-        
-        if intent_scores:
-            return max(intent_scores, key=intent_scores.get)
-        return 'general'
+        return detect_intent(message)
     
     def process_message(self, message, session_id):
         """Process chatbot message and generate response"""
@@ -288,36 +340,9 @@ Would you like me to generate a personalized document checklist? Please specify:
         }
     
     def _save_message(self, session_id, sender_type, message_text, intent):
-        """Save message to database"""
+        """Queue message for background saving to the database"""
         try:
-            cursor = self.conn.cursor()
-            
-            # Get or create session
-            cursor.execute("""
-                SELECT session_id FROM CHAT_SESSION 
-                WHERE session_id = %s LIMIT 1
-            """, (session_id,))
-            
-            session_record = cursor.fetchone()
-            
-            if not session_record:
-                cursor.execute("""
-                    INSERT INTO CHAT_SESSION (session_id, start_time, session_status)
-                    VALUES (%s, NOW(), 'Active')
-                """, (session_id,))
-                self.conn.commit()
-            
-            # Save message
-            cursor.execute("""
-                INSERT INTO CHAT_MESSAGE 
-                (session_id, sender_type, message_text, intent_detected, confidence_score)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (session_id, sender_type, message_text, intent, 0.80))
-            
-            self.conn.commit()
-            cursor.close()
-            
+            get_chat_writer().enqueue(session_id, sender_type, message_text, intent, 0.80)
         except Exception as e:
             print(f"Error saving message: {e}")
             # Don't fail the request if message saving fails
-
@@ -1,8 +1,30 @@
 """
 Date Calculator for Consistent Year-to-Year Important Dates
 This module calculates registration and application deadlines based on semester structure.
+
+The dates of a (year, semester, is_international) combination never change, so
+they are computed once and memoized. get_date_table() computes a whole range
+of years with NumPy date arithmetic in one pass, for seeding IMPORTANT_DATE.
 """
+from collections import namedtuple
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+# Dates of one semester for one student group (datetime.date values)
+SemesterDates = namedtuple('SemesterDates', [
+    'semester_start', 'semester_end', 'registration_open', 'registration_close', 'application_deadline'
+])
+
+# Column-per-field table of generated dates; see DateCalculator.get_date_table
+CalendarTable = namedtuple('CalendarTable', [
+    'year', 'semester', 'is_international', 'event', 'start_date', 'end_date', 'event_type', 'description'
+])
+
+# Values of CalendarTable.event
+EVENT_REGISTRATION = 0
+EVENT_APPLICATION_DEADLINE = 1
 
 class DateCalculator:
     """Calculate important dates for admissions based on semester structure"""
@@ -67,12 +89,13 @@ class DateCalculator:
         return end_date
     
     @staticmethod
-    def get_registration_period(year, semester, is_international=False):
+    @lru_cache(maxsize=1024)
+    def get_semester_dates(year, semester, is_international=False):
         """
-        Calculate registration period for a semester
+        Every date of a semester for local or international students (memoized)
         
         Returns:
-            tuple: (registration_open_date, registration_close_date)
+            SemesterDates
         """
         semester_start = DateCalculator.get_semester_start_date(year, semester)
         
@@ -91,7 +114,28 @@ class DateCalculator:
             registration_open = registration_open - timedelta(weeks=weeks_earlier)
             registration_close = registration_close - timedelta(weeks=weeks_earlier)
         
-        return (registration_open.date(), registration_close.date())
+        # Application deadline is X weeks before registration opens
+        weeks_before = DateCalculator.APPLICATION_DEADLINE_WEEKS_BEFORE_REGISTRATION
+        application_deadline = registration_open - timedelta(weeks=weeks_before)
+        
+        return SemesterDates(
+            semester_start=semester_start.date(),
+            semester_end=DateCalculator.get_semester_end_date(year, semester).date(),
+            registration_open=registration_open.date(),
+            registration_close=registration_close.date(),
+            application_deadline=application_deadline.date()
+        )
+    
+    @staticmethod
+    def get_registration_period(year, semester, is_international=False):
+        """
+        Calculate registration period for a semester
+        
+        Returns:
+            tuple: (registration_open_date, registration_close_date)
+        """
+        dates = DateCalculator.get_semester_dates(year, semester, bool(is_international))
+        return (dates.registration_open, dates.registration_close)
     
     @staticmethod
     def get_application_deadline(year, semester, is_international=False):
@@ -100,13 +144,20 @@ class DateCalculator:
         
         Application deadline is X weeks before registration opens
         """
-        registration_open, _ = DateCalculator.get_registration_period(year, semester, is_international)
-        
-        # Application deadline is X weeks before registration opens
-        weeks_before = DateCalculator.APPLICATION_DEADLINE_WEEKS_BEFORE_REGISTRATION
-        application_deadline = registration_open - timedelta(weeks=weeks_before)
-        
-        return application_deadline
+        return DateCalculator.get_semester_dates(year, semester, bool(is_international)).application_deadline
+    
+    @staticmethod
+    def event_labels(semester, is_international):
+        """(registration event_type, deadline event_type, description suffix) for IMPORTANT_DATE rows"""
+        if is_international:
+            group = 'International Students'
+            audience = 'International students (earlier deadline for visa processing)'
+        else:
+            group = 'Local Students'
+            audience = 'Local Malaysian students'
+        return (f'Semester {semester} Registration ({group})',
+                f'Semester {semester} Application Deadline ({group})',
+                audience)
     
     @staticmethod
     def get_all_important_dates(year):
@@ -115,54 +166,116 @@ class DateCalculator:
         
         Returns a list of date dictionaries with event_type, start_date, end_date, etc.
         """
+        return [dict(item) for item in DateCalculator._important_dates(year)]
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _important_dates(year):
         dates = []
         
         for semester in [1, 2, 3]:
-            # Local student dates
-            reg_open, reg_close = DateCalculator.get_registration_period(year, semester, False)
-            app_deadline = DateCalculator.get_application_deadline(year, semester, False)
-            
-            dates.append({
-                'event_type': f'Semester {semester} Registration (Local Students)',
-                'start_date': reg_open,
-                'end_date': reg_close,
-                'description': f'Registration period for Semester {semester} - Local Malaysian students',
-                'is_international': False,
-                'semester': semester
-            })
-            
-            dates.append({
-                'event_type': f'Semester {semester} Application Deadline (Local Students)',
-                'start_date': app_deadline,
-                'end_date': app_deadline,
-                'description': f'Application deadline for Semester {semester} - Local Malaysian students',
-                'is_international': False,
-                'semester': semester
-            })
-            
-            # International student dates
-            reg_open_int, reg_close_int = DateCalculator.get_registration_period(year, semester, True)
-            app_deadline_int = DateCalculator.get_application_deadline(year, semester, True)
-            
-            dates.append({
-                'event_type': f'Semester {semester} Registration (International Students)',
-                'start_date': reg_open_int,
-                'end_date': reg_close_int,
-                'description': f'Registration period for Semester {semester} - International students (earlier deadline for visa processing)',
-                'is_international': True,
-                'semester': semester
-            })
-            
-            dates.append({
-                'event_type': f'Semester {semester} Application Deadline (International Students)',
-                'start_date': app_deadline_int,
-                'end_date': app_deadline_int,
-                'description': f'Application deadline for Semester {semester} - International students (earlier deadline for visa processing)',
-                'is_international': True,
-                'semester': semester
-            })
-        
-        return dates
+            for is_international in (False, True):
+                semester_dates = DateCalculator.get_semester_dates(year, semester, is_international)
+                registration, deadline, audience = DateCalculator.event_labels(semester, is_international)
+                
+                dates.append({
+                    'event_type': registration,
+                    'start_date': semester_dates.registration_open,
+                    'end_date': semester_dates.registration_close,
+                    'description': f'Registration period for Semester {semester} - {audience}',
+                    'is_international': is_international,
+                    'semester': semester
+                })
+                
+                dates.append({
+                    'event_type': deadline,
+                    'start_date': semester_dates.application_deadline,
+                    'end_date': semester_dates.application_deadline,
+                    'description': f'Application deadline for Semester {semester} - {audience}',
+                    'is_international': is_international,
+                    'semester': semester
+                })
+        
+        return tuple(dates)
+    
+    @staticmethod
+    def get_date_table(first_year, last_year, semesters=(1, 2, 3)):
+        """
+        Registration periods and application deadlines of every year in
+        [first_year, last_year], computed with array arithmetic in one pass
+        
+        Rows come in the order of get_all_important_dates (year, semester,
+        local before international, registration before deadline).
+        
+        Returns:
+            CalendarTable of read-only NumPy columns; start_date and end_date are
+            datetime64[D] (.tolist() gives datetime.date), event_type and
+            description are object arrays of str
+        """
+        return DateCalculator._date_table(int(first_year), int(last_year), tuple(semesters))
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _date_table(first_year, last_year, semesters):
+        for semester in semesters:
+            if semester not in DateCalculator.REGISTRATION_OPEN_MONTHS_BEFORE:
+                raise ValueError(f"Invalid semester: {semester}")
+        
+        # One row per (year, semester, is_international, event)
+        year, semester_index, international, event = (
+            axis.ravel() for axis in np.meshgrid(
+                np.arange(first_year, last_year + 1), np.arange(len(semesters)),
+                np.array([False, True]), np.array([EVENT_REGISTRATION, EVENT_APPLICATION_DEADLINE]),
+                indexing='ij'
+            )
+        )
+        
+        # Per-semester constants, looked up by semester position
+        start_month = np.array([
+            getattr(DateCalculator, f'SEMESTER_{semester}_START_MONTH') for semester in semesters
+        ])[semester_index]
+        open_days = np.array([
+            DateCalculator.REGISTRATION_OPEN_MONTHS_BEFORE[semester] * 30 for semester in semesters
+        ])[semester_index]
+        close_days = np.array([
+            DateCalculator.REGISTRATION_CLOSE_WEEKS_BEFORE[semester] * 7 for semester in semesters
+        ])[semester_index]
+        earlier_days = np.where(international, DateCalculator.INTERNATIONAL_DEADLINE_WEEKS_EARLIER * 7, 0)
+        
+        semester_start = ((year - 1970) * 12 + start_month - 1).astype('datetime64[M]').astype('datetime64[D]')
+        registration_open = semester_start - (open_days + earlier_days).astype('timedelta64[D]')
+        registration_close = semester_start - (close_days + earlier_days).astype('timedelta64[D]')
+        deadline = registration_open - np.timedelta64(
+            DateCalculator.APPLICATION_DEADLINE_WEEKS_BEFORE_REGISTRATION * 7, 'D')
+        
+        is_registration = event == EVENT_REGISTRATION
+        start_date = np.where(is_registration, registration_open, deadline)
+        end_date = np.where(is_registration, registration_close, deadline)
+        
+        # Labels of the 4 rows per semester, gathered by (semester, is_international, event)
+        event_types = []
+        descriptions = []
+        for semester in semesters:
+            for is_international in (False, True):
+                registration, deadline_label, audience = DateCalculator.event_labels(semester, is_international)
+                event_types += [registration, deadline_label]
+                descriptions += [f'Registration period for Semester {semester} - {audience}',
+                                 f'Application deadline for Semester {semester} - {audience}']
+        label_index = (semester_index * 2 + international) * 2 + event
+        
+        table = CalendarTable(
+            year=year,
+            semester=np.array(semesters)[semester_index],
+            is_international=international,
+            event=event,
+            start_date=start_date,
+            end_date=end_date,
+            event_type=np.array(event_types, dtype=object)[label_index],
+            description=np.array(descriptions, dtype=object)[label_index]
+        )
+        for column in table:
+            column.flags.writeable = False
+        return table
     
     @staticmethod
     def get_calculation_explanation():
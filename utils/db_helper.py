@@ -1,6 +1,16 @@
 """
 Database Helper Utilities
+
+All database access goes through a bounded, process-wide connection pool so
+that requests reuse authenticated MySQL sessions instead of running a full
+connect handshake every time.
 """
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import mysql.connector
 from mysql.connector import Error
 
@@ -14,13 +24,268 @@ DB_CONFIG = {
     'collation': 'utf8mb4_unicode_ci'
 }
 
+# Pool configuration - can be set via environment variables
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))  # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))  # recycle connections older than this
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', '30'))  # ping connections idle longer than this
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a MySQL connection borrowed from the pool.
+
+    Behaves like the underlying connection, except that close() hands the
+    connection back to the pool instead of tearing it down.
+    """
+
+    def __init__(self, pool, raw_conn, created_at):
+        self._pool = pool
+        self._raw = raw_conn
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        """Return the connection to the pool"""
+        if self.__dict__.get('_released', True):
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for code paths that forget to close the connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with health checks and metrics"""
+
+    def __init__(self, config, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, ping_after=DB_POOL_PING_AFTER):
+        self.config = dict(config)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw_conn, created_at, returned_at)
+        self._size = 0  # open connections, idle + in use
+        self._in_use = 0
+
+        # Metrics
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recycled = 0
+
+    def _connect(self):
+        return mysql.connector.connect(**self.config)
+
+    def _discard(self, raw_conn):
+        try:
+            raw_conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, raw_conn, created_at, returned_at, now):
+        """Check lifetime and, for connections idle a while, liveness"""
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - returned_at > self.ping_after:
+            try:
+                return raw_conn.is_connected()
+            except Exception:
+                return False
+        return True
+
+    def acquire(self):
+        """Borrow a connection, waiting up to `timeout` seconds for one to free up"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            raw_conn = None
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._checkout_failures += 1
+                        raise PoolTimeoutError(
+                            msg=f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    raw_conn, created_at, returned_at = self._idle.pop()
+                else:
+                    self._size += 1
+                self._in_use += 1
+
+            if raw_conn is not None:
+                if self._is_usable(raw_conn, created_at, returned_at, time.monotonic()):
+                    break
+                # Stale or dead connection - drop it and try again
+                self._discard(raw_conn)
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._recycled += 1
+                    self._cond.notify()
+                continue
+
+            try:
+                raw_conn = self._connect()
+                created_at = time.monotonic()
+                break
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._checkout_failures += 1
+                    self._cond.notify()
+                raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        return PooledConnection(self, raw_conn, created_at)
+
+    def _release(self, raw_conn, created_at):
+        """
+        Put a connection back, resetting its session first
+
+        COM_RESET_CONNECTION rolls back any open transaction and drops named
+        locks (GET_LOCK), user variables, temporary tables and session
+        settings, so the next borrower gets a clean session. A connection that
+        cannot be reset is closed instead.
+        """
+        now = time.monotonic()
+        keep = not (self.max_lifetime and now - created_at > self.max_lifetime)
+
+        if keep:
+            try:
+                if raw_conn.unread_result:
+                    raw_conn.consume_results()
+                keep = raw_conn.cmd_reset_connection()
+            except Exception:
+                keep = False
+
+        if not keep:
+            self._discard(raw_conn)
+
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((raw_conn, created_at, now))
+            else:
+                self._size -= 1
+                self._recycled += 1
+            self._cond.notify()
+
+    def close_all(self):
+        """Close every idle connection (in-use connections close when returned)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for raw_conn, _, _ in idle:
+            self._discard(raw_conn)
+
+    def stats(self):
+        """Snapshot of pool metrics"""
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'checkout_failures': self._checkout_failures,
+                'wait_time_total': round(self._wait_total, 6),
+                'wait_time_avg': round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+                'wait_time_max': round(self._wait_max, 6),
+                'recycled': self._recycled,
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                # A forked child must not share the parent's sockets
+                _pool = ConnectionPool(DB_CONFIG)
+                _pool_pid = pid
+    return _pool
+
+
+def get_pool_stats():
+    """Return pool metrics (in-use count, wait times, checkout failures, ...)"""
+    return get_pool().stats()
+
+
 def get_db_connection():
-    """Create and return database connection"""
+    """Borrow a database connection from the pool; close() returns it"""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        return get_pool().acquire()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
 
 
+def get_dedicated_connection():
+    """
+    Open a connection outside the pool; close() really disconnects
+
+    For sessions that hold server-side state between statements, such as a
+    named lock: the server releases it when the connection goes away, even if
+    the holder fails before releasing it.
+    """
+    try:
+        return mysql.connector.connect(**DB_CONFIG)
+    except Error as e:
+        print(f"Error connecting to MySQL: {e}")
+        return None
+
+
+@contextmanager
+def db_connection():
+    """
+    Context manager around get_db_connection()
+
+    Yields None if no connection could be obtained, matching get_db_connection.
+    """
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        if conn:
+            conn.close()
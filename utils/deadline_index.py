@@ -0,0 +1,288 @@
+"""
+Deadline Index - In-process, precomputed view of IMPORTANT_DATE
+
+Every important date is loaded once with its program, sorted by start date,
+and its status (expired/active/upcoming), urgency and days remaining are
+computed in Python instead of with CASE/DATEDIFF on every page view. The
+derived fields only change when the day does, so they are recomputed at
+midnight; the rows themselves are reloaded when the TTL expires or when a
+script that changes IMPORTANT_DATE calls invalidate_deadlines().
+
+Secondary indexes by program, level, status and urgency make filtered,
+paginated reads touch only the matching entries, and interval trees over the
+start/end dates (one overall, one per program) answer date-window queries
+without scanning every date. A date without an end date counts as a
+single-day event in window queries.
+"""
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from utils.db_helper import db_connection
+from utils.interval_tree import IntervalTree
+
+# Index configuration - can be set via environment variables
+DEADLINE_INDEX_TTL = float(os.getenv('DEADLINE_INDEX_TTL', '3600'))  # seconds before a reload
+DEADLINE_STAMP_FILE = os.getenv(
+    'DEADLINE_STAMP_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.deadlines_version')
+)
+DEADLINE_PAGE_SIZE = int(os.getenv('DEADLINE_PAGE_SIZE', '50'))  # default rows per page
+DEADLINE_MAX_PAGE_SIZE = 500
+
+URGENCY_LEVELS = ('critical', 'high', 'normal')
+STATUSES = ('expired', 'active', 'upcoming')
+
+
+def deadline_state(start_date, end_date, today):
+    """
+    Return (status, urgency, days_remaining) of a date range on a given day
+
+    Same rules the deadline pages have always used: a range is expired once
+    its end date has passed, active from its start date, otherwise upcoming;
+    it is critical when the end date is less than 7 days away and high when
+    less than 30.
+    """
+    if end_date is not None and end_date < today:
+        status = 'expired'
+    elif start_date <= today:
+        status = 'active'
+    else:
+        status = 'upcoming'
+
+    if end_date is not None and end_date < today + timedelta(days=7):
+        urgency = 'critical'
+    elif end_date is not None and end_date < today + timedelta(days=30):
+        urgency = 'high'
+    else:
+        urgency = 'normal'
+
+    days_remaining = (end_date - today).days if end_date is not None else None
+    return status, urgency, days_remaining
+
+
+class DeadlineIndexUnavailableError(RuntimeError):
+    """Raised when the index has never loaded and the database is unreachable"""
+
+
+class DeadlineIndex:
+    """Important dates sorted by start date, with status fields and filter indexes"""
+
+    def __init__(self, ttl=DEADLINE_INDEX_TTL, stamp_file=DEADLINE_STAMP_FILE):
+        self.ttl = ttl
+        self.stamp_file = stamp_file
+        self._lock = threading.Lock()
+
+        self._loaded_at = None
+        self._loaded_stamp = None
+        self._version = 0
+
+        self._rows = []
+        self._tree = IntervalTree([])
+        self._program_trees = {}
+        self._entries = []
+        self._today = None
+        self._by_program = {}
+        self._by_level = {}
+        self._by_status = {}
+        self._by_urgency = {}
+
+    def _read_stamp(self):
+        try:
+            return os.stat(self.stamp_file).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _is_stale(self):
+        if self._loaded_at is None:
+            return True
+        if time.monotonic() - self._loaded_at > self.ttl:
+            return True
+        return self._read_stamp() != self._loaded_stamp
+
+    def _load(self, conn):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id.date_id, id.event_type, id.start_date, id.end_date, id.description,
+                   p.program_name, p.program_id, p.level
+            FROM IMPORTANT_DATE id
+            JOIN PROGRAM p ON id.program_id = p.program_id
+            ORDER BY id.start_date ASC, id.date_id ASC
+        """)
+        self._rows = cursor.fetchall()
+        cursor.close()
+        self._build_trees()
+
+    def _build_trees(self):
+        """Interval trees over row positions, overall and per program"""
+        by_program = {}
+        intervals = []
+        for position, row in enumerate(self._rows):
+            interval = (row['start_date'], row['end_date'] or row['start_date'], position)
+            intervals.append(interval)
+            by_program.setdefault(row['program_id'], []).append(interval)
+        self._tree = IntervalTree(intervals)
+        self._program_trees = {program_id: IntervalTree(items) for program_id, items in by_program.items()}
+
+    def _materialize(self, today):
+        """Compute the date-dependent fields and rebuild the filter indexes"""
+        entries = []
+        by_program = {}
+        by_level = {}
+        by_status = {}
+        by_urgency = {}
+        for position, row in enumerate(self._rows):
+            status, urgency, days_remaining = deadline_state(row['start_date'], row['end_date'], today)
+            entries.append(dict(row, status=status, urgency=urgency, days_remaining=days_remaining))
+            by_program.setdefault(row['program_id'], []).append(position)
+            by_level.setdefault((row['level'] or '').lower(), []).append(position)
+            by_status.setdefault(status, []).append(position)
+            by_urgency.setdefault(urgency, []).append(position)
+
+        self._entries = entries
+        self._by_program = by_program
+        self._by_level = by_level
+        self._by_status = by_status
+        self._by_urgency = by_urgency
+        self._today = today
+
+    def _ensure_current(self):
+        today = date.today()
+        if not self._is_stale() and self._today == today:
+            return
+        with self._lock:
+            today = date.today()
+            if self._is_stale():
+                stamp = self._read_stamp()
+                with db_connection() as conn:
+                    if not conn:
+                        if self._loaded_at is None:
+                            raise DeadlineIndexUnavailableError("Database connection failed")
+                        print("Warning: Could not refresh deadline index, serving cached data")
+                    else:
+                        self._load(conn)
+                        self._loaded_stamp = stamp
+                        self._loaded_at = time.monotonic()
+                        self._today = None
+            if self._today != today:
+                self._materialize(today)
+                self._version += 1
+
+    @property
+    def version(self):
+        """Counter that changes on every reload and every day"""
+        self._ensure_current()
+        return self._version
+
+    def invalidate(self):
+        """Drop the snapshot so the next access reloads it"""
+        with self._lock:
+            self._loaded_at = None
+
+    def all(self):
+        """Every date in start-date order (shared entries, must not be modified)"""
+        self._ensure_current()
+        return list(self._entries)
+
+    def upcoming(self, limit=10):
+        """The first `limit` dates whose end date has not passed, by start date"""
+        self._ensure_current()
+        today = self._today
+        result = []
+        for entry in self._entries:
+            if entry['end_date'] is not None and entry['end_date'] >= today:
+                result.append(entry)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def window(self, start, end=None, program_id=None):
+        """
+        Dates overlapping [start, end] (end=None: no upper bound), in start-date order
+
+        With program_id only that program's dates are searched.
+        """
+        self._ensure_current()
+        tree = self._tree if program_id is None else self._program_trees.get(program_id)
+        if tree is None:
+            return []
+        return [self._entries[p] for p in tree.overlapping(start, end or date.max)]
+
+    def upcoming_within(self, days_ahead=None, program_id=None):
+        """Dates that have not ended and start within days_ahead days (None: any time)"""
+        self._ensure_current()
+        today = self._today
+        end = today + timedelta(days=days_ahead) if days_ahead is not None else None
+        return self.window(today, end, program_id)
+
+    def query(self, program_id=None, level=None, status=None, urgency=None,
+              page=1, per_page=DEADLINE_PAGE_SIZE):
+        """
+        Filtered page of dates in start-date order
+
+        Returns:
+            dict with dates, total, page, per_page and pages
+        """
+        positions = self._positions(program_id, level, status, urgency)
+        per_page = max(1, min(per_page, DEADLINE_MAX_PAGE_SIZE))
+        page = max(1, page)
+        total = len(positions)
+        start = (page - 1) * per_page
+        return {
+            'dates': [self._entries[p] for p in positions[start:start + per_page]],
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page,
+        }
+
+    def matching(self, program_id=None, level=None, status=None, urgency=None):
+        """Every date matching the filters, in start-date order (unpaginated, e.g. for feeds)"""
+        return [self._entries[p] for p in self._positions(program_id, level, status, urgency)]
+
+    def _positions(self, program_id, level, status, urgency):
+        self._ensure_current()
+        candidates = []
+        if program_id is not None:
+            candidates.append(self._by_program.get(program_id, []))
+        if level:
+            candidates.append(self._by_level.get(level.lower(), []))
+        if status:
+            candidates.append(self._by_status.get(status, []))
+        if urgency:
+            candidates.append(self._by_urgency.get(urgency, []))
+
+        if candidates:
+            # Walk the shortest position list and test the remaining filters per entry
+            candidates.sort(key=len)
+            others = [set(positions) for positions in candidates[1:]]
+            positions = [p for p in candidates[0] if all(p in other for other in others)]
+        else:
+            positions = range(len(self._entries))
+        return positions
+
+
+_index = DeadlineIndex()
+
+
+def get_deadline_index():
+    """Return the process-wide deadline index"""
+    return _index
+
+
+def invalidate_deadlines():
+    """
+    Mark IMPORTANT_DATE as changed.
+
+    Touches the stamp file so every running app process reloads on its next
+    access, and clears the snapshot held by the current process.
+    """
+    try:
+        with open(DEADLINE_STAMP_FILE, 'a'):
+            pass
+        now = time.time_ns()
+        os.utime(DEADLINE_STAMP_FILE, ns=(now, now))
+    except OSError as e:
+        print(f"Warning: Could not update deadline stamp file: {e}")
+    _index.invalidate()
@@ -1,76 +1,57 @@
 """
 Deadline Tracker helper for important admission dates.
 """
-from datetime import datetime
+from utils.deadline_index import get_deadline_index, DEADLINE_PAGE_SIZE
 
 
 class DeadlineTracker:
     """Provide helpers to fetch important dates for admissions."""
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection=None):
+        # Dates come from the shared in-process index; the connection is kept
+        # for callers that still pass one.
         self.conn = db_connection
+        self.index = get_deadline_index()
 
-    def get_upcoming_dates(self, limit=10):
-        """Return upcoming important dates ordered by start date."""
+    def get_upcoming_dates(self, days_ahead=None, limit=None):
+        """
+        Return dates that have not ended and start within the next days_ahead days.
+
+        Ordered by start date; days_ahead=None means no horizon, limit caps the number of rows.
+        """
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute(
-                """
-                SELECT id.event_type,
-                       id.start_date,
-                       id.end_date,
-                       id.description,
-                       p.program_name,
-                       p.program_id
-                FROM IMPORTANT_DATE id
-                JOIN PROGRAM p ON id.program_id = p.program_id
-                WHERE id.end_date >= CURDATE()
-                ORDER BY id.start_date ASC
-                LIMIT %s
-                """,
-                (limit,),
-            )
-            dates = cursor.fetchall()
-            cursor.close()
-            return dates
+            dates = self.index.upcoming_within(days_ahead)
+            return dates[:limit] if limit is not None else dates
         except Exception as exc:  # pragma: no cover - defensive
             print(f"Error fetching upcoming dates: {exc}")
             return []
 
+    def get_program_dates(self, program_id, days_ahead=None):
+        """Return one program's dates that have not ended and start within the next days_ahead days."""
+        try:
+            return self.index.upcoming_within(days_ahead, program_id=program_id)
+        except Exception as exc:  # pragma: no cover - defensive
+            print(f"Error fetching program dates: {exc}")
+            return []
+
+    def get_dates_between(self, start_date, end_date=None, program_id=None):
+        """Return every date overlapping [start_date, end_date], optionally for one program."""
+        try:
+            return self.index.window(start_date, end_date, program_id=program_id)
+        except Exception as exc:  # pragma: no cover - defensive
+            print(f"Error fetching dates: {exc}")
+            return []
+
     def get_all_dates(self):
-        """Return all important dates sorted by most recent first."""
+        """Return all important dates ordered by start date, with status, urgency and days remaining."""
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute(
-                """
-                SELECT id.event_type,
-                       id.start_date,
-                       id.end_date,
-                       id.description,
-                       p.program_name,
-                       p.program_id,
-                       p.level,
-                       CASE 
-                           WHEN id.end_date < CURDATE() THEN 'expired'
-                           WHEN id.start_date <= CURDATE() AND (id.end_date IS NULL OR id.end_date >= CURDATE()) THEN 'active'
-                           ELSE 'upcoming'
-                       END as status,
-                       CASE 
-                           WHEN id.end_date IS NOT NULL AND id.end_date < DATE_ADD(CURDATE(), INTERVAL 7 DAY) THEN 'critical'
-                           WHEN id.end_date IS NOT NULL AND id.end_date < DATE_ADD(CURDATE(), INTERVAL 30 DAY) THEN 'high'
-                           ELSE 'normal'
-                       END as urgency,
-                       DATEDIFF(id.end_date, CURDATE()) as days_remaining
-                FROM IMPORTANT_DATE id
-                JOIN PROGRAM p ON id.program_id = p.program_id
-                ORDER BY id.start_date ASC
-                """
-            )
-            dates = cursor.fetchall()
-            cursor.close()
-            return dates
+            return self.index.all()
         except Exception as exc:  # pragma: no cover - defensive
             print(f"Error fetching all dates: {exc}")
             return []
 
-
+    def get_dates_page(self, program_id=None, level=None, status=None, urgency=None,
+                       page=1, per_page=DEADLINE_PAGE_SIZE):
+        """Return one page of important dates, optionally filtered by program, level, status or urgency."""
+        return self.index.query(program_id=program_id, level=level, status=status,
+                                urgency=urgency, page=page, per_page=per_page)
@@ -2,6 +2,7 @@
 Document Checklist Generator - Customized based on program, country, and eligibility
 """
 from datetime import datetime
+from utils.program_catalog import get_catalog
 
 class DocumentChecklistGenerator:
     """Generate customized document checklists"""
@@ -90,20 +91,9 @@ class DocumentChecklistGenerator:
         }
     
     def get_program_info(self, program_id):
-        """Get program information"""
+        """Get program information from the cached program catalog"""
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT p.*, f.faculty_name
-                FROM PROGRAM p
-                JOIN FACULTY f ON p.faculty_id = f.faculty_id
-                WHERE p.program_id = %s
-            """, (program_id,))
-            
-            program = cursor.fetchone()
-            cursor.close()
-            
-            return program
+            return get_catalog().get_program(program_id)
         except Exception as e:
             return None
     
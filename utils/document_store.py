@@ -0,0 +1,335 @@
+"""
+Document Store - Content-addressed storage for uploaded documents
+
+Every upload is stored once under its SHA-256 (blobs/ab/cd/abcd...), so an
+applicant who sends the same IC, transcript or photo with several
+applications uses the disk space of one copy. DOCUMENT_BLOB counts how many
+APPLICATION_DOCUMENT rows point at each blob; blobs nobody references any
+more, and files whose transaction never committed, are removed by
+collect_garbage() after a grace period.
+
+Uploads and garbage collection are serialized on the DOCUMENT_BLOB row: put()
+only writes a temporary file, which place() moves into the store (or drops,
+when the content is already there) after add_references() has locked the row
+in the submission's transaction. The collector deletes a row and its file
+while holding the same lock, so a file is never removed between an upload
+finding it and the upload's reference being committed.
+
+Command line:
+    python -m utils.document_store gc [--grace-hours 24] [--dry-run]
+
+Table: Database/document_store_migration.sql
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from utils.db_helper import db_connection
+
+# Store configuration - can be set via environment variables
+DOCUMENT_STORE_DIR = os.getenv(
+    'DOCUMENT_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'blobs')
+)
+DOCUMENT_GC_GRACE_HOURS = float(os.getenv('DOCUMENT_GC_GRACE_HOURS', '24'))  # age before unreferenced blobs go
+# Let a front-end server (nginx/Apache) send document files via the X-Sendfile header
+USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() in ('1', 'true', 'yes')
+
+Blob = namedtuple('Blob', ['sha256', 'path', 'size', 'tmp_path'])
+
+
+class BlobTooLargeError(ValueError):
+    """Raised by DocumentStore.put when the stream exceeds max_size"""
+
+
+class DocumentStore:
+    """Files on disk addressed by the SHA-256 of their content"""
+
+    def __init__(self, root=DOCUMENT_STORE_DIR):
+        self.root = root
+        self._tmp_dir = os.path.join(root, 'tmp')
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return os.path.exists(self.path_for(sha256))
+
+    def put(self, stream, max_size=None, chunk_size=64 * 1024):
+        """
+        Copy a binary stream to a temporary file, reading it in chunks and hashing it on the way
+
+        The file is not in the store yet: call place() once add_references()
+        has locked the blob's row, or discard() if the upload is abandoned.
+
+        Returns:
+            Blob; path is where the content will be stored
+        """
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLargeError(f"larger than {max_size} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            sha256 = digest.hexdigest()
+            return Blob(sha256, self.path_for(sha256), size, tmp_path)
+        except BaseException:
+            self.discard(tmp_path)
+            raise
+
+    def place(self, sha256, tmp_path):
+        """
+        Move a put() file into the store; call with the blob's DOCUMENT_BLOB row locked
+
+        Returns:
+            True if the file was added, False if identical content was already stored
+        """
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            # Already stored: keep the existing file and mark it as recently used
+            self.discard(tmp_path)
+            os.utime(path)
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return True
+
+    @staticmethod
+    def discard(tmp_path):
+        """Remove a put() file that was not placed (no-op once it has been)"""
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def remove(self, sha256, older_than=None):
+        """Delete a blob file (only if its mtime is before older_than, when given)"""
+        path = self.path_for(sha256)
+        try:
+            if older_than is not None and os.stat(path).st_mtime >= older_than:
+                return False
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_blobs(self):
+        """Yield (sha256, mtime) of every stored file"""
+        for prefix in os.listdir(self.root) if os.path.isdir(self.root) else ():
+            if len(prefix) != 2:
+                continue
+            for sub in os.listdir(os.path.join(self.root, prefix)):
+                directory = os.path.join(self.root, prefix, sub)
+                for name in os.listdir(directory):
+                    try:
+                        yield name, os.stat(os.path.join(directory, name)).st_mtime
+                    except FileNotFoundError:
+                        continue
+
+    def remove_partial(self, older_than):
+        """Delete put() files left behind by a crashed process; returns how many"""
+        removed = 0
+        for name in os.listdir(self._tmp_dir) if os.path.isdir(self._tmp_dir) else ():
+            path = os.path.join(self._tmp_dir, name)
+            try:
+                if os.stat(path).st_mtime < older_than:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_document_store():
+    """Return the process-wide document store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DocumentStore()
+    return _store
+
+
+def add_references(cursor, blobs):
+    """
+    Count one reference per (sha256, size, content_type); call in the transaction
+    that inserts the APPLICATION_DOCUMENT rows, before inserting them
+
+    The upsert locks each DOCUMENT_BLOB row until the transaction ends, which
+    is what makes DocumentStore.place() safe against collect_garbage().
+    """
+    if not blobs:
+        return
+    cursor.executemany("""
+        INSERT INTO DOCUMENT_BLOB (sha256, file_size, content_type, ref_count)
+        VALUES (%s, %s, %s, 1)
+        ON DUPLICATE KEY UPDATE ref_count = ref_count + 1, last_referenced_at = NOW()
+    """, list(blobs))
+
+
+def recount_references(cursor, conn):
+    """
+    Correct ref_count of blobs that no APPLICATION_DOCUMENT row uses any more
+
+    Documents are only deleted through foreign-key cascades (an application,
+    applicant or checklist entry being removed), which fire no triggers, so
+    the count is reconciled here. Each candidate row is locked before its
+    documents are counted; a submission takes the same lock before inserting
+    its documents, so a reference being added is never missed.
+
+    Returns:
+        number of blobs whose count was corrected
+    """
+    cursor.execute("""
+        SELECT b.sha256 FROM DOCUMENT_BLOB b
+        WHERE b.ref_count > 0
+          AND NOT EXISTS (SELECT 1 FROM APPLICATION_DOCUMENT d WHERE d.sha256 = b.sha256)
+    """)
+    corrected = 0
+    for (sha256,) in cursor.fetchall():
+        cursor.execute("SELECT ref_count FROM DOCUMENT_BLOB WHERE sha256 = %s FOR UPDATE", (sha256,))
+        row = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM APPLICATION_DOCUMENT WHERE sha256 = %s LOCK IN SHARE MODE",
+                       (sha256,))
+        (refs,) = cursor.fetchone()
+        if row is not None and row[0] != refs:
+            cursor.execute("""
+                UPDATE DOCUMENT_BLOB SET ref_count = %s, last_referenced_at = NOW() WHERE sha256 = %s
+            """, (refs, sha256))
+            corrected += 1
+        conn.commit()
+    return corrected
+
+
+def collect_garbage(grace_hours=DOCUMENT_GC_GRACE_HOURS, dry_run=False, store=None):
+    """
+    Remove blobs that are no longer referenced
+
+    Reference counts are first reconciled with APPLICATION_DOCUMENT (see
+    recount_references). A blob is then removed when its DOCUMENT_BLOB row has
+    had no references for grace_hours, or when the file has had no row at all
+    for that long (its submission rolled back). Both deletes happen with the
+    row, or the gap where it would be, locked, so they wait for and then see
+    any submission that is adding a reference to the same content.
+
+    Returns:
+        dict with the number of recounted, unreferenced and orphaned blobs
+    """
+    store = store or get_document_store()
+    cutoff = time.time() - grace_hours * 3600
+    removed = {'recounted': 0, 'unreferenced': 0, 'orphaned': 0}
+
+    with db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Database connection failed")
+        cursor = conn.cursor()
+
+        if not dry_run:
+            removed['recounted'] = recount_references(cursor, conn)
+
+        cursor.execute("""
+            SELECT sha256 FROM DOCUMENT_BLOB
+            WHERE ref_count = 0 AND last_referenced_at < NOW() - INTERVAL %s SECOND
+        """, (int(grace_hours * 3600),))
+        for (sha256,) in cursor.fetchall():
+            if dry_run:
+                removed['unreferenced'] += 1
+                continue
+            # The DELETE locks the row until commit, so an upload of the same content
+            # waits in add_references() and then finds the file gone and places its own copy
+            cursor.execute("DELETE FROM DOCUMENT_BLOB WHERE sha256 = %s AND ref_count = 0", (sha256,))
+            if cursor.rowcount:
+                store.remove(sha256, older_than=cutoff)
+                removed['unreferenced'] += 1
+            conn.commit()
+
+        # Files without a row, checked against the table in batches
+        batch = []
+
+        def check(batch):
+            # A locking read waits for uncommitted inserts of these rows and
+            # gap-locks the missing ones, so no upload can reference them until commit
+            placeholders = ','.join(['%s'] * len(batch))
+            cursor.execute(f"SELECT sha256 FROM DOCUMENT_BLOB WHERE sha256 IN ({placeholders})"
+                           + ("" if dry_run else " FOR UPDATE"), batch)
+            known = {row[0] for row in cursor.fetchall()}
+            for sha256 in batch:
+                if sha256 not in known and (dry_run or store.remove(sha256, older_than=cutoff)):
+                    removed['orphaned'] += 1
+            conn.commit()
+
+        for sha256, mtime in store.iter_blobs():
+            if mtime < cutoff:
+                batch.append(sha256)
+            if len(batch) >= 500:
+                check(batch)
+                batch = []
+        if batch:
+            check(batch)
+        cursor.close()
+
+    if not dry_run:
+        removed['orphaned'] += store.remove_partial(cutoff)
+
+    return removed
+
+
+def store_stats():
+    """Logical vs. stored bytes, i.e. how much deduplication saves"""
+    with db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Database connection failed")
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(file_size), 0), COALESCE(SUM(file_size * ref_count), 0)
+            FROM DOCUMENT_BLOB WHERE ref_count > 0
+        """)
+        blobs, stored_bytes, referenced_bytes = cursor.fetchone()
+        cursor.close()
+    return {
+        'blobs': blobs,
+        'stored_bytes': int(stored_bytes),
+        'referenced_bytes': int(referenced_bytes),
+        'saved_bytes': int(referenced_bytes) - int(stored_bytes),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Maintain the uploaded document store')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    gc_parser = subparsers.add_parser('gc', help='remove unreferenced blobs')
+    gc_parser.add_argument('--grace-hours', type=float, default=DOCUMENT_GC_GRACE_HOURS)
+    gc_parser.add_argument('--dry-run', action='store_true', help='only count what would be removed')
+    subparsers.add_parser('stats', help='show deduplication savings')
+    args = parser.parse_args(argv)
+
+    if args.command == 'gc':
+        removed = collect_garbage(args.grace_hours, args.dry_run)
+        action = 'Would remove' if args.dry_run else 'Removed'
+        print(f"{action} {removed['unreferenced']} unreferenced and {removed['orphaned']} orphaned blob(s)"
+              + (f"; corrected {removed['recounted']} reference count(s)" if removed['recounted'] else ""))
+    else:
+        print(store_stats())
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,374 @@
+"""
+Document Verifier - Background checks of uploaded application documents
+
+Submissions only insert APPLICATION_DOCUMENT rows with verification_status
+'Pending'. Verifier processes claim pending rows in batches (the same claim
+pattern as the email outbox, so any number of them can run side by side),
+check the files in a pool of worker processes and write the outcomes back
+with one batched UPDATE per outcome.
+
+Checks: the file is intact (size and SHA-256 match what was uploaded), its
+real type sniffed from the content is PDF, JPEG or PNG, PDFs are complete,
+not password protected and not too long, and images are large enough to
+read. Documents that pass are marked Verified; the others are Rejected with
+the reason in verification_notes.
+
+Run with: python -m utils.document_verifier [--once] [--workers N]
+Table changes: Database/document_verification_migration.sql
+"""
+import argparse
+import hashlib
+import os
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+
+from utils.db_helper import db_connection
+from utils.document_store import get_document_store
+from utils.process_pool import new_process_pool
+
+# Verifier configuration - can be set via environment variables
+VERIFY_WORKERS = int(os.getenv('VERIFY_WORKERS', str(os.cpu_count() or 1)))  # checking processes
+VERIFY_BATCH_SIZE = int(os.getenv('VERIFY_BATCH_SIZE', '100'))  # documents claimed per round
+VERIFY_POLL_INTERVAL = float(os.getenv('VERIFY_POLL_INTERVAL', '5'))  # seconds between empty polls
+VERIFY_CLAIM_TIMEOUT = int(os.getenv('VERIFY_CLAIM_TIMEOUT', '600'))  # seconds before a crashed claim is retaken
+VERIFY_MAX_ATTEMPTS = int(os.getenv('VERIFY_MAX_ATTEMPTS', '5'))  # unreadable files are then rejected
+VERIFY_MAX_PDF_PAGES = int(os.getenv('VERIFY_MAX_PDF_PAGES', '100'))
+VERIFY_MIN_IMAGE_SIDE = int(os.getenv('VERIFY_MIN_IMAGE_SIDE', '300'))  # pixels
+
+# Document types that must be a picture rather than a scan in a PDF
+IMAGE_ONLY_DOCUMENTS = {'doc_photo'}
+
+_PDF_PAGE = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+_PDF_PAGES_COUNT = re.compile(rb'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b', re.S)
+
+
+def sniff_type(header):
+    """Real file type from the first bytes: 'pdf', 'jpeg', 'png' or None"""
+    if header.startswith(b'%PDF-'):
+        return 'pdf'
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    return None
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Return (size, sha256 hex) of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def png_size(f):
+    """(width, height) from the IHDR chunk; None if the file is cut short"""
+    f.seek(16)
+    data = f.read(8)
+    if len(data) < 8:
+        return None
+    return struct.unpack('>II', data)
+
+
+def jpeg_size(f):
+    """(width, height) from the first start-of-frame marker; None if there is none or the file is cut short"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0x01, 0xd8) or 0xd0 <= marker <= 0xd7:
+            continue  # markers without a length
+        if marker == 0xd9:
+            return None
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>xHH', frame)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def pdf_info(path):
+    """Return (page_count or None, encrypted, complete) of a PDF"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Pages inside compressed object streams cannot be counted without inflating them
+    counts = [int(a or b) for a, b in _PDF_PAGES_COUNT.findall(data)]
+    page_count = max(counts) if counts else (len(_PDF_PAGE.findall(data)) or None)
+    return page_count, b'/Encrypt' in data, b'%%EOF' in data[-2048:]
+
+
+def verify_document(job):
+    """
+    Check one document file
+
+    Args:
+        job: dict with doc_id, path, sha256, file_size and document_type
+
+    Returns:
+        dict with doc_id, status ('Verified' or 'Rejected'), notes, detected_type,
+        page_count, width and height
+
+    Raises:
+        OSError: the file could not be read (the claim is retried)
+    """
+    result = {'doc_id': job['doc_id'], 'status': 'Verified', 'notes': 'Automatic checks passed',
+              'detected_type': None, 'page_count': None, 'width': None, 'height': None}
+
+    def reject(reason):
+        result['status'] = 'Rejected'
+        result['notes'] = reason
+        return result
+
+    if job.get('sha256') or job.get('file_size') is not None:
+        size, sha256 = file_digest(job['path'])
+        if job.get('file_size') is not None and size != job['file_size']:
+            return reject(f"File is incomplete ({size} of {job['file_size']} bytes)")
+        if job.get('sha256') and sha256 != job['sha256']:
+            return reject("File is corrupted (checksum mismatch)")
+
+    with open(job['path'], 'rb') as f:
+        detected = result['detected_type'] = sniff_type(f.read(16))
+        if detected is None:
+            return reject("Unsupported file type (only PDF, JPEG and PNG are accepted)")
+        if detected in ('jpeg', 'png'):
+            dimensions = png_size(f) if detected == 'png' else jpeg_size(f)
+            if dimensions is None:
+                return reject("Image is damaged (no image size found)")
+            result['width'], result['height'] = dimensions
+
+    if job.get('document_type') in IMAGE_ONLY_DOCUMENTS and detected == 'pdf':
+        return reject("A photo must be a JPEG or PNG image")
+
+    if detected == 'pdf':
+        page_count, encrypted, complete = pdf_info(job['path'])
+        result['page_count'] = page_count
+        if not complete:
+            return reject("PDF is incomplete (no end-of-file marker)")
+        if encrypted:
+            return reject("PDF is password protected")
+        if page_count is not None and page_count > VERIFY_MAX_PDF_PAGES:
+            return reject(f"PDF has {page_count} pages (maximum {VERIFY_MAX_PDF_PAGES})")
+        if page_count is None:
+            result['notes'] = 'Automatic checks passed (page count not determined)'
+    elif min(result['width'], result['height']) < VERIFY_MIN_IMAGE_SIDE:
+        return reject(f"Image resolution too low ({result['width']}x{result['height']}, "
+                      f"minimum {VERIFY_MIN_IMAGE_SIDE} px per side)")
+
+    return result
+
+
+def _verify(job):
+    """Pool entry point: never raises, so one bad file cannot fail the batch"""
+    try:
+        return verify_document(job)
+    except Exception as e:
+        return {'doc_id': job['doc_id'], 'error': f"{type(e).__name__}: {e}"[:500]}
+
+
+class DocumentVerifier:
+    """Claim, check and settle pending APPLICATION_DOCUMENT rows"""
+
+    def __init__(self, workers=VERIFY_WORKERS, batch_size=VERIFY_BATCH_SIZE,
+                 claim_timeout=VERIFY_CLAIM_TIMEOUT, max_attempts=VERIFY_MAX_ATTEMPTS):
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.claim_timeout = claim_timeout
+        self.max_attempts = max_attempts
+        self.worker_name = f"{socket.gethostname()[:40]}:{os.getpid()}"
+        self._executor = None
+
+        # Metrics
+        self.verified = 0
+        self.rejected = 0
+        self.retried = 0
+        self.seconds = 0.0
+
+    def _pool(self):
+        if self._executor is None and self.workers > 1:
+            self._executor = new_process_pool(self.workers)
+        return self._executor
+
+    def _claim(self, conn):
+        """Atomically take ownership of pending documents (and those of crashed verifiers)"""
+        token = f"{self.worker_name}:{uuid.uuid4().hex[:8]}"
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            UPDATE APPLICATION_DOCUMENT
+            SET verification_claimed_by = %s, verification_claimed_at = NOW(),
+                verification_attempts = verification_attempts + 1
+            WHERE verification_status = 'Pending'
+              AND (verification_claimed_at IS NULL
+                   OR verification_claimed_at < NOW() - INTERVAL %s SECOND)
+            ORDER BY doc_id
+            LIMIT %s
+        """, (token, self.claim_timeout, self.batch_size))
+        conn.commit()
+
+        cursor.execute("""
+            SELECT doc_id, file_path, sha256, file_size, document_type, verification_attempts
+            FROM APPLICATION_DOCUMENT
+            WHERE verification_claimed_by = %s AND verification_status = 'Pending'
+        """, (token,))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def check(self, jobs):
+        """Run verify_document over jobs, in the process pool when there is more than one worker"""
+        pool = self._pool()
+        if pool is None:
+            return [_verify(job) for job in jobs]
+        return list(pool.map(_verify, jobs, chunksize=max(1, len(jobs) // (self.workers * 4))))
+
+    def run_once(self):
+        """Process one batch; returns the number of documents claimed"""
+        with db_connection() as conn:
+            if not conn:
+                print("Error: Could not connect to database for document verification")
+                return 0
+
+            rows = self._claim(conn)
+            if not rows:
+                return 0
+
+            started = time.monotonic()
+            store = get_document_store()
+            # Documents sharing a blob (and the same image-only rule) are checked once
+            def job_key(row):
+                return (row['sha256'] or f"doc:{row['doc_id']}", row['document_type'] in IMAGE_ONLY_DOCUMENTS)
+
+            jobs = {}
+            for row in rows:
+                key = job_key(row)
+                if key not in jobs:
+                    path = store.path_for(row['sha256']) if row['sha256'] else row['file_path']
+                    jobs[key] = {'doc_id': row['doc_id'], 'path': path, 'sha256': row['sha256'],
+                                 'file_size': row['file_size'], 'document_type': row['document_type']}
+            results = dict(zip(jobs, self.check(list(jobs.values()))))
+
+            settled = []
+            retries = []
+            for row in rows:
+                result = results[job_key(row)]
+                if 'error' not in result:
+                    settled.append((result['status'], result['notes'], result['detected_type'],
+                                    result['page_count'], result['width'], result['height'], row['doc_id']))
+                elif row['verification_attempts'] >= self.max_attempts:
+                    settled.append(('Rejected', f"File could not be read: {result['error']}"[:500],
+                                    None, None, None, None, row['doc_id']))
+                else:
+                    retries.append((result['error'], row['doc_id']))
+
+            cursor = conn.cursor()
+            if settled:
+                cursor.executemany("""
+                    UPDATE APPLICATION_DOCUMENT
+                    SET verification_status = %s, verification_notes = %s, detected_type = %s,
+                        page_count = %s, image_width = %s, image_height = %s,
+                        verified_at = NOW(), verification_claimed_by = NULL
+                    WHERE doc_id = %s
+                """, settled)
+            if retries:
+                # Left claimed: the claim timeout doubles as the retry delay
+                cursor.executemany("""
+                    UPDATE APPLICATION_DOCUMENT
+                    SET verification_notes = %s
+                    WHERE doc_id = %s
+                """, retries)
+            conn.commit()
+            cursor.close()
+
+        self.verified += sum(1 for row in settled if row[0] == 'Verified')
+        self.rejected += sum(1 for row in settled if row[0] == 'Rejected')
+        self.retried += len(retries)
+        self.seconds += time.monotonic() - started
+        return len(rows)
+
+    def run_forever(self, stop_event=None, poll_interval=VERIFY_POLL_INTERVAL):
+        """Verify documents until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                print(f"Error verifying documents: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                stop_event.wait(poll_interval)
+
+    def stats(self):
+        """Snapshot of verifier metrics"""
+        checked = self.verified + self.rejected
+        return {
+            'workers': self.workers,
+            'verified': self.verified,
+            'rejected': self.rejected,
+            'retried': self.retried,
+            'documents_per_second': round(checked / self.seconds, 1) if self.seconds else None,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def verification_stats():
+    """Number of documents per verification status"""
+    with db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Database connection failed")
+        cursor = conn.cursor()
+        cursor.execute("SELECT verification_status, COUNT(*) FROM APPLICATION_DOCUMENT GROUP BY verification_status")
+        counts = {status: count for status, count in cursor.fetchall()}
+        cursor.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Verify uploaded application documents')
+    parser.add_argument('--once', action='store_true', help='process a single batch and exit')
+    parser.add_argument('--workers', type=int, default=VERIFY_WORKERS, help='checking processes')
+    args = parser.parse_args(argv)
+
+    verifier = DocumentVerifier(workers=args.workers)
+    try:
+        if args.once:
+            print(f"Processed {verifier.run_once()} document(s): {verifier.stats()}")
+            return 0
+
+        print(f"Document verifier {verifier.worker_name} started with {verifier.workers} worker(s)")
+        try:
+            verifier.run_forever()
+        except KeyboardInterrupt:
+            pass
+        print(f"Document verifier stopped: {verifier.stats()}")
+        return 0
+    finally:
+        verifier.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -2,8 +2,27 @@
 Eligibility Checker - NLP-like matching for admission requirements
 """
 import re
+import threading
+from collections import namedtuple
 from datetime import datetime
 
+# Common academic keywords looked for in additional requirements
+ACADEMIC_KEYWORDS = ['mathematics', 'math', 'english', 'physics', 'chemistry',
+                     'biology', 'additional mathematics', 'add math', 'science']
+
+# Values derived from one ADMISSION_REQUIREMENT row
+ParsedRequirement = namedtuple('ParsedRequirement', ['qualification', 'minimum_grade', 'keywords'])
+
+# Process-wide parse cache: requirement_id -> (source columns, ParsedRequirement)
+_parsed_requirements = {}
+_parsed_requirements_lock = threading.Lock()
+
+
+def clear_requirement_cache():
+    """Forget every parsed requirement; the program catalog calls this on every reload"""
+    with _parsed_requirements_lock:
+        _parsed_requirements.clear()
+
 class EligibilityChecker:
     """Check applicant eligibility against program requirements using NLP-like matching"""
     
@@ -73,20 +92,35 @@ class EligibilityChecker:
         if not text:
             return []
         
-        # Common academic keywords
-        keywords = ['mathematics', 'math', 'english', 'physics', 'chemistry',
-                   'biology', 'additional mathematics', 'add math', 'science']
-        
         text_lower = text.lower()
-        found_keywords = [kw for kw in keywords if kw in text_lower]
+        found_keywords = [kw for kw in ACADEMIC_KEYWORDS if kw in text_lower]
         
         return found_keywords
     
+    def parse_requirement(self, req):
+        """
+        Return the normalized qualification, numeric minimum grade and keywords of a requirement row
+
+        Results are cached by requirement_id and re-parsed only when the row's text changes.
+        """
+        source = (req['qualification_type'], req['minimum_grade'], req['additional_requirements'])
+        requirement_id = req.get('requirement_id')
+        cached = _parsed_requirements.get(requirement_id) if requirement_id is not None else None
+        if cached and cached[0] == source:
+            return cached[1]
+        
+        parsed = ParsedRequirement(
+            qualification=self.normalize_qualification(req['qualification_type'] or ''),
+            minimum_grade=self.parse_grade(req['minimum_grade']) if req['minimum_grade'] else None,
+            keywords=tuple(self.extract_keywords(req['additional_requirements']))
+        )
+        if requirement_id is not None:
+            with _parsed_requirements_lock:
+                _parsed_requirements[requirement_id] = (source, parsed)
+        return parsed
+    
     def check_eligibility(self, program_id, qualification, grades, additional_info=None):
         """Check if applicant meets program requirements"""
-        if additional_info is None:
-            additional_info = {}
-        
         try:
             cursor = self.conn.cursor(dictionary=True)
             
@@ -99,113 +133,130 @@ class EligibilityChecker:
             """, (program_id,))
             
             requirements = cursor.fetchall()
+            cursor.close()
+            
+            return self.evaluate_requirements(requirements, qualification, grades, additional_info)
             
-            if not requirements:
-                return {
-                    'eligible': False,
-                    'message': 'No admission requirements found for this program.',
-                    'matched_requirements': [],
-                    'missing_requirements': []
-                }
+        except Exception as e:
+            return {
+                'eligible': False,
+                'message': f'Error checking eligibility: {str(e)}',
+                'matched_requirements': [],
+                'missing_requirements': []
+            }
+
+    def evaluate_requirements(self, requirements, qualification, grades, additional_info=None):
+        """
+        Check an applicant against already-loaded requirement rows
+
+        Each row needs the ADMISSION_REQUIREMENT columns plus program_name.
+        Used by check_eligibility and by bulk screening, which loads the rows once.
+        """
+        if additional_info is None:
+            additional_info = {}
+        
+        if not requirements:
+            return {
+                'eligible': False,
+                'message': 'No admission requirements found for this program.',
+                'matched_requirements': [],
+                'missing_requirements': []
+            }
+        
+        program_name = requirements[0]['program_name']
+        normalized_qual = self.normalize_qualification(qualification)
+        
+        # Find matching requirements
+        matched_requirements = []
+        missing_requirements = []
+        best_match = None
+        best_score = 0
+        
+        # Applicant-side values are parsed once, on first use
+        applicant_grade = None
+        applicant_grade_parsed = False
+        applicant_info = None
+        
+        for req in requirements:
+            parsed = self.parse_requirement(req)
+            req_qual = parsed.qualification
             
-            program_name = requirements[0]['program_name']
-            normalized_qual = self.normalize_qualification(qualification)
+            # Calculate match score
+            score = 0
             
-            # Find matching requirements
-            matched_requirements = []
-            missing_requirements = []
-            best_match = None
-            best_score = 0
+            # Qualification match
+            if req_qual == normalized_qual:
+                score += 10
+            elif req_qual in normalized_qual or normalized_qual in req_qual:
+                score += 5
             
-            for req in requirements:
-                req_qual = self.normalize_qualification(req['qualification_type'])
-                
-                # Calculate match score
-                score = 0
-                
-                # Qualification match
-                if req_qual == normalized_qual:
-                    score += 10
-                elif req_qual in normalized_qual or normalized_qual in req_qual:
-                    score += 5
-                
-                # Grade check
-                if req['minimum_grade']:
-                    required_grade = self.parse_grade(req['minimum_grade'])
+            # Grade check
+            if req['minimum_grade']:
+                required_grade = parsed.minimum_grade
+                if not applicant_grade_parsed:
                     applicant_grade = self.parse_grade(grades.get('cgpa') or grades.get('grade'))
-                    
-                    if required_grade and applicant_grade:
-                        if applicant_grade >= required_grade:
-                            score += 10
-                        else:
-                            score -= 5
+                    applicant_grade_parsed = True
                 
-                # Additional requirements check
-                if req['additional_requirements']:
-                    req_keywords = self.extract_keywords(req['additional_requirements'])
+                if required_grade and applicant_grade:
+                    if applicant_grade >= required_grade:
+                        score += 10
+                    else:
+                        score -= 5
+            
+            # Additional requirements check
+            if req['additional_requirements']:
+                if applicant_info is None:
                     applicant_info = str(additional_info).lower()
-                    
-                    for keyword in req_keywords:
-                        if keyword in applicant_info:
-                            score += 2
                 
-                if score > best_score:
-                    best_score = score
-                    best_match = req
-                
-                if score >= 10:  # Threshold for match
-                    matched_requirements.append({
-                        'requirement': req,
-                        'score': score,
-                        'matched': True
-                    })
-                else:
-                    missing_requirements.append({
-                        'requirement': req,
-                        'score': score,
-                        'matched': False
-                    })
+                for keyword in parsed.keywords:
+                    if keyword in applicant_info:
+                        score += 2
             
-            # Determine eligibility
-            eligible = len(matched_requirements) > 0
+            if score > best_score:
+                best_score = score
+                best_match = req
             
-            # Generate response message
-            if eligible and best_match:
-                message = f"Based on your {qualification} qualification, you appear to meet the requirements for {program_name}."
-                
-                if best_match['minimum_grade']:
-                    message += f" The minimum requirement is {best_match['minimum_grade']}."
-                
-                if best_match['additional_requirements']:
-                    message += f" Additional requirements: {best_match['additional_requirements']}."
+            if score >= 10:  # Threshold for match
+                matched_requirements.append({
+                    'requirement': req,
+                    'score': score,
+                    'matched': True
+                })
             else:
-                message = f"Based on your {qualification} qualification, you may not meet the minimum requirements for {program_name}."
-                
-                if best_match:
-                    message += f" Required: {best_match['qualification_type']} with {best_match['minimum_grade'] or 'specified grade'}."
-                    if best_match['additional_requirements']:
-                        message += f" Additional: {best_match['additional_requirements']}."
-                else:
-                    message += " Please check the specific requirements for this program."
+                missing_requirements.append({
+                    'requirement': req,
+                    'score': score,
+                    'matched': False
+                })
+        
+        # Determine eligibility
+        eligible = len(matched_requirements) > 0
+        
+        # Generate response message
+        if eligible and best_match:
+            message = f"Based on your {qualification} qualification, you appear to meet the requirements for {program_name}."
             
-            cursor.close()
+            if best_match['minimum_grade']:
+                message += f" The minimum requirement is {best_match['minimum_grade']}."
             
-            return {
-                'eligible': eligible,
-                'message': message,
-                'program_name': program_name,
-                'matched_requirements': matched_requirements,
-                'missing_requirements': missing_requirements,
-                'best_match': best_match,
-                'confidence_score': min(best_score / 20.0, 1.0) if best_score > 0 else 0.0
-            }
+            if best_match['additional_requirements']:
+                message += f" Additional requirements: {best_match['additional_requirements']}."
+        else:
+            message = f"Based on your {qualification} qualification, you may not meet the minimum requirements for {program_name}."
             
-        except Exception as e:
-            return {
-                'eligible': False,
-                'message': f'Error checking eligibility: {str(e)}',
-                'matched_requirements': [],
-                'missing_requirements': []
-            }
-
-
+            if best_match:
+                message += f" Required: {best_match['qualification_type']} with {best_match['minimum_grade'] or 'specified grade'}."
+                if best_match['additional_requirements']:
+                    message += f" Additional: {best_match['additional_requirements']}."
+            else:
+                message += " Please check the specific requirements for this program."
+        
+        return {
+            'eligible': eligible,
+            'message': message,
+            'program_name': program_name,
+            'matched_requirements': matched_requirements,
+            'missing_requirements': missing_requirements,
+            'best_match': best_match,
+            'confidence_score': min(best_score / 20.0, 1.0) if best_score > 0 else 0.0
+        }
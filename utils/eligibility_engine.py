@@ -0,0 +1,180 @@
+"""
+Bulk Eligibility Engine - Score one applicant against every program at once
+
+All ADMISSION_REQUIREMENT rows are pre-parsed into columnar NumPy arrays
+(qualification codes, numeric grade thresholds, keyword bitmasks), so
+"which programs am I eligible for?" is one vectorized pass instead of one
+SQL query and regex run per program. Scoring matches
+EligibilityChecker.check_eligibility.
+"""
+import threading
+
+import numpy as np
+
+from utils.eligibility_checker import ACADEMIC_KEYWORDS, EligibilityChecker
+from utils.program_catalog import get_catalog
+
+# Number of set bits for every possible keyword mask
+_POPCOUNT = np.array([bin(mask).count('1') for mask in range(1 << len(ACADEMIC_KEYWORDS))], dtype=np.int32)
+
+# Score threshold for a requirement to count as matched (same as check_eligibility)
+MATCH_THRESHOLD = 10
+
+
+def keyword_mask(text):
+    """Bitmask of ACADEMIC_KEYWORDS found in text"""
+    if not text:
+        return 0
+    text_lower = str(text).lower()
+    mask = 0
+    for bit, keyword in enumerate(ACADEMIC_KEYWORDS):
+        if keyword in text_lower:
+            mask |= 1 << bit
+    return mask
+
+
+class BulkEligibilityEngine:
+    """Columnar, pre-parsed view of every program's admission requirements"""
+
+    def __init__(self, programs, requirements_by_program):
+        """
+        Args:
+            programs: {program_id: program row} (needs program_name and level)
+            requirements_by_program: {program_id: [ADMISSION_REQUIREMENT rows]}
+        """
+        self._parser = EligibilityChecker(None)
+
+        rows = []
+        segment_starts = []
+        segment_programs = []
+        for program_id, requirements in requirements_by_program.items():
+            if not requirements or program_id not in programs:
+                continue
+            segment_starts.append(len(rows))
+            segment_programs.append(programs[program_id])
+            rows.extend(requirements)
+
+        self.requirements = rows
+        self.programs = segment_programs
+        self._segment_starts = np.array(segment_starts, dtype=np.intp)
+        self._segment_ids = np.repeat(
+            np.arange(len(segment_starts), dtype=np.intp),
+            np.diff(np.append(self._segment_starts, len(rows)))
+        ) if rows else np.zeros(0, dtype=np.intp)
+
+        # Qualifications become small integer codes into self.qualifications
+        self.qualifications = []
+        codes = {}
+        qual_codes = []
+        min_grades = []
+        masks = []
+        for req in rows:
+            parsed = self._parser.parse_requirement(req)
+            if parsed.qualification not in codes:
+                codes[parsed.qualification] = len(self.qualifications)
+                self.qualifications.append(parsed.qualification)
+            qual_codes.append(codes[parsed.qualification])
+
+            # check_eligibility skips the grade test when the threshold parses to None or 0
+            min_grades.append(parsed.minimum_grade if parsed.minimum_grade else np.nan)
+
+            masks.append(sum(1 << ACADEMIC_KEYWORDS.index(kw) for kw in parsed.keywords))
+
+        self._qual_codes = np.array(qual_codes, dtype=np.intp)
+        self._min_grades = np.array(min_grades, dtype=np.float64)
+        self._has_grade = ~np.isnan(self._min_grades)
+        self._keyword_masks = np.array(masks, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.programs)
+
+    def requirement_scores(self, qualification, grades, additional_info=None):
+        """Score every requirement row for one applicant"""
+        normalized = self._parser.normalize_qualification(qualification)
+
+        # Qualification match per distinct qualification, then broadcast to rows
+        qual_scores = np.array([
+            10 if q == normalized else 5 if (q in normalized or normalized in q) else 0
+            for q in self.qualifications
+        ], dtype=np.int32)
+        scores = qual_scores[self._qual_codes] if len(self.qualifications) else np.zeros(0, dtype=np.int32)
+
+        grades = grades or {}
+        applicant_grade = self._parser.parse_grade(grades.get('cgpa') or grades.get('grade'))
+        if applicant_grade:
+            meets = applicant_grade >= np.nan_to_num(self._min_grades, nan=np.inf)
+            scores = scores + np.where(self._has_grade, np.where(meets, 10, -5), 0)
+
+        applicant_mask = keyword_mask(str(additional_info if additional_info is not None else {}))
+        if applicant_mask:
+            scores = scores + 2 * _POPCOUNT[self._keyword_masks & applicant_mask]
+
+        return scores
+
+    def evaluate(self, qualification, grades, additional_info=None):
+        """
+        Evaluate one applicant against every program.
+
+        Returns one dict per program with eligibility, best score, confidence
+        and the best-matching requirement, in catalog order.
+        """
+        if not self.programs:
+            return []
+
+        scores = self.requirement_scores(qualification, grades, additional_info)
+        best_scores = np.maximum.reduceat(scores, self._segment_starts)
+        matched_counts = np.add.reduceat((scores >= MATCH_THRESHOLD).astype(np.int32), self._segment_starts)
+
+        # First row reaching its program's best score (check_eligibility keeps the first strict max)
+        is_best = scores == best_scores[self._segment_ids]
+        best_rows = np.full(len(self.programs), -1, dtype=np.intp)
+        segments, first = np.unique(self._segment_ids[is_best], return_index=True)
+        best_rows[segments] = np.flatnonzero(is_best)[first]
+
+        results = []
+        for i, program in enumerate(self.programs):
+            best_score = int(best_scores[i])
+            best_match = self.requirements[best_rows[i]] if best_score > 0 else None
+            results.append({
+                'program_id': program['program_id'],
+                'program_name': program['program_name'],
+                'level': program.get('level'),
+                'faculty_name': program.get('faculty_name'),
+                'eligible': bool(matched_counts[i] > 0),
+                'score': best_score,
+                'matched_count': int(matched_counts[i]),
+                'confidence_score': min(best_score / 20.0, 1.0) if best_score > 0 else 0.0,
+                'best_match': {
+                    'requirement_id': best_match['requirement_id'],
+                    'qualification_type': best_match['qualification_type'],
+                    'minimum_grade': best_match['minimum_grade'],
+                    'additional_requirements': best_match['additional_requirements'],
+                } if best_match else None,
+            })
+        return results
+
+    def eligible_programs(self, qualification, grades, additional_info=None, include_ineligible=False):
+        """Programs the applicant is eligible for, best confidence first"""
+        results = self.evaluate(qualification, grades, additional_info)
+        if not include_ineligible:
+            results = [r for r in results if r['eligible']]
+        return sorted(results, key=lambda r: (not r['eligible'], -r['score']))
+
+
+_engine = None
+_engine_version = None
+_engine_lock = threading.Lock()
+
+
+def get_eligibility_engine():
+    """Return the process-wide engine, rebuilt whenever the program catalog reloads"""
+    global _engine, _engine_version
+    catalog = get_catalog()
+    version = catalog.version
+    if _engine is None or _engine_version != version:
+        with _engine_lock:
+            if _engine is None or _engine_version != version:
+                programs = {p['program_id']: p for p in catalog.programs()}
+                _engine = BulkEligibilityEngine(programs, catalog.requirements_by_program())
+                _engine_version = version
+    return _engine
@@ -0,0 +1,332 @@
+"""
+Email Outbox - Durable queue for outgoing email
+
+Request handlers only INSERT into EMAIL_OUTBOX (ideally in the same
+transaction as the change that triggers the email). A separate worker
+process claims due rows, sends them over the pooled SMTP transport and
+records the outcome, retrying temporary failures (4xx replies, connection
+errors) with exponential backoff and limiting how fast each recipient domain
+is contacted. Permanent rejections (5xx) are marked Failed straight away.
+
+Run the worker with: python -m utils.email_outbox
+Table: Database/email_outbox_migration.sql
+"""
+import argparse
+import hashlib
+import math
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+from utils.db_helper import db_connection
+from utils.email_sender import FROM_EMAIL, SMTP_USERNAME, SMTP_PASSWORD, build_message
+from utils.mail_transport import get_mail_transport, SMTP_POOL_SIZE, SMTP_TIMEOUT
+
+# Outbox configuration - can be set via environment variables
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '100'))  # emails claimed per round
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '5'))  # seconds between empty polls
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8'))  # then the email is marked Failed
+OUTBOX_BACKOFF_BASE = float(os.getenv('OUTBOX_BACKOFF_BASE', '30'))  # seconds before the first retry
+OUTBOX_BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX', '3600'))  # longest wait between retries
+# Seconds before a crashed worker's claim is retaken; default: longer than the slowest possible batch
+OUTBOX_CLAIM_TIMEOUT = int(os.getenv('OUTBOX_CLAIM_TIMEOUT', '0')) or None
+OUTBOX_DOMAIN_RATE = float(os.getenv('OUTBOX_DOMAIN_RATE', '120'))  # emails per minute per recipient domain
+
+
+def make_idempotency_key(*parts):
+    """Stable key for an email, e.g. make_idempotency_key('reminder', email, program_id, deadline)"""
+    return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def _outbox_row(to_email, subject, body_html, body_text, idempotency_key):
+    if idempotency_key is None:
+        idempotency_key = make_idempotency_key(to_email, subject, body_html)
+    domain = to_email.rsplit('@', 1)[-1].lower()
+    return (idempotency_key, to_email, domain, subject, body_html, body_text)
+
+
+_INSERT_SQL = """
+    INSERT INTO EMAIL_OUTBOX
+    (idempotency_key, to_email, recipient_domain, subject, body_html, body_text)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE outbox_id = outbox_id
+"""
+
+
+def enqueue_emails(emails, conn=None):
+    """
+    Queue emails for delivery; duplicates of an already queued idempotency key are ignored.
+
+    Args:
+        emails: Iterable of (to_email, subject, body_html, body_text, idempotency_key)
+        conn: Optional open connection; the caller then commits, so the emails
+              are queued atomically with the caller's own changes
+
+    Returns:
+        int: Number of rows handed to the database
+    """
+    rows = [_outbox_row(*email) for email in emails]
+    if not rows:
+        return 0
+
+    if conn is not None:
+        cursor = conn.cursor()
+        cursor.executemany(_INSERT_SQL, rows)
+        cursor.close()
+        return len(rows)
+
+    with db_connection() as own_conn:
+        if not own_conn:
+            raise RuntimeError("Database connection failed")
+        cursor = own_conn.cursor()
+        cursor.executemany(_INSERT_SQL, rows)
+        own_conn.commit()
+        cursor.close()
+    return len(rows)
+
+
+def enqueue_email(to_email, subject, body_html, body_text=None, idempotency_key=None, conn=None):
+    """Queue a single email (see enqueue_emails)"""
+    return enqueue_emails([(to_email, subject, body_html, body_text, idempotency_key)], conn=conn) == 1
+
+
+def claim_timeout_for(batch_size, sessions, smtp_timeout=SMTP_TIMEOUT):
+    """
+    Seconds a claimed batch can take at worst, so live claims are never retaken
+
+    Each session sends ceil(batch_size / sessions) messages, and a message can
+    wait for the socket timeout twice (first attempt plus one reconnect).
+    """
+    rounds = math.ceil(batch_size / max(1, sessions))
+    return int(rounds * 2 * smtp_timeout) + 60
+
+
+def backoff_seconds(attempts):
+    """Exponential backoff with jitter for the given number of failed attempts"""
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class DomainRateLimiter:
+    """Token bucket per recipient domain"""
+
+    def __init__(self, per_minute=OUTBOX_DOMAIN_RATE):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 6.0)  # allow ~10 seconds worth of burst
+        self._buckets = {}
+
+    def acquire(self, domain):
+        """Take a token; returns 0 if allowed, otherwise seconds until a token is available"""
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(domain, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[domain] = (tokens - 1, now)
+            return 0
+        self._buckets[domain] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+
+class OutboxWorker:
+    """Claim, send and settle EMAIL_OUTBOX rows"""
+
+    def __init__(self, transport=None, batch_size=OUTBOX_BATCH_SIZE, max_attempts=OUTBOX_MAX_ATTEMPTS,
+                 claim_timeout=OUTBOX_CLAIM_TIMEOUT, rate_limiter=None):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        if claim_timeout is None:
+            sessions = transport.pool.size if transport is not None else SMTP_POOL_SIZE
+            claim_timeout = claim_timeout_for(batch_size, sessions)
+        self.claim_timeout = claim_timeout
+        self.rate_limiter = rate_limiter or DomainRateLimiter()
+        self.worker_name = f"{socket.gethostname()[:40]}:{os.getpid()}"
+
+        # Metrics
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.deferred = 0
+        self.lost_claims = 0
+
+    def _claim(self, conn):
+        """
+        Atomically take ownership of due rows (and rows of crashed workers)
+
+        Returns:
+            (token, rows); settle the rows with the same token
+        """
+        token = f"{self.worker_name}:{uuid.uuid4().hex[:8]}"
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            UPDATE EMAIL_OUTBOX
+            SET status = 'Sending', claimed_by = %s, claimed_at = NOW(), attempts = attempts + 1
+            WHERE (status = 'Pending' AND next_attempt_at <= NOW())
+               OR (status = 'Sending' AND claimed_at < NOW() - INTERVAL %s SECOND)
+            ORDER BY next_attempt_at
+            LIMIT %s
+        """, (token, self.claim_timeout, self.batch_size))
+        conn.commit()
+
+        cursor.execute("""
+            SELECT outbox_id, idempotency_key, to_email, recipient_domain,
+                   subject, body_html, body_text, attempts
+            FROM EMAIL_OUTBOX
+            WHERE claimed_by = %s AND status = 'Sending'
+        """, (token,))
+        rows = cursor.fetchall()
+        cursor.close()
+        return token, rows
+
+    def _message(self, row):
+        msg = build_message(row['to_email'], row['subject'], row['body_html'], row['body_text'])
+        # Same Message-ID on every attempt lets receiving servers drop a duplicate delivery
+        msg['Message-ID'] = f"<{row['idempotency_key'][:64]}@{FROM_EMAIL.rsplit('@', 1)[-1]}>"
+        return msg
+
+    def run_once(self):
+        """Process one batch; returns the number of rows claimed"""
+        with db_connection() as conn:
+            if not conn:
+                print("Error: Could not connect to database for email outbox")
+                return 0
+
+            token, rows = self._claim(conn)
+            if not rows:
+                return 0
+
+            # Rows over their domain's rate limit go back to Pending without using an attempt
+            to_send = []
+            deferred = []
+            for row in rows:
+                wait = self.rate_limiter.acquire(row['recipient_domain'])
+                if wait:
+                    deferred.append((int(wait) + 1, row['outbox_id']))
+                else:
+                    to_send.append(row)
+
+            transport = self.transport or get_mail_transport()
+            outcomes = transport.deliver_many(self._message(row) for row in to_send)
+
+            sent_ids = []
+            retries = []
+            failures = []
+            for row, failure in zip(to_send, outcomes):
+                if failure is None:
+                    sent_ids.append((row['outbox_id'],))
+                elif failure.permanent or row['attempts'] >= self.max_attempts:
+                    # 5xx rejections are final; only 4xx and connection errors are retried
+                    failures.append((failure.error[:500], row['outbox_id']))
+                else:
+                    retries.append((int(backoff_seconds(row['attempts'])), failure.error[:500], row['outbox_id']))
+
+            # Every settle is conditional on still holding the claim, so a worker
+            # whose claim was retaken never overwrites the new owner's outcome
+            cursor = conn.cursor()
+            settled = 0
+            for sql, params in (
+                ("""
+                    UPDATE EMAIL_OUTBOX
+                    SET status = 'Sent', sent_at = NOW(), claimed_by = NULL, last_error = NULL
+                    WHERE outbox_id = %s AND claimed_by = %s
+                """, sent_ids),
+                ("""
+                    UPDATE EMAIL_OUTBOX
+                    SET status = 'Pending', claimed_by = NULL,
+                        next_attempt_at = NOW() + INTERVAL %s SECOND, last_error = %s
+                    WHERE outbox_id = %s AND claimed_by = %s
+                """, retries),
+                ("""
+                    UPDATE EMAIL_OUTBOX
+                    SET status = 'Failed', claimed_by = NULL, last_error = %s
+                    WHERE outbox_id = %s AND claimed_by = %s
+                """, failures),
+                ("""
+                    UPDATE EMAIL_OUTBOX
+                    SET status = 'Pending', claimed_by = NULL, attempts = attempts - 1,
+                        next_attempt_at = NOW() + INTERVAL %s SECOND
+                    WHERE outbox_id = %s AND claimed_by = %s
+                """, deferred),
+            ):
+                if params:
+                    cursor.executemany(sql, [values + (token,) for values in params])
+                    settled += cursor.rowcount
+            conn.commit()
+            cursor.close()
+
+        lost = len(rows) - settled
+        if lost:
+            print(f"Warning: {lost} outbox claim(s) of {token} were retaken by another worker before settling")
+            self.lost_claims += lost
+
+        self.sent += len(sent_ids)
+        self.retried += len(retries)
+        self.failed += len(failures)
+        self.deferred += len(deferred)
+        return len(rows)
+
+    def run_forever(self, stop_event=None, poll_interval=OUTBOX_POLL_INTERVAL):
+        """Drain the outbox until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                print(f"Error processing email outbox: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                stop_event.wait(poll_interval)
+
+    def stats(self):
+        """Snapshot of worker metrics"""
+        return {
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': self.failed,
+            'deferred': self.deferred,
+            'lost_claims': self.lost_claims,
+        }
+
+
+def outbox_stats():
+    """Number of outbox rows per status"""
+    with db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Database connection failed")
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM EMAIL_OUTBOX GROUP BY status")
+        counts = {status: count for status, count in cursor.fetchall()}
+        cursor.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Deliver queued email from EMAIL_OUTBOX')
+    parser.add_argument('--once', action='store_true', help='process a single batch and exit')
+    args = parser.parse_args(argv)
+
+    if not SMTP_USERNAME or not SMTP_PASSWORD:
+        print("Error: Email not configured. Set SMTP_USERNAME and SMTP_PASSWORD.")
+        return 1
+
+    worker = OutboxWorker()
+    if args.once:
+        print(f"Processed {worker.run_once()} email(s): {worker.stats()}")
+        return 0
+
+    print(f"Email outbox worker {worker.worker_name} started")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Email outbox worker stopped: {worker.stats()}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -7,6 +7,8 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import os
 from utils.db_helper import get_db_connection
+from utils.mail_transport import get_mail_transport
+from utils.email_templates import ReminderRenderer, render_deadline_reminder
 
 # Email configuration - can be set via environment variables
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -17,6 +19,24 @@ FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@skl.edu.my')
 FROM_NAME = os.getenv('FROM_NAME', 'SKL University Admission Office')
 
 
+def build_message(to_email, subject, body_html, body_text=None):
+    """Build the MIME message for one email"""
+    msg = MIMEMultipart('alternative')
+    msg['From'] = f"{FROM_NAME} <{FROM_EMAIL}>"
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    
+    # Add both plain text and HTML versions
+    if body_text:
+        part1 = MIMEText(body_text, 'plain')
+        msg.attach(part1)
+    
+    part2 = MIMEText(body_html, 'html')
+    msg.attach(part2)
+    
+    return msg
+
+
 def send_email(to_email, subject, body_html, body_text=None):
     """
     Send an email using SMTP
@@ -35,33 +55,34 @@ def send_email(to_email, subject, body_html, body_text=None):
         return False
     
     try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['From'] = f"{FROM_NAME} <{FROM_EMAIL}>"
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add both plain text and HTML versions
-        if body_text:
-            part1 = MIMEText(body_text, 'plain')
-            msg.attach(part1)
-        
-        part2 = MIMEText(body_html, 'html')
-        msg.attach(part2)
-        
-        # Send email
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        
-        print(f"Email sent successfully to {to_email}")
-        return True
-        
+        msg = build_message(to_email, subject, body_html, body_text)
     except Exception as e:
         print(f"Error sending email to {to_email}: {e}")
         return False
+    
+    # Sent over a pooled, already authenticated SMTP session
+    if get_mail_transport().send(msg):
+        print(f"Email sent successfully to {to_email}")
+        return True
+    return False
+
+
+def send_emails(emails):
+    """
+    Send many emails in parallel over the SMTP connection pool
+    
+    Args:
+        emails: Iterable of (to_email, subject, body_html, body_text) tuples
+    
+    Returns:
+        list: One bool per email, in the same order
+    """
+    emails = list(emails)
+    if not SMTP_USERNAME or not SMTP_PASSWORD:
+        print(f"Warning: Email not configured. Would send {len(emails)} email(s)")
+        return [False] * len(emails)
+    
+    return get_mail_transport().send_many(build_message(*email) for email in emails)
 
 
 def send_deadline_reminder(email, program_name, deadline_date, days_before=14):
@@ -74,64 +95,118 @@ def send_deadline_reminder(email, program_name, deadline_date, days_before=14):
         deadline_date: Deadline date (datetime or date object)
         days_before: Number of days before deadline to send reminder
     """
-    if isinstance(deadline_date, str):
-        deadline_date = datetime.strptime(deadline_date, '%Y-%m-%d').date()
-    elif isinstance(deadline_date, datetime):
-        deadline_date = deadline_date.date()
-    
-    subject = f"Reminder: Application Deadline for {program_name} - {days_before} Days Remaining"
-    
-    deadline_str = deadline_date.strftime('%d %B %Y')
-    
-    body_html = f"""
-    <html>
-      <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-          <h2 style="color: #1e3a8a;">Application Deadline Reminder</h2>
-          <p>Dear Applicant,</p>
-          <p>This is a reminder that the application deadline for <strong>{program_name}</strong> is approaching.</p>
-          <div style="background: #f97316; color: white; padding: 15px; border-radius: 5px; margin: 20px 0;">
-            <strong>Deadline: {deadline_str}</strong><br>
-            <small>Only {days_before} days remaining!</small>
-          </div>
-          <p>Please ensure you have submitted your application and all required documents before this date.</p>
-          <p>If you have already submitted your application, please disregard this reminder.</p>
-          <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;">
-          <p style="font-size: 0.9em; color: #666;">
-            Best regards,<br>
-            <strong>SKL University Admission Office</strong><br>
-            123, Jalan Bandar Timah, 31900 Kampar Perak.<br>
-            Phone: +60-3-1234-5678<br>
-            Email: SKL123@edu.my
-          </p>
-        </div>
-      </body>
-    </html>
+    subject, body_html, body_text = deadline_reminder_content(program_name, deadline_date, days_before)
+    return send_email(email, subject, body_html, body_text)
+
+
+def deadline_reminder_content(program_name, deadline_date, days_before=14):
+    """Return (subject, body_html, body_text) of a deadline reminder"""
+    return render_deadline_reminder(program_name, deadline_date, days_before)
+
+
+# Subscriptions due for a reminder today: one row per subscription whose program has a
+# deadline exactly days_before days away and that has not been reminded today.
+# Pages walk EMAIL_NOTIFICATION's primary key (notification_id), and each subscription
+# probes idx_end_date_program with an equality on end_date, so a chunk reads only its own
+# subscriptions; EXISTS keeps one row per subscription without grouping
+# (see Database/email_reminder_indexes.sql).
+DUE_REMINDERS_SQL = """
+    SELECT en.notification_id, en.email, en.days_before, en.program_id,
+           p.program_name, CURDATE() + INTERVAL en.days_before DAY AS end_date
+    FROM EMAIL_NOTIFICATION en
+    JOIN PROGRAM p ON p.program_id = en.program_id
+    WHERE en.notification_id > %s
+      AND en.is_active = TRUE
+      AND en.notification_type = 'Deadline Reminder'
+      AND (en.last_sent IS NULL OR en.last_sent < CURDATE())
+      AND EXISTS (
+          SELECT 1 FROM IMPORTANT_DATE id
+          WHERE id.end_date = CURDATE() + INTERVAL en.days_before DAY
+            AND id.program_id = en.program_id
+      )
+    ORDER BY en.notification_id
+    LIMIT %s
+"""
+
+REMINDER_CHUNK_SIZE = int(os.getenv('REMINDER_CHUNK_SIZE', '1000'))  # subscriptions per query/commit
+
+
+def fetch_due_reminders(cursor, after_id=0, limit=REMINDER_CHUNK_SIZE):
+    """Return the next chunk of due reminders with notification_id > after_id"""
+    cursor.execute(DUE_REMINDERS_SQL, (after_id, limit))
+    return cursor.fetchall()
+
+
+def mark_reminders_sent(cursor, notification_ids):
+    """Set last_sent for many subscriptions in one statement"""
+    if not notification_ids:
+        return
+    cursor.execute("""
+        UPDATE EMAIL_NOTIFICATION
+        SET last_sent = CURRENT_TIMESTAMP
+        WHERE notification_id IN (%s)
+    """ % ','.join(['%s'] * len(notification_ids)), list(notification_ids))
+
+
+def send_due_reminders(conn, on_chunk=None):
     """
+    Queue every reminder that is due today in the email outbox, one chunk at a time
     
-    body_text = f"""
-    Application Deadline Reminder
-    
-    Dear Applicant,
-    
-    This is a reminder that the application deadline for {program_name} is approaching.
-    
-    Deadline: {deadline_str}
-    Only {days_before} days remaining!
+    The reminders are delivered by the outbox worker (python -m utils.email_outbox),
+    with retries and the per-domain rate limit. Each chunk is queued and marked
+    sent in one transaction before the next one is fetched, so rerunning after a
+    crash continues where the previous run stopped, and the idempotency key
+    keeps a reminder from being queued twice. Database errors are raised.
     
-    Please ensure you have submitted your application and all required documents before this date.
+    Args:
+        conn: Open database connection
+        on_chunk: Optional callback(queued_so_far, attempted_so_far) after every chunk
     
-    Best regards,
-    SKL University Admission Office
+    Returns:
+        tuple: (queued, attempted)
     """
+    # Imported here: utils.email_outbox itself imports this module
+    from utils.email_outbox import enqueue_emails, make_idempotency_key
     
-    return send_email(email, subject, body_html, body_text)
+    cursor = conn.cursor(dictionary=True)
+    # Subscribers of the same program and deadline get the same rendered body
+    renderer = ReminderRenderer()
+    try:
+        queued = 0
+        attempted = 0
+        after_id = 0
+        while True:
+            due = fetch_due_reminders(cursor, after_id)
+            if not due:
+                break
+            
+            emails = [
+                (sub['email'],) + renderer.render(sub['program_name'], sub['end_date'], sub['days_before'])
+                + (make_idempotency_key('reminder', sub['email'], sub['program_id'],
+                                        sub['end_date'], sub['days_before']),)
+                for sub in due
+            ]
+            enqueue_emails(emails, conn=conn)
+            mark_reminders_sent(cursor, [sub['notification_id'] for sub in due])
+            conn.commit()
+            queued += len(due)
+            attempted += len(due)
+            if on_chunk:
+                on_chunk(queued, attempted)
+            
+            after_id = due[-1]['notification_id']
+            if len(due) < REMINDER_CHUNK_SIZE:
+                break
+    finally:
+        cursor.close()
+    
+    return queued, attempted
 
 
 def check_and_send_reminders():
     """
     Check for upcoming deadlines and send reminder emails to subscribed users
-    This should be called periodically (e.g., daily via cron job or scheduler)
+    This runs daily from utils.reminder_scheduler (or a cron job)
     """
     conn = get_db_connection()
     if not conn:
@@ -139,68 +214,11 @@ def check_and_send_reminders():
         return
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get all active subscriptions with upcoming deadlines
-        today = datetime.now().date()
-        
-        cursor.execute("""
-            SELECT en.email, en.days_before, en.program_id,
-                   p.program_name, id.start_date, id.end_date, id.event_type
-            FROM EMAIL_NOTIFICATION en
-            JOIN PROGRAM p ON en.program_id = p.program_id
-            LEFT JOIN IMPORTANT_DATE id ON p.program_id = id.program_id
-            WHERE en.is_active = TRUE
-              AND en.notification_type = 'Deadline Reminder'
-              AND (id.end_date IS NOT NULL AND id.end_date >= CURDATE())
-            ORDER BY en.email, id.end_date
-        """)
-        
-        subscriptions = cursor.fetchall()
-        
-        sent_count = 0
-        for sub in subscriptions:
-            email = sub['email']
-            program_name = sub['program_name']
-            days_before = sub['days_before']
-            deadline_date = sub['end_date']
-            
-            if not deadline_date:
-                continue
-            
-            # Calculate days until deadline
-            days_until = (deadline_date - today).days
-            
-            # Send reminder if it's exactly 'days_before' days before deadline
-            if days_until == days_before:
-                # Check if we already sent a reminder for this deadline
-                cursor.execute("""
-                    SELECT last_sent FROM EMAIL_NOTIFICATION
-                    WHERE email = %s AND program_id = %s
-                """, (email, sub['program_id']))
-                
-                last_sent = cursor.fetchone()
-                if last_sent and last_sent['last_sent']:
-                    last_sent_date = last_sent['last_sent'].date() if isinstance(last_sent['last_sent'], datetime) else last_sent['last_sent']
-                    if last_sent_date == today:
-                        continue  # Already sent today
-                
-                # Send the reminder
-                if send_deadline_reminder(email, program_name, deadline_date, days_before):
-                    # Update last_sent timestamp
-                    cursor.execute("""
-                        UPDATE EMAIL_NOTIFICATION
-                        SET last_sent = CURRENT_TIMESTAMP
-                        WHERE email = %s AND program_id = %s
-                    """, (email, sub['program_id']))
-                    conn.commit()
-                    sent_count += 1
-        
-        cursor.close()
+        queued, _ = send_due_reminders(conn)
         conn.close()
         
-        print(f"Email reminder check completed. Sent {sent_count} reminder(s).")
-        return sent_count
+        print(f"Email reminder check completed. Queued {queued} reminder(s) for delivery.")
+        return queued
         
     except Exception as e:
         print(f"Error checking reminders: {e}")
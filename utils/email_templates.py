@@ -0,0 +1,83 @@
+"""
+Email Templates - Compiled Jinja templates for notification emails
+
+Templates in templates/email are compiled once per process; the shared
+footer is rendered once and injected as a global. ReminderRenderer memoizes
+bodies per (program, deadline, days_before), so a batch of reminders renders
+each distinct email once however many recipients share it.
+"""
+import os
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'email')
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+)
+# Static parts are rendered once, not per email
+_env.globals['footer_html'] = Markup(_env.get_template('_footer.html').render())
+
+_reminder_html = _env.get_template('deadline_reminder.html')
+_reminder_text = _env.get_template('deadline_reminder.txt')
+_confirmation_html = _env.get_template('subscription_confirmation.html')
+_application_html = _env.get_template('application_confirmation.html')
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def render_deadline_reminder(program_name, deadline_date, days_before=14):
+    """Return (subject, body_html, body_text) of a deadline reminder"""
+    context = {
+        'program_name': program_name,
+        'deadline_str': _as_date(deadline_date).strftime('%d %B %Y'),
+        'days_before': days_before,
+    }
+    subject = f"Reminder: Application Deadline for {program_name} - {days_before} Days Remaining"
+    return subject, _reminder_html.render(context), _reminder_text.render(context)
+
+
+def render_subscription_confirmation(program_names, days_before=14):
+    """Return (subject, body_html) of the subscription confirmation"""
+    subject = "Email Subscription Confirmation - SKL University"
+    return subject, _confirmation_html.render(program_names=program_names, days_before=days_before)
+
+
+def render_application_confirmation(full_name, program_name, reference_number, document_count):
+    """Return (subject, body_html) of the application received email"""
+    subject = f"Application Received - {reference_number} - SKL University"
+    return subject, _application_html.render(full_name=full_name, program_name=program_name,
+                                             reference_number=reference_number,
+                                             document_count=document_count)
+
+
+class ReminderRenderer:
+    """Per-batch memo of rendered reminders; recipients of the same deadline share one body"""
+
+    def __init__(self):
+        self._rendered = {}
+        self.renders = 0
+        self.reused = 0
+
+    def render(self, program_name, deadline_date, days_before):
+        key = (program_name, _as_date(deadline_date), days_before)
+        content = self._rendered.get(key)
+        if content is None:
+            content = self._rendered[key] = render_deadline_reminder(*key)
+            self.renders += 1
+        else:
+            self.reused += 1
+        return content
@@ -0,0 +1,390 @@
+"""
+Form Cache - Program-specific and prefilled application forms
+
+ReportLab layout is CPU-bound and holds the GIL, so forms are rendered in a
+small pool of worker processes instead of in the Flask worker. Program forms
+are content-addressed: the cache key is a hash of everything printed on the
+form plus the generator source, so a form is rendered once and stored on
+disk until its program, requirements or checklist change. The cache directory
+is capped at FORM_CACHE_MAX_MB; the least recently used files are removed
+first. Applicant-prefilled forms contain personal data and are rendered on
+demand, never written to disk.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+
+from utils.application_form_generator import ApplicationFormGenerator
+from utils.db_helper import db_connection
+from utils.document_generator import DocumentChecklistGenerator
+from utils.process_pool import new_process_pool
+from utils.program_catalog import get_catalog
+
+# Form cache configuration - can be set via environment variables
+FORM_WORKERS = int(os.getenv('FORM_WORKERS', '2'))  # rendering processes
+FORM_RENDER_TIMEOUT = float(os.getenv('FORM_RENDER_TIMEOUT', '60'))  # seconds per form
+FORM_CACHE_DIR = os.getenv(
+    'FORM_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.form_cache')
+)
+FORM_CACHE_MAX_MB = float(os.getenv('FORM_CACHE_MAX_MB', '512'))  # disk cap for cached forms and ZIPs
+FORM_CACHE_MIN_AGE = 300  # seconds a file is kept after its last use, so files being served are not removed
+FORM_SPEC_MEMO_SIZE = 4096  # memoized program form specs per catalog version
+
+# Applicant fields that may be printed on a prefilled form (names as in the online form)
+APPLICANT_FORM_FIELDS = (
+    'full_name', 'ic_passport', 'date_of_birth', 'gender', 'nationality', 'email', 'phone',
+    'address', 'intake_semester', 'academic_year', 'highest_qualification', 'institution',
+    'year_of_completion', 'cgpa', 'english_proficiency_test', 'english_test_score',
+)
+
+
+def _generator_fingerprint():
+    """Hash of the form layout code, so cached forms are dropped when the layout changes"""
+    import utils.application_form_generator as module
+    with open(module.__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+_fingerprint = None
+
+
+def form_spec(program=None, requirements=None, checklist=None, applicant=None):
+    """
+    Reduce prefill data to exactly what is printed on the form
+
+    The result is JSON-serialisable, is what the worker processes receive,
+    and is what the cache key is computed from.
+    """
+    spec = {}
+    if program:
+        spec['program'] = {key: program.get(key) for key in ('program_name', 'faculty_name', 'level')}
+    if requirements:
+        spec['requirements'] = [
+            {key: req.get(key) for key in ('qualification_type', 'minimum_grade', 'additional_requirements')}
+            for req in requirements if req.get('qualification_type')
+        ]
+    if checklist:
+        spec['checklist'] = {
+            group: [
+                {'name': doc['name'],
+                 'mandatory': doc.get('mandatory', group in ('mandatory', 'program_specific'))}
+                for doc in checklist.get(group, [])
+            ]
+            for group in ('mandatory', 'country_specific', 'program_specific', 'optional')
+        }
+    if applicant:
+        spec['applicant'] = {
+            key: str(applicant[key]) for key in APPLICANT_FORM_FIELDS
+            if applicant.get(key) not in (None, '')
+        }
+    return spec
+
+
+def form_key(spec):
+    """Content address of a rendered form"""
+    global _fingerprint
+    if _fingerprint is None:
+        _fingerprint = _generator_fingerprint()
+    payload = json.dumps(spec, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{_fingerprint}\x1f{payload}".encode('utf-8')).hexdigest()
+
+
+# Worker process side
+_worker_generator = None
+
+
+def _render(spec):
+    """Render one form to PDF bytes (runs in a pool process)"""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = ApplicationFormGenerator()
+    return _worker_generator.generate_form(invariant=True, **spec).getvalue()
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class FormRenderer:
+    """Process pool for form rendering plus the on-disk form cache"""
+
+    def __init__(self, workers=FORM_WORKERS, cache_dir=FORM_CACHE_DIR, timeout=FORM_RENDER_TIMEOUT,
+                 max_bytes=FORM_CACHE_MAX_MB * 1024 * 1024):
+        self.workers = max(1, workers)
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self._executor = None
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+
+        # Metrics
+        self.rendered = 0
+        self.cache_hits = 0
+        self.evicted = 0
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # Workers only run _render; they never touch the DB or SMTP pools
+                    self._executor = new_process_pool(self.workers)
+        return self._executor
+
+    def path_for(self, key, suffix='.pdf'):
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def render(self, spec):
+        """Render a form without caching it (used for applicant-prefilled forms)"""
+        data = self._pool().submit(_render, spec).result(timeout=self.timeout)
+        self.rendered += 1
+        return data
+
+    def cached(self, specs):
+        """
+        Return the cache path of each form spec, rendering missing forms in parallel
+
+        Returns a list of (key, path) in the order of specs.
+        """
+        keyed = [(form_key(spec), spec) for spec in specs]
+        pending = {}
+        for key, spec in keyed:
+            if key in pending:
+                continue
+            if self._touch(self.path_for(key)):
+                self.cache_hits += 1
+            else:
+                pending[key] = self._pool().submit(_render, spec)
+
+        for key, future in pending.items():
+            _write_atomic(self.path_for(key), future.result(timeout=self.timeout))
+            self.rendered += 1
+        if pending:
+            self.prune()
+
+        return [(key, self.path_for(key)) for key, _ in keyed]
+
+    @staticmethod
+    def _touch(path):
+        """Mark a cached file as used; False if it is not cached"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def prune(self):
+        """
+        Remove the least recently used files until the cache is under 90% of max_bytes
+
+        Files used within the last FORM_CACHE_MIN_AGE seconds are kept even
+        if the cache stays over the cap, so a form is never removed while it
+        is being sent. Returns the number of files removed.
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return 0  # another thread is already pruning
+        try:
+            files = []
+            total = 0
+            for directory, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return 0
+
+            removed = 0
+            target = self.max_bytes * 0.9
+            cutoff = time.time() - FORM_CACHE_MIN_AGE
+            for mtime, size, path in sorted(files):
+                if total <= target or mtime >= cutoff:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self.evicted += removed
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    def cached_zip(self, entries):
+        """
+        Bundle forms into a ZIP stored under its own content address
+
+        Args:
+            entries: List of (filename, form spec)
+
+        Returns:
+            (key, path) of the ZIP file
+        """
+        forms = self.cached([spec for _, spec in entries])
+        names = [(name, key) for (name, _), (key, _) in zip(entries, forms)]
+        zip_key = hashlib.sha256(json.dumps(names, separators=(',', ':')).encode('utf-8')).hexdigest()
+        zip_path = self.path_for(zip_key, '.zip')
+        if self._touch(zip_path):
+            self.cache_hits += 1
+            return zip_key, zip_path
+
+        os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(zip_path), suffix='.tmp')
+        try:
+            # PDF page streams are already compressed; storing avoids a second pass
+            with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as archive:
+                for (name, _), (_, path) in zip(entries, forms):
+                    archive.write(path, name)
+            os.replace(tmp_path, zip_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.prune()
+        return zip_key, zip_path
+
+    def stats(self):
+        """Snapshot of renderer metrics"""
+        return {
+            'workers': self.workers,
+            'rendered': self.rendered,
+            'cache_hits': self.cache_hits,
+            'evicted': self.evicted,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_renderer = None
+_renderer_pid = None
+_renderer_lock = threading.Lock()
+
+
+def get_form_renderer():
+    """Return the process-wide form renderer"""
+    global _renderer, _renderer_pid
+    pid = os.getpid()
+    if _renderer is None or _renderer_pid != pid:
+        with _renderer_lock:
+            if _renderer is None or _renderer_pid != pid:
+                _renderer = FormRenderer()
+                _renderer_pid = pid
+    return _renderer
+
+
+def program_form_spec(conn, program_id, country='Malaysia', applicant=None):
+    """Form spec for one program (None if the program does not exist)"""
+    catalog = get_catalog()
+    program = catalog.get_program(program_id)
+    if program is None:
+        return None
+    checklist = DocumentChecklistGenerator(conn).generate_checklist(program_id, country)
+    if checklist.get('error'):
+        raise RuntimeError(checklist['error'])
+    return form_spec(program, catalog.requirements(program_id), checklist, applicant)
+
+
+def form_filename(program):
+    """Download name of a program's form, e.g. 12_Bachelor_of_Computer_Science.pdf"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', program['program_name']).strip('_')
+    return f"{program['program_id']}_{slug}.pdf"
+
+
+def checklist_version(conn):
+    """
+    Fingerprint of every DOCUMENT_CHECKLIST row
+
+    Checklist rows are edited outside the program catalog, so its version
+    does not change with them; this one aggregate query does.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*), COALESCE(BIT_XOR(CRC32(CONCAT_WS(CHAR(31), checklist_id, program_id, document_name,
+                                                          is_mandatory, COALESCE(description, ''))))), 0)
+        FROM DOCUMENT_CHECKLIST
+    """)
+    version = tuple(cursor.fetchone())
+    cursor.close()
+    return version
+
+
+# Program form specs of the current catalog and checklist versions, so cached forms are
+# found with one aggregate query instead of the checklist query per program
+_specs = {}
+_specs_version = None
+_specs_lock = threading.Lock()
+
+
+def program_form_specs(program_ids, country='Malaysia'):
+    """
+    Form specs of several programs, memoized under the catalog and checklist versions
+
+    The checklist query runs only for programs not seen since the catalog
+    reloaded or a checklist row changed. Unknown programs give None.
+    """
+    global _specs, _specs_version
+    catalog = get_catalog()
+    with db_connection() as conn:
+        if not conn:
+            raise RuntimeError("Database connection failed")
+        version = (catalog.version, checklist_version(conn))
+        with _specs_lock:
+            if _specs_version != version or len(_specs) > FORM_SPEC_MEMO_SIZE:
+                _specs = {}
+                _specs_version = version
+            specs = {program_id: _specs.get((program_id, country)) for program_id in program_ids}
+
+        missing = [program_id for program_id, spec in specs.items()
+                   if spec is None and catalog.get_program(program_id) is not None]
+        for program_id in missing:
+            specs[program_id] = program_form_spec(conn, program_id, country)
+
+    if missing:
+        with _specs_lock:
+            if _specs_version == version:
+                _specs.update(((program_id, country), specs[program_id]) for program_id in missing)
+
+    return [specs[program_id] for program_id in program_ids]
+
+
+def get_program_form(program_id, country='Malaysia'):
+    """Return (key, path) of the cached form for one program, or None if it does not exist"""
+    spec = program_form_specs([program_id], country)[0]
+    if spec is None:
+        return None
+    return get_form_renderer().cached([spec])[0]
+
+
+def get_all_program_forms_zip(country='Malaysia'):
+    """Return (key, path) of a ZIP with the form of every program"""
+    programs = get_catalog().programs()
+    specs = program_form_specs([program['program_id'] for program in programs], country)
+    entries = [(form_filename(program), spec) for program, spec in zip(programs, specs)]
+    return get_form_renderer().cached_zip(entries)
@@ -0,0 +1,179 @@
+"""
+iCalendar Feeds - Important dates as subscribable .ics calendars
+
+One feed per program and one per level, built from the IMPORTANT_DATE rows in
+the deadline index plus the academic calendar DateCalculator derives for the
+current and following years (registration periods and application deadlines,
+local and international). Calendar apps poll the feed URL instead of
+applicants reloading the deadlines page; the routes cache each feed until the
+dates or the catalog change and answer revalidations with 304 Not Modified.
+
+DTSTAMP (and the routes' Last-Modified) is when the data last changed, not the
+render time, so every app process renders the same bytes (and ETag) for the
+same data and a daily re-render of unchanged data still revalidates.
+
+Format: RFC 5545 (all-day VEVENTs, CRLF line endings, lines folded at 75 octets)
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from utils.date_calculator import DateCalculator
+from utils.deadline_index import get_deadline_index, DEADLINE_STAMP_FILE
+from utils.program_catalog import get_catalog, CATALOG_STAMP_FILE
+
+# Feed configuration - can be set via environment variables
+ICAL_CALENDAR_YEARS = int(os.getenv('ICAL_CALENDAR_YEARS', '2'))  # academic-calendar years from the current one
+ICAL_UID_DOMAIN = os.getenv('ICAL_UID_DOMAIN', 'admission.university.local')  # right-hand side of event UIDs
+ICAL_REFRESH_HOURS = int(os.getenv('ICAL_REFRESH_HOURS', '12'))  # polling interval suggested to clients
+
+PRODID = '-//University Admission//Important Dates//EN'
+STUDENT_TYPES = ('local', 'international')
+
+
+def feed_timestamp():
+    """
+    When the feed data last changed (UTC, whole seconds)
+
+    The newest of the stamp files invalidate_deadlines() and
+    invalidate_catalog() touch, which all processes share; without either,
+    the start of the current year, when the academic-calendar years move on.
+    """
+    stamps = []
+    for path in (DEADLINE_STAMP_FILE, CATALOG_STAMP_FILE):
+        try:
+            stamps.append(os.stat(path).st_mtime)
+        except OSError:
+            continue
+    if stamps:
+        return datetime.fromtimestamp(int(max(stamps)), timezone.utc)
+    return datetime(date.today().year, 1, 1, tzinfo=timezone.utc)
+
+
+def _escape(text):
+    """Escape a TEXT property value"""
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Split a content line into 75-octet pieces without breaking UTF-8 sequences"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    pieces = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(pieces)
+
+
+def _event(uid, start, end, summary, description, categories, stamp):
+    """VEVENT lines for an all-day event from start to end inclusive"""
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{stamp}',
+        f"DTSTART;VALUE=DATE:{start.strftime('%Y%m%d')}",
+        # DTEND is exclusive for all-day events
+        f"DTEND;VALUE=DATE:{((end or start) + timedelta(days=1)).strftime('%Y%m%d')}",
+        f'SUMMARY:{_escape(summary)}',
+    ]
+    if description:
+        lines.append(f'DESCRIPTION:{_escape(description)}')
+    if categories:
+        lines.append('CATEGORIES:' + ','.join(_escape(c) for c in categories))
+    lines.append('TRANSP:TRANSPARENT')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def academic_calendar_dates(years=None, student=None):
+    """
+    DateCalculator dates for the given years (default: ICAL_CALENDAR_YEARS from this year)
+
+    student: 'local' or 'international' keeps only that group's dates
+    """
+    if years is None:
+        first = date.today().year
+        years = range(first, first + ICAL_CALENDAR_YEARS)
+    dates = []
+    for year in years:
+        for item in DateCalculator.get_all_important_dates(year):
+            if student is not None and item['is_international'] != (student == 'international'):
+                continue
+            dates.append(dict(item, year=year))
+    return dates
+
+
+def build_calendar(name, important_dates, calendar_dates=(), show_program=False, updated=None):
+    """
+    Render an iCalendar document
+
+    Args:
+        name: Calendar name shown by the client
+        important_dates: IMPORTANT_DATE entries from the deadline index
+        calendar_dates: academic_calendar_dates() entries
+        show_program: Prefix event titles with the program name (multi-program feeds)
+        updated: DTSTAMP of every event (default feed_timestamp())
+
+    Returns:
+        str with CRLF line endings
+    """
+    stamp = (updated or feed_timestamp()).strftime('%Y%m%dT%H%M%SZ')
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+        f'REFRESH-INTERVAL;VALUE=DURATION:PT{ICAL_REFRESH_HOURS}H',
+        f'X-PUBLISHED-TTL:PT{ICAL_REFRESH_HOURS}H',
+    ]
+
+    for item in important_dates:
+        summary = item['event_type']
+        if show_program:
+            summary = f"{item['program_name']}: {summary}"
+        lines.extend(_event(
+            f"important-date-{item['date_id']}@{ICAL_UID_DOMAIN}",
+            item['start_date'], item['end_date'], summary, item['description'],
+            [item['program_name']], stamp
+        ))
+
+    for item in calendar_dates:
+        student = 'international' if item['is_international'] else 'local'
+        kind = 'registration' if 'Registration' in item['event_type'] else 'application-deadline'
+        lines.extend(_event(
+            f"semester-{item['year']}-{item['semester']}-{kind}-{student}@{ICAL_UID_DOMAIN}",
+            item['start_date'], item['end_date'], f"{item['event_type']} {item['year']}",
+            item['description'], ['Academic Calendar'], stamp
+        ))
+
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+def program_feed(program_id, student=None, updated=None):
+    """Feed of one program's dates plus the academic calendar; None for an unknown program"""
+    program = get_catalog().get_program(program_id)
+    if program is None:
+        return None
+    dates = get_deadline_index().matching(program_id=program_id)
+    return build_calendar(f"{program['program_name']} - Important Dates", dates,
+                          academic_calendar_dates(student=student), updated=updated)
+
+
+def level_feed(level, student=None, updated=None):
+    """Feed of every program of a level plus the academic calendar; None for an unknown level"""
+    programs = get_catalog().programs(level=level)
+    if not programs:
+        return None
+    dates = get_deadline_index().matching(level=level)
+    return build_calendar(f"{programs[0]['level']} Programmes - Important Dates", dates,
+                          academic_calendar_dates(student=student), show_program=True, updated=updated)
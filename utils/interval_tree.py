@@ -0,0 +1,73 @@
+"""
+Interval Tree - Static index of closed intervals for overlap queries
+
+Intervals are kept sorted by start in flat lists; an implicit balanced tree
+over that order stores the largest end in every subtree, so a query skips
+any subtree that ends before the window or starts after it. A query visits
+O((k + 1) log n) nodes for k results instead of scanning all n, and results
+come back in start order.
+
+Built once from a snapshot (see utils/deadline_index.py) and never modified.
+"""
+
+
+class IntervalTree:
+    """Closed intervals [start, end] with a payload, queried by overlap"""
+
+    __slots__ = ('starts', 'ends', 'payloads', '_max_end')
+
+    def __init__(self, intervals):
+        """
+        Args:
+            intervals: Iterable of (start, end, payload); start and end must be
+                       mutually comparable (e.g. ints or dates) with start <= end
+        """
+        items = sorted(intervals, key=lambda item: item[0])
+        self.starts = [item[0] for item in items]
+        self.ends = [item[1] for item in items]
+        self.payloads = [item[2] for item in items]
+        self._max_end = list(self.ends)
+        if items:
+            self._build(0, len(items))
+
+    def _build(self, lo, hi):
+        """Fill _max_end for the subtree rooted at the middle of [lo, hi); returns its max end"""
+        mid = (lo + hi) // 2
+        best = self.ends[mid]
+        if lo < mid:
+            left = self._build(lo, mid)
+            if left > best:
+                best = left
+        if mid + 1 < hi:
+            right = self._build(mid + 1, hi)
+            if right > best:
+                best = right
+        self._max_end[mid] = best
+        return best
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, low, high):
+        """Payloads of intervals with start <= high and end >= low, in start order"""
+        result = []
+        if self.starts and low <= high:
+            self._collect(0, len(self.starts), low, high, result)
+        return result
+
+    def _collect(self, lo, hi, low, high, result):
+        if lo >= hi or self.starts[lo] > high:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < low:
+            return
+        self._collect(lo, mid, low, high, result)
+        if self.starts[mid] > high:
+            return  # the right subtree starts even later
+        if self.ends[mid] >= low:
+            result.append(self.payloads[mid])
+        self._collect(mid + 1, hi, low, high, result)
+
+    def stabbing(self, point):
+        """Payloads of intervals containing point"""
+        return self.overlapping(point, point)
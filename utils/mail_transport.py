@@ -0,0 +1,263 @@
+"""
+Mail Transport - Pooled SMTP sessions for outgoing email
+
+Keeps a small pool of connected, STARTTLS'd and logged-in SMTP sessions and
+reuses them across messages instead of doing the full handshake per email.
+Sessions dropped before a message is sent are reconnected transparently (a
+failure after the message body went out is reported, not resent, so nobody
+gets the email twice), and batches of messages are sent in parallel up to the
+pool size.
+"""
+import atexit
+import os
+import smtplib
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Transport configuration - can be set via environment variables
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '4'))  # concurrent SMTP sessions
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))  # socket timeout in seconds
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+SMTP_MAX_IDLE = float(os.getenv('SMTP_MAX_IDLE', '60'))  # idle seconds before a session is reopened
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
+
+# Errors after which the session is unusable
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class DeliveryUncertainError(smtplib.SMTPException):
+    """The connection failed after the message body was sent; it may have been delivered"""
+
+
+# Outcome of a failed delivery; permanent failures must not be retried
+DeliveryFailure = namedtuple('DeliveryFailure', ['error', 'permanent'])
+
+
+def is_permanent_failure(exc):
+    """
+    True when retrying the same message cannot help (or could deliver it twice)
+
+    5xx replies to the message or its recipients are permanent; 4xx replies,
+    connection errors and sender/authentication rejections (configuration
+    problems that affect every message) are worth retrying later.
+    """
+    if isinstance(exc, DeliveryUncertainError):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return bool(exc.recipients) and all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, (smtplib.SMTPAuthenticationError, smtplib.SMTPSenderRefused)):
+        return False
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    return False
+
+
+class _PooledSMTP(smtplib.SMTP):
+    """SMTP client that records whether the current message reached the DATA stage"""
+
+    data_started = False
+
+    def data(self, msg):
+        self.data_started = True
+        return super().data(msg)
+
+
+class _Session:
+    """One open SMTP connection and its usage counters"""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Bounded pool of authenticated SMTP sessions"""
+
+    def __init__(self, host, port, username=None, password=None, use_tls=SMTP_USE_TLS,
+                 size=SMTP_POOL_SIZE, timeout=SMTP_TIMEOUT,
+                 max_messages=SMTP_MAX_MESSAGES_PER_CONNECTION, max_idle=SMTP_MAX_IDLE):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.max_idle = max_idle
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.connects = 0
+        self.reconnects = 0
+        self.sent = 0
+        self.failed = 0
+
+    def _connect(self):
+        smtp = _PooledSMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        with self._lock:
+            self.connects += 1
+        return _Session(smtp)
+
+    @staticmethod
+    def _quit(session):
+        try:
+            session.smtp.quit()
+        except Exception:
+            session.smtp.close()
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self._connect()
+            # Servers drop idle sessions; reopen rather than fail the next send
+            if time.monotonic() - session.last_used > self.max_idle:
+                self._quit(session)
+                continue
+            return session
+
+    def _checkin(self, session):
+        session.last_used = time.monotonic()
+        if session.messages >= self.max_messages:
+            self._quit(session)
+            return
+        with self._lock:
+            self._idle.append(session)
+
+    def send(self, msg):
+        """Send one email.message.Message; raises on failure"""
+        with self._slots:
+            session = self._checkout()
+            try:
+                try:
+                    session.smtp.data_started = False
+                    session.smtp.send_message(msg)
+                except RECONNECT_ERRORS as e:
+                    session.smtp.close()
+                    if session.smtp.data_started:
+                        # The server may already have accepted the message; resending could duplicate it
+                        raise DeliveryUncertainError(f"Connection lost after sending the message: {e}") from e
+                    # Stale session, failed before the message was sent: reconnect once and resend
+                    session = self._connect()
+                    with self._lock:
+                        self.reconnects += 1
+                    session.smtp.send_message(msg)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server rejected this message but the session is still usable
+                session.messages += 1
+                self._checkin(session)
+                with self._lock:
+                    self.failed += 1
+                raise
+            except Exception:
+                session.smtp.close()
+                with self._lock:
+                    self.failed += 1
+                raise
+            session.messages += 1
+            self._checkin(session)
+            with self._lock:
+                self.sent += 1
+
+    def close(self):
+        """Quit every idle session"""
+        with self._lock:
+            sessions = list(self._idle)
+            self._idle.clear()
+        for session in sessions:
+            self._quit(session)
+
+    def stats(self):
+        """Snapshot of pool metrics"""
+        return {
+            'size': self.size,
+            'idle': len(self._idle),
+            'connects': self.connects,
+            'reconnects': self.reconnects,
+            'sent': self.sent,
+            'failed': self.failed,
+        }
+
+
+class MailTransport:
+    """Send messages over a SMTPConnectionPool, in parallel for batches"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def deliver(self, msg):
+        """Send one message; returns None on success or a DeliveryFailure"""
+        try:
+            self.pool.send(msg)
+            return None
+        except Exception as e:
+            return DeliveryFailure(str(e) or e.__class__.__name__, is_permanent_failure(e))
+
+    def send(self, msg):
+        """Send one message; returns True on success"""
+        failure = self.deliver(msg)
+        if failure is not None:
+            print(f"Error sending email to {msg['To']}: {failure.error}")
+        return failure is None
+
+    def _map(self, fn, messages):
+        messages = list(messages)
+        if len(messages) <= 1 or self.pool.size <= 1:
+            return [fn(msg) for msg in messages]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix='smtp')
+        return list(self._executor.map(fn, messages))
+
+    def deliver_many(self, messages):
+        """Send messages concurrently; returns one DeliveryFailure (or None) per message, in order"""
+        return self._map(self.deliver, messages)
+
+    def send_many(self, messages):
+        """Send messages concurrently (up to the pool size); returns a list of bools in order"""
+        return self._map(self.send, messages)
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.pool.close()
+
+
+_transport = None
+_transport_pid = None
+_transport_lock = threading.Lock()
+
+
+def get_mail_transport():
+    """Return the process-wide transport for the configured SMTP server"""
+    global _transport, _transport_pid
+    pid = os.getpid()
+    if _transport is None or _transport_pid != pid:
+        with _transport_lock:
+            if _transport is None or _transport_pid != pid:
+                from utils.email_sender import SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD
+                _transport = MailTransport(SMTPConnectionPool(SMTP_SERVER, SMTP_PORT,
+                                                              SMTP_USERNAME, SMTP_PASSWORD))
+                _transport_pid = pid
+                atexit.register(_transport.close)
+    return _transport
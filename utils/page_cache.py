@@ -0,0 +1,135 @@
+"""
+Page Cache - Full-response cache for pages rendered only from catalog data
+
+Rendered HTML is kept in memory per route and query string together with the
+catalog version it was built from. Hits skip the database and the template
+entirely, and every response carries an ETag and Last-Modified so browsers
+and crawlers revalidate with a 304 instead of downloading the page again.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, make_response
+
+from utils.program_catalog import get_catalog
+
+# Cache configuration - can be set via environment variables
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', '256'))  # cached responses per process
+
+CachedPage = namedtuple('CachedPage', ['version', 'body', 'mimetype', 'etag', 'last_modified'])
+
+
+def catalog_version():
+    """Default validator: pages are valid until the program catalog reloads"""
+    return get_catalog().version
+
+
+class PageCache:
+    """LRU of rendered responses keyed by (path, query string)"""
+
+    def __init__(self, max_entries=PAGE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of cache metrics"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+        }
+
+
+_page_cache = PageCache()
+
+
+def get_page_cache():
+    """Return the process-wide page cache"""
+    return _page_cache
+
+
+def cached_page(validator=catalog_version, vary_query=True):
+    """
+    Cache a view's successful responses until validator() returns a new value.
+
+    The view still runs (and renders its own error page) when the validator
+    fails, e.g. because the catalog has never been loaded. Views that ignore
+    the query string pass vary_query=False to keep one entry per path, and
+    views that read only some parameters pass a callable returning their
+    normalized values, so arbitrary query strings cannot flood the cache.
+    A Last-Modified set by the view is kept; otherwise the render time is used.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                version = validator()
+            except Exception as e:
+                print(f"Warning: Page cache bypassed: {e}")
+                return view(*args, **kwargs)
+
+            if callable(vary_query):
+                key = (request.path, vary_query())
+            else:
+                key = (request.path, request.query_string if vary_query else b'')
+            entry = _page_cache.get(key, version)
+            if entry is None:
+                _page_cache.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+
+                body = response.get_data()
+                entry = CachedPage(
+                    version=version,
+                    body=body,
+                    mimetype=response.mimetype,
+                    etag=hashlib.sha1(body).hexdigest(),
+                    last_modified=response.last_modified or datetime.now(timezone.utc).replace(microsecond=0)
+                )
+                _page_cache.put(key, entry)
+            else:
+                _page_cache.hits += 1
+                response = make_response(entry.body)
+                response.mimetype = entry.mimetype
+
+            response.set_etag(entry.etag)
+            response.last_modified = entry.last_modified
+            # Let clients keep the page but always revalidate it
+            response.cache_control.no_cache = True
+            response = response.make_conditional(request)
+            if response.status_code == 304:
+                _page_cache.not_modified += 1
+            return response
+        return wrapper
+    return decorator
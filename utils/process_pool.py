@@ -0,0 +1,19 @@
+"""
+Process Pools - Worker processes that are safe to start from a threaded app
+
+Forking the Flask process copies every lock in the state it is in at that
+moment, so a worker forked while another thread holds a cache, DB pool or
+SMTP pool lock deadlocks the first time it takes that lock. Pools are
+therefore started with 'forkserver' (a clean single-threaded process forks
+the workers) or, where that is unavailable, 'spawn'.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def new_process_pool(max_workers, initializer=None, initargs=()):
+    """ProcessPoolExecutor whose workers share no threads or locks with this process"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(START_METHOD),
+                               initializer=initializer, initargs=initargs)
@@ -0,0 +1,293 @@
+"""
+Program Catalog - In-process cache of programs, faculties, levels and requirements
+
+The PROGRAM, FACULTY and ADMISSION_REQUIREMENT data changes a couple of
+times a semester, so it is loaded once into indexed in-memory structures and
+refreshed when the TTL expires or when a setup script calls
+invalidate_catalog().
+"""
+import os
+import threading
+import time
+
+from utils.db_helper import db_connection
+from utils.eligibility_checker import clear_requirement_cache
+
+# Cache configuration - can be set via environment variables
+CATALOG_TTL = float(os.getenv('CATALOG_TTL', '3600'))  # seconds before a reload
+CATALOG_STAMP_FILE = os.getenv(
+    'CATALOG_STAMP_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.catalog_version')
+)
+
+# Display order of study levels
+LEVEL_ORDER = ['Foundation', 'Diploma', 'Bachelor', 'Master', 'PhD']
+
+
+def _level_rank(level):
+    try:
+        return LEVEL_ORDER.index(level)
+    except ValueError:
+        return len(LEVEL_ORDER)
+
+
+def _normalize_level(level):
+    """Map a stored level onto LEVEL_ORDER spelling (e.g. 'foundation' -> 'Foundation')"""
+    if not level:
+        return level
+    for known in LEVEL_ORDER:
+        if known.lower() == level.lower():
+            return known
+    return level
+
+
+def group_by_faculty(programs, requirements_by_program):
+    """
+    Build {faculty_id: {'faculty_name', 'programs': {program_id: {..., 'requirements': [...]}}}}
+
+    One linear pass over programs already ordered by faculty and program name;
+    each program's requirements are listed by qualification type.
+    """
+    faculties = {}
+    for program in programs:
+        faculty = faculties.get(program['faculty_id'])
+        if faculty is None:
+            faculty = faculties[program['faculty_id']] = {
+                'faculty_name': program['faculty_name'],
+                'programs': {}
+            }
+
+        requirements = sorted(
+            requirements_by_program.get(program['program_id'], ()),
+            key=lambda req: ((req['qualification_type'] or '').lower(), req['requirement_id'])
+        )
+        faculty['programs'][program['program_id']] = {
+            'program_name': program['program_name'],
+            'level': program['level'],
+            'duration_years': program['duration_years'],
+            'requirements': [
+                {
+                    'qualification_type': req['qualification_type'],
+                    'minimum_grade': req['minimum_grade'],
+                    'additional_requirements': req['additional_requirements']
+                }
+                for req in requirements if req['qualification_type']
+            ]
+        }
+    return faculties
+
+
+class CatalogUnavailableError(RuntimeError):
+    """Raised when the catalog has never loaded and the database is unreachable"""
+
+
+class ProgramCatalog:
+    """Programs indexed by id, faculty and level, plus faculties and requirements"""
+
+    def __init__(self, ttl=CATALOG_TTL, stamp_file=CATALOG_STAMP_FILE):
+        self.ttl = ttl
+        self.stamp_file = stamp_file
+        self._lock = threading.Lock()
+
+        self._loaded_at = None
+        self._loaded_stamp = None
+        self._version = 0
+
+        self._programs = []
+        self._by_id = {}
+        self._by_faculty = {}
+        self._by_level = {}
+        self._faculties = []
+        self._requirements = {}
+        self._faculty_trees = {}
+
+    def _read_stamp(self):
+        try:
+            return os.stat(self.stamp_file).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _is_stale(self):
+        if self._loaded_at is None:
+            return True
+        if time.monotonic() - self._loaded_at > self.ttl:
+            return True
+        return self._read_stamp() != self._loaded_stamp
+
+    def _load(self, conn):
+        """Read the catalog tables and rebuild every index"""
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT p.*, f.faculty_name
+            FROM PROGRAM p
+            JOIN FACULTY f ON p.faculty_id = f.faculty_id
+            ORDER BY f.faculty_name, p.program_name
+        """)
+        programs = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT faculty_id, faculty_name, description, contact_email,
+                   contact_phone, office_location, office_hours, location
+            FROM FACULTY
+            ORDER BY faculty_name
+        """)
+        faculties = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT requirement_id, program_id, qualification_type, minimum_grade,
+                   additional_requirements, entrance_exam_info
+            FROM ADMISSION_REQUIREMENT
+            ORDER BY program_id, requirement_id
+        """)
+        requirements = cursor.fetchall()
+        cursor.close()
+
+        by_id = {}
+        by_faculty = {}
+        by_level = {}
+        for program in programs:
+            program['level'] = _normalize_level(program['level'])
+            by_id[program['program_id']] = program
+            by_faculty.setdefault(program['faculty_id'], []).append(program)
+            by_level.setdefault(program['level'], []).append(program)
+
+        requirements_by_program = {}
+        for requirement in requirements:
+            if requirement['program_id'] in by_id:
+                requirements_by_program.setdefault(requirement['program_id'], []).append(requirement)
+
+        self._programs = programs
+        self._by_id = by_id
+        self._by_faculty = by_faculty
+        self._by_level = by_level
+        self._faculties = faculties
+        self._requirements = requirements_by_program
+        self._faculty_trees = {}
+
+    def _ensure_loaded(self):
+        if not self._is_stale():
+            return
+        with self._lock:
+            if not self._is_stale():
+                return
+            stamp = self._read_stamp()
+            with db_connection() as conn:
+                if not conn:
+                    if self._loaded_at is None:
+                        raise CatalogUnavailableError("Database connection failed")
+                    # Keep serving the previous snapshot until the database is back
+                    print("Warning: Could not refresh program catalog, serving cached data")
+                    return
+                self._load(conn)
+            # Parsed requirements are only valid for the snapshot they came from
+            clear_requirement_cache()
+            self._loaded_stamp = stamp
+            self._loaded_at = time.monotonic()
+            self._version += 1
+
+    @property
+    def version(self):
+        """Counter that changes every time the catalog is reloaded"""
+        self._ensure_loaded()
+        return self._version
+
+    def invalidate(self):
+        """Drop the in-memory snapshot so the next access reloads it"""
+        with self._lock:
+            self._loaded_at = None
+
+    def programs(self, faculty_id=None, level=None, order_by_level=False):
+        """
+        Return programs ordered by faculty and program name
+
+        The returned dicts are shared cache entries and must not be modified.
+        """
+        self._ensure_loaded()
+        # Stored levels are normalized on load, so normalize the argument the same way
+        level = _normalize_level(level) if level is not None else None
+        if faculty_id is not None:
+            programs = self._by_faculty.get(faculty_id, [])
+            if level is not None:
+                programs = [p for p in programs if p['level'] == level]
+        elif level is not None:
+            programs = self._by_level.get(level, [])
+        else:
+            programs = self._programs
+
+        if order_by_level:
+            return sorted(programs, key=lambda p: _level_rank(p['level']))
+        return list(programs)
+
+    def get_program(self, program_id):
+        """Return a single program (with faculty_name) or None"""
+        self._ensure_loaded()
+        return self._by_id.get(program_id)
+
+    def requirements(self, program_id):
+        """Return the ADMISSION_REQUIREMENT rows of one program (shared, read-only)"""
+        self._ensure_loaded()
+        return list(self._requirements.get(program_id, []))
+
+    def requirements_by_program(self):
+        """Return {program_id: [requirement rows]} in catalog program order"""
+        self._ensure_loaded()
+        return {
+            program['program_id']: list(self._requirements[program['program_id']])
+            for program in self._programs
+            if program['program_id'] in self._requirements
+        }
+
+    def faculty_tree(self, levels):
+        """
+        Return group_by_faculty() for programs at the given levels
+
+        Built once per catalog load and shared, so it must not be modified.
+        """
+        self._ensure_loaded()
+        key = tuple(levels)
+        tree = self._faculty_trees.get(key)
+        if tree is None:
+            wanted = {_normalize_level(level) for level in key}
+            programs = [p for p in self._programs if p['level'] in wanted]
+            tree = self._faculty_trees[key] = group_by_faculty(programs, self._requirements)
+        return tree
+
+    def programs_by_level(self):
+        """Return {level: [programs]} for every level in LEVEL_ORDER"""
+        self._ensure_loaded()
+        return {level: list(self._by_level.get(level, [])) for level in LEVEL_ORDER}
+
+    def faculties(self):
+        """Return all faculties ordered by name"""
+        self._ensure_loaded()
+        return list(self._faculties)
+
+    def levels(self):
+        """Return the levels that currently have programs, in display order"""
+        self._ensure_loaded()
+        return sorted(self._by_level, key=_level_rank)
+
+
+_catalog = ProgramCatalog()
+
+
+def get_catalog():
+    """Return the process-wide program catalog"""
+    return _catalog
+
+
+def invalidate_catalog():
+    """
+    Mark the catalog as changed.
+
+    Touches the stamp file so every running app process reloads on its next
+    access, and clears the snapshot held by the current process.
+    """
+    try:
+        with open(CATALOG_STAMP_FILE, 'a'):
+            pass
+        now = time.time_ns()
+        os.utime(CATALOG_STAMP_FILE, ns=(now, now))
+    except OSError as e:
+        print(f"Warning: Could not update catalog stamp file: {e}")
+    _catalog.invalidate()
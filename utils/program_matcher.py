@@ -0,0 +1,122 @@
+"""
+Program Matcher - Fast program-name lookup for chatbot and webhook queries
+
+Builds an inverted token index over normalized program names once and ranks
+candidates with BM25, so matching cost depends on the query's tokens rather
+than on the size of the catalog.
+"""
+import math
+import re
+import threading
+from collections import OrderedDict
+
+# Words ignored when scoring word overlap
+STOP_WORDS = frozenset({'in', 'of', 'the', 'and', 'for', 'to', 'a', 'an'})
+
+
+def normalize_program_name(name):
+    """Normalize program name for matching (lowercase, remove extra spaces)"""
+    if not name:
+        return ""
+    return re.sub(r'\s+', ' ', name.lower().strip())
+
+
+class ProgramMatcher:
+    """
+    Match free-text queries against normalized program names.
+
+    Lookup order follows the original webhook matcher:
+    1. exact match on the normalized name
+    2. names containing the query (or contained in it)
+    3. word overlap, ignoring STOP_WORDS
+    Within stages 2 and 3 candidates are ranked by BM25; ties keep catalog order.
+    """
+
+    def __init__(self, names, cache_size=1024, k1=1.2, b=0.75):
+        self.names = list(names)
+        self.cache_size = cache_size
+        self.k1 = k1
+        self.b = b
+
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self._postings = {}  # token -> {doc index: term frequency}
+        self._scored_lengths = []  # tokens per name, excluding STOP_WORDS
+
+        for i, name in enumerate(self.names):
+            tokens = name.split()
+            for token in tokens:
+                postings = self._postings.setdefault(token, {})
+                postings[i] = postings.get(i, 0) + 1
+            self._scored_lengths.append(sum(1 for t in tokens if t not in STOP_WORDS))
+
+        total = len(self.names)
+        avg_length = (sum(self._scored_lengths) / total) if total else 0.0
+        self._length_norms = [
+            1 - b + b * (length / avg_length if avg_length else 0.0)
+            for length in self._scored_lengths
+        ]
+        self._idf = {
+            token: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self._postings.items()
+        }
+        self._cache = OrderedDict()  # normalized query -> matched name (or None)
+        self._cache_lock = threading.Lock()
+
+    def _bm25_scores(self, tokens):
+        """Term-at-a-time BM25: {doc index: score} for every name containing a token"""
+        scores = {}
+        k1 = self.k1
+        for token in tokens:
+            idf = self._idf[token]
+            for doc, tf in self._postings[token].items():
+                weight = idf * tf * (k1 + 1) / (tf + k1 * self._length_norms[doc])
+                scores[doc] = scores.get(doc, 0.0) + weight
+        return scores
+
+    def _match(self, query):
+        if query in self._positions:
+            return query
+
+        tokens = query.split()
+        known = [t for t in dict.fromkeys(tokens) if t in self._postings]
+        scored = [t for t in known if t not in STOP_WORDS]
+        scores = self._bm25_scores(scored)
+
+        def best(docs):
+            # Highest BM25 score; earliest catalog position wins ties
+            return self.names[min(docs, key=lambda doc: (-scores.get(doc, 0.0), doc))]
+
+        # Substring match. Names sharing a scored word have a positive score and
+        # outrank every other name, so check them first; only when none of them
+        # matches (e.g. partial words like 'comp') scan the whole catalog.
+        contained = [doc for doc in scores
+                     if query in self.names[doc] or self.names[doc] in query]
+        if not contained:
+            contained = [i for i, name in enumerate(self.names) if query in name or name in query]
+        if contained:
+            return best(contained)
+
+        # Word overlap ranked by BM25
+        if scores:
+            return best(scores)
+
+        return None
+
+    def match(self, query):
+        """Return the best matching normalized program name, or None"""
+        normalized = normalize_program_name(query)
+        if not normalized:
+            return None
+
+        # The matcher is shared by request threads
+        with self._cache_lock:
+            if normalized in self._cache:
+                self._cache.move_to_end(normalized)
+                return self._cache[normalized]
+
+        result = self._match(normalized)
+        with self._cache_lock:
+            self._cache[normalized] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
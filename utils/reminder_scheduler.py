@@ -0,0 +1,203 @@
+"""
+Reminder Scheduler - Run the daily deadline reminders inside the app
+
+A background thread in every app process wakes up at REMINDER_SCHEDULE_TIME
+and tries to take a MySQL named lock; only the process that gets it sends
+the reminders, so multi-process deployments send each reminder once.
+Reminders are queued in the email outbox and committed in chunks (see
+send_due_reminders), so a run that crashes is picked up by the next attempt
+where it stopped; the outbox worker delivers them.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from utils.db_helper import get_dedicated_connection
+from utils.email_sender import send_due_reminders
+
+# Scheduler configuration - can be set via environment variables
+REMINDER_SCHEDULER_ENABLED = os.getenv('REMINDER_SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+REMINDER_SCHEDULE_TIME = os.getenv('REMINDER_SCHEDULE_TIME', '09:00')  # local time, HH:MM
+REMINDER_RETRY_MINUTES = float(os.getenv('REMINDER_RETRY_MINUTES', '15'))  # after a failed run
+REMINDER_STARTUP_DELAY = float(os.getenv('REMINDER_STARTUP_DELAY', '60'))  # seconds before catching up
+REMINDER_LOCK_NAME = os.getenv('REMINDER_LOCK_NAME', 'skl_deadline_reminders')
+
+
+def _parse_time(value):
+    hour, minute = value.split(':')
+    return int(hour), int(minute)
+
+
+class ReminderScheduler:
+    """Daily reminder job guarded by a MySQL advisory lock"""
+
+    def __init__(self, schedule_time=REMINDER_SCHEDULE_TIME, retry_minutes=REMINDER_RETRY_MINUTES,
+                 startup_delay=REMINDER_STARTUP_DELAY, lock_name=REMINDER_LOCK_NAME):
+        self.hour, self.minute = _parse_time(schedule_time)
+        self.retry_delay = timedelta(minutes=retry_minutes)
+        self.startup_delay = timedelta(seconds=startup_delay)
+        self.lock_name = lock_name
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+
+        # Metrics
+        self.state = 'stopped'
+        self.next_run = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_run = {}
+
+    def _scheduled_time(self, day):
+        return datetime.combine(day, datetime.min.time()).replace(hour=self.hour, minute=self.minute)
+
+    def _next_daily_run(self, now):
+        scheduled = self._scheduled_time(now.date())
+        return scheduled if scheduled > now else self._scheduled_time(now.date() + timedelta(days=1))
+
+    def start(self):
+        """Start the background thread (once per process)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        now = datetime.now()
+        # Started after today's slot (e.g. a restart after a crash): catch up shortly
+        if now >= self._scheduled_time(now.date()):
+            self.next_run = now + self.startup_delay
+        else:
+            self.next_run = self._scheduled_time(now.date())
+        self.state = 'idle'
+        self._thread = threading.Thread(target=self._loop, name='reminder-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            wait = (self.next_run - datetime.now()).total_seconds()
+            if wait > 0:
+                self._stop.wait(min(wait, 300))  # re-check periodically in case the clock jumps
+                continue
+
+            result = self.run_now()
+            now = datetime.now()
+            if result['status'] == 'failed':
+                retry_at = now + self.retry_delay
+                self.next_run = retry_at if retry_at.date() == now.date() else self._next_daily_run(now)
+            else:
+                self.next_run = self._next_daily_run(now)
+
+    def run_now(self):
+        """
+        Run the reminder job if no other process is running it
+
+        Returns a dict with status 'ok', 'skipped' (another worker holds the lock) or 'failed'.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            self.skipped += 1
+            return {'status': 'skipped', 'reason': 'already running in this process'}
+        try:
+            return self._run_locked()
+        finally:
+            self._run_lock.release()
+
+    def _run_locked(self):
+        # Not a pooled connection: if anything goes wrong, disconnecting releases the lock
+        conn = get_dedicated_connection()
+        if not conn:
+            self.failures += 1
+            self.last_run = {'status': 'failed', 'error': 'Database connection failed',
+                             'started_at': datetime.now().isoformat(timespec='seconds')}
+            return self.last_run
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (self.lock_name,))
+            if cursor.fetchone()[0] != 1:
+                self.skipped += 1
+                return {'status': 'skipped', 'reason': 'another worker holds the reminder lock'}
+
+            self.state = 'running'
+            started_at = datetime.now()
+            started = time.monotonic()
+            progress = {'queued': 0, 'attempted': 0}
+
+            def on_chunk(queued, attempted):
+                progress['queued'] = queued
+                progress['attempted'] = attempted
+
+            try:
+                send_due_reminders(conn, on_chunk)
+                status, error = 'ok', None
+            except Exception as e:
+                self.failures += 1
+                status, error = 'failed', str(e)
+                print(f"Error sending scheduled reminders: {e}")
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (self.lock_name,))
+                cursor.fetchone()
+                self.state = 'idle'
+
+            duration = time.monotonic() - started
+            self.runs += 1
+            self.last_run = {
+                'status': status,
+                'error': error,
+                'started_at': started_at.isoformat(timespec='seconds'),
+                'duration_seconds': round(duration, 3),
+                'queued': progress['queued'],
+                'attempted': progress['attempted'],
+                'emails_per_second': round(progress['queued'] / duration, 1) if duration > 0 else None,
+            }
+            print(f"Scheduled reminders {status}: queued {progress['queued']} of {progress['attempted']} "
+                  f"in {duration:.1f}s")
+            return self.last_run
+        except Exception as e:
+            self.failures += 1
+            self.last_run = {'status': 'failed', 'error': str(e),
+                             'started_at': datetime.now().isoformat(timespec='seconds')}
+            return self.last_run
+        finally:
+            cursor.close()
+            conn.close()
+
+    def stats(self):
+        """Snapshot of scheduler metrics"""
+        return {
+            'state': self.state,
+            'schedule_time': f"{self.hour:02d}:{self.minute:02d}",
+            'next_run': self.next_run.isoformat(timespec='seconds') if self.next_run else None,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_run': self.last_run,
+        }
+
+
+_scheduler = None
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+
+def get_reminder_scheduler():
+    """Return the process-wide reminder scheduler"""
+    global _scheduler, _scheduler_pid
+    pid = os.getpid()
+    if _scheduler is None or _scheduler_pid != pid:
+        with _scheduler_lock:
+            if _scheduler is None or _scheduler_pid != pid:
+                _scheduler = ReminderScheduler()
+                _scheduler_pid = pid
+    return _scheduler
+
+
+def start_reminder_scheduler():
+    """Start the scheduler thread unless REMINDER_SCHEDULER_ENABLED is false"""
+    if not REMINDER_SCHEDULER_ENABLED:
+        return None
+    scheduler = get_reminder_scheduler()
+    scheduler.start()
+    return scheduler